@@ -0,0 +1,6 @@
+"""
+Funções reutilizáveis da análise de absentismo (Call Center)
+
+Os notebooks importam diretamente dos submódulos, por exemplo:
+    from absentismo.carregamento import carregar_dados
+"""
@@ -0,0 +1,132 @@
+"""
+Bradford Factor (S² × D) - Grupo 5
+
+Além do cálculo anual do notebook, calcula o score em janela móvel (por
+omissão 52 semanas) para cada colaborador em cada data. Os spells são
+ordenados uma vez por (colaborador, dia de início) e cada janela é resolvida
+com searchsorted sobre chaves colaborador/dia e somas acumuladas, sem ciclos
+por colaborador.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import numero_dia
+
+# Níveis de risco: score < limite -> nível (acima do último limite: Risco Crítico)
+LIMITES_BRADFORD = [50, 100, 200, 400, 600]
+NIVEIS_RISCO = np.array([
+    '1. Aceitável',
+    '2. Monitorizar',
+    '3. Atenção',
+    '4. Alto Risco',
+    '5. Risco Severo',
+    '6. Risco Crítico',
+], dtype=object)
+
+JANELA_DIAS = 52 * 7
+
+# Espaço de chaves colaborador/dia: dias (desde 1970) cabem folgadamente em 2^20
+_ESCALA_CHAVE = np.int64(1 << 20)
+
+
+def categorizar_bradford(scores):
+    """Nível de risco de cada score (vetorizado com np.digitize)"""
+    return NIVEIS_RISCO[np.digitize(np.asarray(scores, dtype='float64'), LIMITES_BRADFORD)]
+
+
+def bradford_rolling(df_spells, datas=None, colaboradores=None, janela_dias=JANELA_DIAS,
+                     apenas_short_term=True):
+    """
+    Bradford Factor em janela móvel para cada (colaborador, data)
+
+    Para cada data t contam os spells com início em (t - janela_dias, t]:
+    S = número de spells, D = soma das durações, Bradford = S² × D.
+
+    datas: datas de avaliação (por omissão todos os dias do período dos spells)
+    colaboradores: logins a incluir (por omissão os de df_spells); colaboradores
+    sem spells na janela ficam com score 0.
+
+    Devolve um DataFrame longo: login_colaborador, Data, num_spells,
+    total_dias, bradford, risk_level.
+    """
+    spells = df_spells[df_spells['short_term']] if apenas_short_term else df_spells
+
+    if colaboradores is None:
+        colaboradores = pd.Index(df_spells['login_colaborador'].astype(str).unique()).sort_values()
+    else:
+        colaboradores = pd.Index(pd.Series(colaboradores).astype(str).unique())
+    if datas is None:
+        datas = pd.date_range(df_spells['data_inicio'].min(), df_spells['data_fim'].max(), freq='D')
+    datas = pd.DatetimeIndex(datas)
+
+    # Chaves ordenadas (colaborador, dia de início) e somas acumuladas
+    colab_cod = colaboradores.get_indexer(spells['login_colaborador'].astype(str))
+    validos = colab_cod >= 0
+    chave = colab_cod[validos] * _ESCALA_CHAVE + numero_dia(spells['data_inicio'])[validos]
+    duracao = spells['duracao_dias'].to_numpy(dtype=np.int64)[validos]
+
+    ordem = np.argsort(chave, kind='stable')
+    chave = chave[ordem]
+    dias_acum = np.concatenate([[0], np.cumsum(duracao[ordem])])
+
+    # Grelha colaborador x data: limites da janela por searchsorted
+    dia = numero_dia(datas)
+    base = np.arange(len(colaboradores), dtype=np.int64)[:, None] * _ESCALA_CHAVE
+    fim = np.searchsorted(chave, (base + dia[None, :]).ravel(), side='right')
+    inicio = np.searchsorted(chave, (base + (dia - janela_dias)[None, :]).ravel(), side='right')
+
+    num_spells = fim - inicio
+    total_dias = dias_acum[fim] - dias_acum[inicio]
+    bradford = num_spells ** 2 * total_dias
+
+    return pd.DataFrame({
+        'login_colaborador': np.repeat(colaboradores.to_numpy(dtype=object), len(datas)),
+        'Data': np.tile(datas.to_numpy(), len(colaboradores)),
+        'num_spells': num_spells,
+        'total_dias': total_dias,
+        'bradford': bradford,
+        'risk_level': pd.Categorical(categorizar_bradford(bradford), categories=NIVEIS_RISCO),
+    })
+
+
+def colaboradores_ativos(df_base_absentismo, ano):
+    """Logins ativos ('Activo?' == 'Sim') com registos no ano"""
+    return df_base_absentismo[
+        (df_base_absentismo['Activo?'] == 'Sim') &
+        (df_base_absentismo['Data'].dt.year == ano)
+    ]['login_colaborador'].unique()
+
+
+def bradford_anual(df_spells, ativos, ano):
+    """
+    PASSO 5.1: Bradford disruptivo de um ano (spells short-term de colaboradores ativos)
+
+    Devolve (df_spells_disruptivos, df_bradford_disruptivo).
+    """
+    # Filtrar spells: apenas short-term (<=3 dias) de colaboradores ativos
+    df_spells_disruptivos = df_spells[
+        (df_spells['short_term'] == True) &
+        (df_spells['login_colaborador'].isin(ativos)) &
+        (df_spells['data_inicio'].dt.year == ano)
+    ].copy()
+
+    # Agregar por colaborador
+    df_bradford_disruptivo = df_spells_disruptivos.groupby('login_colaborador').agg({
+        'spell_id': 'count',  # S = número de spells
+        'duracao_dias': 'sum',  # D = total de dias
+        'nome_colaborador': 'first',
+        'categoria_profissional': 'first'
+    }).reset_index()
+
+    df_bradford_disruptivo.columns = [
+        'login_colaborador', 'num_spells_short', 'total_dias_short',
+        'nome_colaborador', 'categoria_profissional'
+    ]
+
+    # Bradford = S² × D
+    df_bradford_disruptivo['bradford_disruptivo'] = (
+        df_bradford_disruptivo['num_spells_short'] ** 2
+    ) * df_bradford_disruptivo['total_dias_short']
+    df_bradford_disruptivo['risk_level'] = categorizar_bradford(df_bradford_disruptivo['bradford_disruptivo'])
+
+    return df_spells_disruptivos, df_bradford_disruptivo
@@ -0,0 +1,143 @@
+"""
+Carregamento tipado de combined_data.csv e códigos_V2.xlsx com cache colunar
+
+Na primeira execução os ficheiros fonte são lidos com tipos explícitos
+(datas convertidas na leitura, colunas repetitivas como categóricas) e
+guardados em formato Arrow (Feather sem compressão). As execuções seguintes
+leem essa cache em vez de voltar a interpretar o CSV e o Excel: a leitura é
+uma cópia binária para pandas (os frames devolvidos ficam inteiros em
+memória, não mapeados), sem parsing de texto nem conversão de tipos.
+A cache é identificada pelo hash do conteúdo das fontes, pelo que qualquer
+alteração aos ficheiros invalida-a automaticamente.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+
+FICHEIRO_DADOS = 'combined_data.csv'
+FICHEIRO_CODIGOS = 'códigos_V2.xlsx'
+PASTA_CACHE = '.cache_absentismo'
+
+# Tipos explícitos do dataset principal (evita inferência sobre 1.3M linhas)
+TIPOS_DADOS = {
+    'login_colaborador': 'category',
+    'nome_colaborador': 'category',
+    'segmento_processado_codigo': 'category',
+    'operacao': 'category',
+    'categoria_profissional': 'category',
+    'Activo?': 'category',
+    'DtActivacao': 'category',
+}
+COLUNAS_DATA = ['Data']
+
+# Tipos da tabela de classificação
+TIPOS_CODIGOS = {
+    'Codigo Segmento': str,
+    'Nivel 1': 'category',
+    'Nivel 2': 'category',
+}
+
+# Incrementar quando o esquema da cache mudar
+VERSAO_CACHE = 1
+
+
+def hash_ficheiro(caminho, bloco=1 << 20):
+    """Calcula o SHA-256 do conteúdo de um ficheiro"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for parte in iter(lambda: f.read(bloco), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def ler_registos(caminho=FICHEIRO_DADOS):
+    """Lê o CSV de registos com tipos explícitos e datas convertidas na leitura"""
+    return pd.read_csv(caminho, dtype=TIPOS_DADOS, parse_dates=COLUNAS_DATA)
+
+
+def ler_codigos(caminho=FICHEIRO_CODIGOS):
+    """Lê a tabela de classificação (Codigo Segmento -> Nivel 1 / Nivel 2)"""
+    return pd.read_excel(caminho, dtype=TIPOS_CODIGOS)
+
+
+def alinhar_codigos(df_raw, df_codigos):
+    """
+    Coloca o código de segmento dos registos e da classificação na mesma
+    categoria, para que o merge do PASSO 1.2 seja feito sobre inteiros
+    """
+    codigos_raw = df_raw['segmento_processado_codigo'].astype(str)
+    codigos_tab = df_codigos['Codigo Segmento'].astype(str)
+    categorias = pd.Index(codigos_raw.unique()).union(pd.Index(codigos_tab.unique()))
+    tipo = pd.CategoricalDtype(categorias)
+
+    df_raw['segmento_processado_codigo'] = codigos_raw.astype(tipo)
+    df_codigos['Codigo Segmento'] = codigos_tab.astype(tipo)
+    return df_raw, df_codigos
+
+
+def contar_registos(df_raw):
+    """Número de registos por operação e categoria profissional (o que as métricas usam de df_raw)"""
+    return (df_raw.groupby(['operacao', 'categoria_profissional'], observed=True, dropna=False)
+            .size().rename('num_registos').reset_index())
+
+
+def chave_cache(caminho_dados, caminho_codigos):
+    """Chave da cache: hash das fontes + esquema de tipos"""
+    h = hashlib.sha256()
+    h.update(hash_ficheiro(caminho_dados).encode())
+    h.update(hash_ficheiro(caminho_codigos).encode())
+    esquema = {
+        'versao': VERSAO_CACHE,
+        'dados': {k: str(v) for k, v in TIPOS_DADOS.items()},
+        'datas': COLUNAS_DATA,
+        'codigos': {k: str(v) for k, v in TIPOS_CODIGOS.items()},
+    }
+    h.update(json.dumps(esquema, sort_keys=True).encode())
+    return h.hexdigest()[:20]
+
+
+def _guardar_feather(df, caminho):
+    """Escreve em Feather sem compressão (leitura sem descompressão) de forma atómica"""
+    temporario = caminho + '.tmp'
+    feather.write_feather(df, temporario, compression='uncompressed')
+    os.replace(temporario, caminho)
+
+
+def _ler_feather(caminho):
+    """
+    Lê um Feather para pandas
+
+    O ficheiro é aberto com memory_map (o Arrow lê diretamente das páginas do
+    ficheiro, sem buffer intermédio), mas to_pandas copia todas as colunas:
+    o DataFrame devolvido ocupa memória como um lido de outra forma.
+    """
+    return feather.read_table(caminho, memory_map=True).to_pandas()
+
+
+def carregar_dados(caminho_dados=FICHEIRO_DADOS, caminho_codigos=FICHEIRO_CODIGOS,
+                   pasta_cache=PASTA_CACHE, usar_cache=True):
+    """
+    Devolve (df_raw, df_codigos) prontos para o PASSO 1.2
+
+    Com usar_cache=True reutiliza a cache Arrow quando as fontes não mudaram;
+    caso contrário lê as fontes e (re)escreve a cache.
+    """
+    if not usar_cache:
+        return alinhar_codigos(ler_registos(caminho_dados), ler_codigos(caminho_codigos))
+
+    chave = chave_cache(caminho_dados, caminho_codigos)
+    cache_dados = os.path.join(pasta_cache, f'{chave}_dados.feather')
+    cache_codigos = os.path.join(pasta_cache, f'{chave}_codigos.feather')
+
+    if os.path.exists(cache_dados) and os.path.exists(cache_codigos):
+        return _ler_feather(cache_dados), _ler_feather(cache_codigos)
+
+    df_raw, df_codigos = alinhar_codigos(ler_registos(caminho_dados), ler_codigos(caminho_codigos))
+
+    os.makedirs(pasta_cache, exist_ok=True)
+    _guardar_feather(df_raw, cache_dados)
+    _guardar_feather(df_codigos, cache_codigos)
+    return df_raw, df_codigos
@@ -0,0 +1,139 @@
+"""
+Clustering de perfis de absentismo (Grupo 8)
+
+Features do Bradford disruptivo normalizadas, K escolhido pelo melhor
+silhouette em K_RANGE e perfis nomeados pelo Bradford médio do cluster.
+
+Para populações grandes:
+- a matriz normalizada é guardada com as features (tabela_features), para
+  o pipeline não a recalcular quando só mudam K ou o modo;
+- o varrimento de K pode correr em paralelo (um processo por K);
+- modo 'minibatch' usa MiniBatchKMeans e o silhouette pode ser calculado sobre
+  uma amostra (o silhouette completo é O(n²)).
+Em 'auto' estes modos só são usados acima de LIMITE_MINIBATCH e
+LIMITE_AMOSTRA_SILHOUETTE colaboradores; abaixo o resultado é o de sempre.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+FEATURES_CLUSTERING = [
+    'num_spells_short',
+    'total_dias_short',
+    'bradford_disruptivo'
+]
+
+COLUNAS_ESCALADAS = [f'{feature}_z' for feature in FEATURES_CLUSTERING]
+COLUNAS_COLABORADOR = ['login_colaborador', 'nome_colaborador', 'categoria_profissional']
+
+K_RANGE = range(2, 9)
+RANDOM_STATE = 42
+
+MODOS = ['auto', 'kmeans', 'minibatch']
+LIMITE_MINIBATCH = 50_000
+TAMANHO_BATCH = 4096
+LIMITE_AMOSTRA_SILHOUETTE = 10_000
+TAMANHO_AMOSTRA_SILHOUETTE = 5_000
+
+
+def preparar_features(df_bradford_disruptivo, features=FEATURES_CLUSTERING):
+    """PASSO 8.1: devolve (df_cluster, X_scaled)"""
+    df_cluster = df_bradford_disruptivo[COLUNAS_COLABORADOR + features].copy()
+    X_scaled = StandardScaler().fit_transform(df_cluster[features])
+    return df_cluster, X_scaled
+
+
+def tabela_features(df_bradford_disruptivo, features=FEATURES_CLUSTERING):
+    """PASSO 8.1 numa só tabela: colaborador, features e features normalizadas (<feature>_z)"""
+    df_cluster, X_scaled = preparar_features(df_bradford_disruptivo, features)
+    return df_cluster.assign(**{f'{f}_z': X_scaled[:, i] for i, f in enumerate(features)})
+
+
+def separar_features(df_features, features=FEATURES_CLUSTERING):
+    """Inverso de tabela_features: devolve (df_cluster, X_scaled)"""
+    return df_features[COLUNAS_COLABORADOR + features].copy(), df_features[[f'{f}_z' for f in features]].to_numpy()
+
+
+def resolver_modo(modo, n):
+    if modo not in MODOS:
+        raise ValueError(f'Modo de clustering desconhecido: {modo} (disponíveis: {MODOS})')
+    if modo == 'auto':
+        return 'minibatch' if n > LIMITE_MINIBATCH else 'kmeans'
+    return modo
+
+
+def resolver_amostra(amostra_silhouette, n):
+    """Tamanho da amostra do silhouette (None = todos os pontos)"""
+    if amostra_silhouette == 'auto':
+        amostra_silhouette = TAMANHO_AMOSTRA_SILHOUETTE if n > LIMITE_AMOSTRA_SILHOUETTE else None
+    return amostra_silhouette if amostra_silhouette and amostra_silhouette < n else None
+
+
+def modelo_kmeans(k, modo='kmeans', random_state=RANDOM_STATE):
+    if modo == 'minibatch':
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=TAMANHO_BATCH)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=10)
+
+
+def avaliar_k(X_scaled, k, modo='kmeans', amostra=None, random_state=RANDOM_STATE, threads=None):
+    """Inertia e silhouette (completo ou numa amostra) de um K"""
+    with threadpool_limits(limits=threads):
+        kmeans = modelo_kmeans(k, modo, random_state)
+        labels = kmeans.fit_predict(X_scaled)
+        silhouette = silhouette_score(X_scaled, labels, sample_size=amostra, random_state=random_state)
+    return {'K': k, 'inertia': kmeans.inertia_, 'silhouette': silhouette}
+
+
+def varrer_k(X_scaled, k_range=K_RANGE, random_state=RANDOM_STATE, modo='auto', amostra_silhouette='auto',
+             processos=1):
+    """
+    PASSO 8.2: inertia e silhouette para cada K
+
+    Com processos > 1 cada K é avaliado num processo (com um thread de BLAS /
+    OpenMP por processo, para não sobrecarregar os cores).
+    """
+    modo = resolver_modo(modo, len(X_scaled))
+    amostra = resolver_amostra(amostra_silhouette, len(X_scaled))
+    k_range = list(k_range)
+
+    if processos and processos > 1 and len(k_range) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(k_range))) as executor:
+            futuros = [executor.submit(avaliar_k, X_scaled, k, modo, amostra, random_state, 1) for k in k_range]
+            resultados = [f.result() for f in futuros]
+    else:
+        resultados = [avaliar_k(X_scaled, k, modo, amostra, random_state) for k in k_range]
+    return pd.DataFrame(resultados)
+
+
+def melhor_k(df_k):
+    """K com o maior silhouette (o menor K em caso de empate)"""
+    return int(df_k.loc[df_k['silhouette'].idxmax(), 'K'])
+
+
+def nomear_cluster(cluster_id, profiles):
+    """Nome do cluster pelo Bradford médio"""
+    bradford = profiles.loc[cluster_id, 'bradford_disruptivo']
+    if bradford < 50:
+        return f'Cluster {cluster_id}: Baixo Risco'
+    elif bradford < 150:
+        return f'Cluster {cluster_id}: Risco Moderado'
+    elif bradford < 300:
+        return f'Cluster {cluster_id}: Alto Risco'
+    else:
+        return f'Cluster {cluster_id}: Risco Crítico'
+
+
+def aplicar_clustering(df_cluster, X_scaled, k, random_state=RANDOM_STATE, features=FEATURES_CLUSTERING, modo='auto'):
+    """PASSO 8.3: devolve (df_cluster com cluster e cluster_nome, cluster_profiles)"""
+    kmeans_final = modelo_kmeans(k, resolver_modo(modo, len(X_scaled)), random_state)
+    df_cluster = df_cluster.assign(cluster=kmeans_final.fit_predict(X_scaled))
+
+    cluster_profiles = df_cluster.groupby('cluster')[features].mean().round(1)
+    df_cluster['cluster_nome'] = df_cluster['cluster'].map(
+        {c: nomear_cluster(c, cluster_profiles) for c in cluster_profiles.index}
+    )
+    return df_cluster, cluster_profiles
@@ -0,0 +1,146 @@
+"""
+Análise de cohorts por senioridade (DtActivacao) - Grupo 7
+
+Os registos de colaboradores ativos são reduzidos uma vez a contagens
+aditivas por (colaborador, DtActivacao, mês) com tabela_cohorts. A partir
+daí, a senioridade é calculada por colaborador (não por registo) e a cohort
+atribuída com np.digitize, por isso as taxas por cohort para qualquer data de
+referência (taxas_cohort) ou a série mensal de taxas por cohort
+(serie_mensal_cohorts) são um único groupby sobre a tabela pequena.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.limpeza import NIVEL1_BASE, NIVEL1_FALTAS
+
+BINS_SENIORIDADE = [0, 1, 2, 3, 5, 100]
+LABELS_SENIORIDADE = ['<1 ano', '1-2 anos', '2-3 anos', '3-5 anos', '>5 anos']
+
+
+def _datas(serie):
+    """Serie (categórica ou texto) -> datetime64; inválidas como NaT (categóricas: só converte as categorias)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = pd.to_datetime(serie.cat.categories.astype(object), errors='coerce').to_numpy()
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, categorias[codigos], np.datetime64('NaT'))
+    return pd.to_datetime(serie.astype(object), errors='coerce').to_numpy()
+
+
+def tabela_cohorts(df_base_absentismo):
+    """
+    Contagens por (login_colaborador, activacao, mes) dos registos com
+    'Activo?' == 'Sim' e DtActivacao válida: dias_base (Nivel 1 em
+    NIVEL1_BASE) e dias_falta (Nivel 1 em NIVEL1_FALTAS)
+    """
+    df = df_base_absentismo
+    activacao = _datas(df['DtActivacao'])
+    valido = (df['Activo?'] == 'Sim').to_numpy() & ~np.isnat(activacao)
+    login = df['login_colaborador']
+    if isinstance(login.dtype, pd.CategoricalDtype):
+        codigos, logins = login.cat.codes.to_numpy(), login.cat.categories
+    else:
+        codigos, logins = pd.factorize(login.to_numpy())
+    nivel = df['Nivel 1']
+
+    df = pd.DataFrame({
+        'colaborador': codigos[valido],
+        'activacao': activacao[valido].astype('datetime64[D]').astype(np.int64),
+        'mes': df['Data'].to_numpy()[valido].astype('datetime64[M]').astype(np.int64),
+        'dias_base': nivel.isin(NIVEL1_BASE).to_numpy()[valido],
+        'dias_falta': nivel.isin(NIVEL1_FALTAS).to_numpy()[valido],
+    })
+    tabela = df.groupby(['colaborador', 'activacao', 'mes'], sort=False).sum().reset_index()
+    return pd.DataFrame({
+        'login_colaborador': np.asarray(logins, dtype=object)[tabela['colaborador'].to_numpy()],
+        'activacao': tabela['activacao'].to_numpy().astype('datetime64[D]'),
+        'mes': tabela['mes'].to_numpy().astype('datetime64[M]'),
+        'dias_base': tabela['dias_base'].to_numpy(),
+        'dias_falta': tabela['dias_falta'].to_numpy(),
+    })
+
+
+def senioridade(activacao, data_ref):
+    """Anos (dias / 365.25) entre activacao e data_ref (escalar ou um valor por activação)"""
+    referencia = np.asarray(pd.to_datetime(data_ref), dtype='datetime64[D]')
+    dias = referencia - np.asarray(activacao, dtype='datetime64[D]')
+    return dias.astype(np.int64) / 365.25
+
+
+def banda_senioridade(anos):
+    """
+    Índice da cohort em LABELS_SENIORIDADE de cada senioridade (intervalos
+    (a, b] de BINS_SENIORIDADE, como pd.cut); -1 fora dos intervalos
+    """
+    banda = np.digitize(anos, BINS_SENIORIDADE, right=True) - 1
+    return np.where((banda >= 0) & (banda < len(LABELS_SENIORIDADE)), banda, -1)
+
+
+def _meses(tabela, inicio=None, fim=None):
+    """Máscara dos meses de tabela entre inicio e fim (incluídos; aceites por pd.Period)"""
+    meses = tabela['mes'].to_numpy().astype('datetime64[M]')
+    mascara = np.ones(len(meses), dtype=bool)
+    if inicio is not None:
+        mascara &= meses >= np.datetime64(pd.Period(inicio, 'M').start_time, 'M')
+    if fim is not None:
+        mascara &= meses <= np.datetime64(pd.Period(fim, 'M').start_time, 'M')
+    return mascara
+
+
+def _estatisticas(df, chaves):
+    """
+    Estatísticas por cohort (e chaves) de contagens com coluna banda: cada
+    colaborador conta uma vez por cohort, se tiver dias de base
+    """
+    df = df[df['banda'] >= 0]
+    colaborador = df.groupby(chaves + ['banda', 'login_colaborador'], sort=True)[['dias_base', 'dias_falta']].sum()
+    colaborador = colaborador[colaborador['dias_base'] > 0]
+    stats = colaborador.groupby(level=chaves + ['banda'], sort=True).agg(
+        num_colaboradores=('dias_base', 'size'),
+        total_base=('dias_base', 'sum'),
+        total_faltas=('dias_falta', 'sum'),
+    ).reset_index()
+
+    stats['cohort'] = pd.Categorical.from_codes(stats.pop('banda'), categories=LABELS_SENIORIDADE, ordered=True)
+    stats['taxa_absentismo'] = stats['total_faltas'] / stats['total_base'] * 100
+    stats['media_faltas_colab'] = stats['total_faltas'] / stats['num_colaboradores']
+    return stats.set_index(chaves + ['cohort'])
+
+
+def taxas_cohort(tabela, data_ref, inicio=None, fim=None):
+    """
+    Taxa de absentismo por cohort, com a senioridade em relação a data_ref,
+    sobre os meses de tabela (tabela_cohorts) entre inicio e fim
+
+    Devolve cohort_stats indexado por cohort (num_colaboradores, total_base,
+    total_faltas, taxa_absentismo, media_faltas_colab).
+    """
+    df = tabela[_meses(tabela, inicio, fim)]
+    df = df.assign(banda=banda_senioridade(senioridade(df['activacao'], data_ref)))
+    return _estatisticas(df, [])
+
+
+def serie_mensal_cohorts(tabela, inicio=None, fim=None):
+    """
+    Taxa de absentismo por (mês, cohort), com a senioridade em relação ao
+    último dia de cada mês; uma linha por mês e cohort com colaboradores
+    """
+    df = tabela[_meses(tabela, inicio, fim)]
+    meses = df['mes'].to_numpy().astype('datetime64[M]')
+    fim_mes = (meses + 1).astype('datetime64[D]') - 1
+    df = df.assign(
+        ano_mes=np.datetime_as_string(meses),
+        banda=banda_senioridade(senioridade(df['activacao'], fim_mes)),
+    )
+    return _estatisticas(df, ['ano_mes']).reset_index()
+
+
+def cohorts_senioridade(df_base_absentismo, ano, data_ref):
+    """
+    PASSO 7.1: taxa de absentismo por cohort de senioridade
+
+    Considera os registos do ano de colaboradores ativos; a senioridade é
+    calculada em relação a data_ref. Devolve cohort_stats indexado por cohort
+    (num_colaboradores, total_base, total_faltas, taxa_absentismo,
+    media_faltas_colab).
+    """
+    return taxas_cohort(tabela_cohorts(df_base_absentismo), data_ref, f'{ano}-01', f'{ano}-12')
@@ -0,0 +1,168 @@
+"""
+Análise comparativa entre períodos (Grupo 9)
+
+Os registos e os spells são reduzidos uma vez a contagens diárias aditivas
+(contagens_diarias: dias de base, dias de falta, spells iniciados e os seus
+dias). comparar_periodos compara N períodos quaisquer (anos, trimestres,
+meses ou intervalos de datas), alinhados por mês ou por semana ISO desde o
+início de cada período, num único groupby sobre essas contagens:
+
+    contagens = contagens_diarias(df_base_absentismo, df_spells)
+    totais, detalhe = comparar_periodos(contagens, ['2024', '2025'], 'mes', num_posicoes=6)
+    totais, detalhe = comparar_periodos(contagens, ['2025-05', '2025-06'], 'semana')
+
+Por semana, como no calendário ISO, cada semana pertence ao período que
+contém a sua quinta-feira: a posição 0 de '2027' é a semana 2027-W01 (e não
+2026-W53, que contém 1 a 3 de janeiro) e os dias de semanas de outro período
+ficam de fora.
+
+comparar_anos (mesmos meses de cada ano, PASSOS 9.2 e 9.3) é o caso anual.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import numero_dia
+from absentismo.limpeza import NIVEL1_BASE, NIVEL1_FALTAS
+
+ANOS_COMPARACAO = [2024, 2025]
+MES_MAX_COMPARACAO = 6  # Jan-Jun
+
+ALINHAMENTOS = ['mes', 'semana']
+MEDIDAS = ['dias_base', 'dias_falta', 'num_spells', 'dias_spells']
+
+
+def contagens_diarias(df_base_absentismo, df_spells):
+    """
+    Contagens por dia (índice data): dias_base e dias_falta dos registos e
+    num_spells / dias_spells dos spells pela data de início
+    """
+    dia = numero_dia(df_base_absentismo['Data'])
+    inicio_spell = numero_dia(df_spells['data_inicio'])
+    if len(dia) == 0:
+        return pd.DataFrame(columns=MEDIDAS, index=pd.DatetimeIndex([], name='data'), dtype=np.int64)
+
+    primeiro = min(dia.min(), inicio_spell.min()) if len(inicio_spell) else dia.min()
+    ultimo = max(dia.max(), inicio_spell.max()) if len(inicio_spell) else dia.max()
+    num_dias = int(ultimo - primeiro + 1)
+    nivel = df_base_absentismo['Nivel 1']
+
+    def contar(dias, pesos=None):
+        return np.bincount(dias - primeiro, weights=pesos, minlength=num_dias).astype(np.int64)
+
+    contagens = pd.DataFrame({
+        'dias_base': contar(dia[nivel.isin(NIVEL1_BASE).to_numpy()]),
+        'dias_falta': contar(dia[nivel.isin(NIVEL1_FALTAS).to_numpy()]),
+        'num_spells': contar(inicio_spell),
+        'dias_spells': contar(inicio_spell, df_spells['duracao_dias'].to_numpy()),
+    }, index=pd.DatetimeIndex(np.arange(primeiro, ultimo + 1).astype('datetime64[D]'), name='data'))
+    return contagens
+
+
+def intervalo(periodo):
+    """
+    (rótulo, primeiro dia, último dia) de um período: texto aceite por
+    pd.Period ('2025', '2025Q1', '2025-03') ou par (início, fim) de datas
+    """
+    if isinstance(periodo, (tuple, list)):
+        inicio, fim = (pd.Timestamp(d).normalize() for d in periodo)
+        return f'{inicio:%Y-%m-%d} a {fim:%Y-%m-%d}', inicio, fim
+    p = pd.Period(periodo)
+    return str(p), p.start_time.normalize(), p.end_time.normalize()
+
+
+def _posicoes(datas, inicio, fim, alinhamento):
+    """
+    Posição de cada dia no período: meses ou semanas ISO (segunda a domingo)
+    desde o início. A semana 0 é a primeira com quinta-feira no período; dias
+    de semanas cuja quinta-feira está fora do período têm posição -1.
+    """
+    if alinhamento == 'mes':
+        return (datas.astype('datetime64[M]') - np.datetime64(inicio, 'M')).astype(np.int64)
+    dia = datas.astype(np.int64)
+    quinta = dia - (dia + 3) % 7 + 3  # 1970-01-01 foi quinta-feira
+    inicio, fim = numero_dia(pd.DatetimeIndex([inicio, fim]))
+    primeira = inicio + (3 - (inicio + 3) % 7) % 7
+    return np.where((quinta >= inicio) & (quinta <= fim), (quinta - primeira) // 7, -1)
+
+
+def _taxas(df):
+    df['taxa_absentismo'] = (df['dias_falta'] / df['dias_base'].where(df['dias_base'] > 0) * 100).fillna(0)
+    df['duracao_media_spell'] = (df['dias_spells'] / df['num_spells'].where(df['num_spells'] > 0)).fillna(0)
+    return df
+
+
+def comparar_periodos(contagens, periodos, alinhamento='mes', num_posicoes=None):
+    """
+    Compara períodos (lista; ver intervalo) sobre contagens (contagens_diarias)
+
+    Cada dia de um período tem uma posição (mês ou semana ISO desde o início
+    do período; ver _posicoes); com num_posicoes só contam as primeiras num_posicoes posições
+    de cada período (ex.: 6 para Jan-Jun de cada ano). Devolve (totais,
+    detalhe): totais com uma linha por período e detalhe com uma linha por
+    (período, posição) com dias de base, ambos com dias_base, dias_falta
+    (dias perdidos), num_spells, dias_spells, taxa_absentismo e
+    duracao_media_spell.
+    """
+    if alinhamento not in ALINHAMENTOS:
+        raise ValueError(f'Alinhamento inválido: {alinhamento} (esperado: {ALINHAMENTOS})')
+    intervalos = [intervalo(p) for p in periodos]
+    datas = contagens.index.to_numpy().astype('datetime64[D]')
+    valores = contagens[MEDIDAS].to_numpy()
+
+    # Dias de cada período (um dia pode estar em vários períodos: janelas móveis)
+    linhas, chaves = [], []
+    for i, (_, inicio, fim) in enumerate(intervalos):
+        dentro = np.flatnonzero((datas >= np.datetime64(inicio, 'D')) & (datas <= np.datetime64(fim, 'D')))
+        posicao = _posicoes(datas[dentro], inicio, fim, alinhamento)
+        usar = (posicao >= 0) if num_posicoes is None else (posicao >= 0) & (posicao < num_posicoes)
+        dentro, posicao = dentro[usar], posicao[usar]
+        linhas.append(dentro)
+        chaves.append(np.column_stack([np.full(len(dentro), i), posicao, datas[dentro].astype(np.int64)]))
+    linhas, chaves = np.concatenate(linhas), np.concatenate(chaves)
+
+    df = pd.DataFrame(valores[linhas], columns=MEDIDAS)
+    df['periodo'], df['posicao'], df['inicio'] = chaves[:, 0], chaves[:, 1], chaves[:, 2]
+    detalhe = df.groupby(['periodo', 'posicao'], sort=True).agg(
+        inicio=('inicio', 'min'), **{m: (m, 'sum') for m in MEDIDAS}
+    ).reset_index()
+
+    totais = detalhe.groupby('periodo')[MEDIDAS].sum().reindex(range(len(intervalos)), fill_value=0)
+    totais.insert(0, 'periodo', [rotulo for rotulo, _, _ in intervalos])
+    totais = _taxas(totais.reset_index(drop=True))
+
+    detalhe = detalhe[detalhe['dias_base'] > 0].reset_index(drop=True)
+    detalhe['inicio'] = detalhe['inicio'].to_numpy().astype('datetime64[D]')
+    if alinhamento == 'semana':
+        # Início da semana (pode ser anterior ao período)
+        detalhe['inicio'] = detalhe['inicio'] - pd.to_timedelta(detalhe['inicio'].dt.weekday, unit='D')
+    detalhe['periodo'] = detalhe['periodo'].map(dict(enumerate(totais['periodo'])))
+    return totais, _taxas(detalhe)
+
+
+def comparar_anos(df_base_absentismo, df_spells, anos=ANOS_COMPARACAO, mes_max=MES_MAX_COMPARACAO, contagens=None):
+    """
+    PASSOS 9.2 e 9.3: métricas globais e taxa mensal por ano (meses 1..mes_max)
+
+    contagens: contagens_diarias já calculadas (evita recalculá-las).
+    Devolve (df_metricas_comp, df_comp_mensal).
+    """
+    if contagens is None:
+        contagens = contagens_diarias(df_base_absentismo, df_spells)
+    totais, detalhe = comparar_periodos(contagens, [str(a) for a in anos], 'mes', num_posicoes=mes_max)
+
+    df_metricas_comp = pd.DataFrame({
+        'Ano': list(anos),
+        'Base': totais['dias_base'],
+        'Faltas': totais['dias_falta'],
+        'Taxa Absentismo (%)': totais['taxa_absentismo'],
+        'Num Spells': totais['num_spells'],
+        'Duração Média Spell': totais['duracao_media_spell'],
+    })
+    df_comp_mensal = pd.DataFrame({
+        'ano': detalhe['inicio'].dt.year,
+        'mes': detalhe['inicio'].dt.month,
+        'base': detalhe['dias_base'],
+        'faltas': detalhe['dias_falta'],
+        'taxa_abs': detalhe['taxa_absentismo'],
+    })
+    return df_metricas_comp, df_comp_mensal
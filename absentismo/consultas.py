@@ -0,0 +1,212 @@
+"""
+Consultas ad hoc de taxas por segmento e período, sobre o cubo de contagens
+
+    from absentismo.consultas import carregar_cubo, consultar
+    carregar_cubo()
+    consultar('taxa_absentismo',
+              filtros={'operacao': 'TAAG', 'categoria_profissional': 'ACC'},
+              periodos=['2025Q1', '2024Q1'])
+
+A taxa de absentismo é Faltas / (Trabalho Pago + Faltas) * 100, como nos
+notebooks. Cada consulta é normalizada (filtros ordenados com valores em
+tuplos, períodos como intervalos de números de dia, agrupamento em tuplo) e
+o resultado fica numa cache LRU com essa chave. As contagens de cada
+(filtros, período, agrupamento) e o recorte do cubo de cada (filtros,
+período) têm cache própria, por isso pedir outra taxa, outro agrupamento ou
+juntar um período a uma comparação já feita reutiliza o que já foi calculado.
+"""
+import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from absentismo.cubo import DIMENSOES, DIMENSOES_DERIVADAS, agregar, dimensao
+from absentismo.datas import numero_dia
+
+# taxa: (numerador, denominador) sobre as medidas do cubo
+TAXAS = {
+    'taxa_absentismo': ('dias_falta', 'dias_base'),
+    'taxa_atrasos': ('dias_atraso', 'dias_trabalho'),
+}
+
+TAMANHO_CACHE = 512
+
+# Cubo consultado (definido por definir_cubo / carregar_cubo)
+_CUBO = None
+
+
+def definir_cubo(df_cubo):
+    """Passa a consultar df_cubo (limpa as caches)"""
+    global _CUBO
+    _CUBO = df_cubo
+    limpar_cache()
+
+
+def carregar_cubo(**opcoes_pipeline):
+    """Lê df_cubo do pipeline (opções como em pipeline.executar) e passa a consultá-lo"""
+    from absentismo.pipeline import executar
+
+    opcoes_pipeline.setdefault('verbose', False)
+    definir_cubo(executar(['df_cubo'], **opcoes_pipeline)['df_cubo'])
+    return _CUBO
+
+
+def limpar_cache():
+    for funcao in (_consulta, _contagens, _recorte):
+        funcao.cache_clear()
+
+
+def info_cache():
+    """Estatísticas (hits, misses, tamanho) de cada nível de cache"""
+    return {funcao.__name__.lstrip('_'): funcao.cache_info() for funcao in (_consulta, _contagens, _recorte)}
+
+
+# ======================================================================
+# NORMALIZAÇÃO
+# ======================================================================
+
+def intervalo_periodo(periodo):
+    """
+    (rótulo, primeiro dia, último dia) de um período
+
+    periodo pode ser None (tudo), um texto aceite por pd.Period ('2025',
+    '2025Q1', '2025-03') ou um par (início, fim) de datas, ambas incluídas.
+    """
+    if periodo is None:
+        return ('Total', None, None)
+    if isinstance(periodo, (tuple, list)):
+        if not _par_de_datas(periodo):
+            raise ValueError(f'Intervalo deve ser um par (início, fim) de datas: {periodo!r}')
+        inicio, fim = (pd.Timestamp(d) for d in periodo)
+        rotulo = f'{inicio:%Y-%m-%d} a {fim:%Y-%m-%d}'
+    else:
+        p = pd.Period(periodo)
+        inicio, fim, rotulo = p.start_time, p.end_time, str(p)
+    dia_inicio, dia_fim = numero_dia([inicio, fim])
+    if dia_inicio > dia_fim:
+        raise ValueError(f'Período com início depois do fim: {periodo}')
+    return (rotulo, int(dia_inicio), int(dia_fim))
+
+
+def _e_data(valor):
+    """Data concreta (Timestamp, date, datetime64 ou texto de um dia) e não rótulo de período ('2025Q1')"""
+    if isinstance(valor, (pd.Timestamp, datetime.date, np.datetime64)):
+        return True
+    if not isinstance(valor, str):
+        return False
+    try:
+        p = pd.Period(valor)
+    except ValueError:
+        return False
+    return p.start_time.normalize() == p.end_time.normalize()
+
+
+def _par_de_datas(periodo):
+    return len(periodo) == 2 and all(_e_data(d) for d in periodo)
+
+
+def _lista_periodos(periodos):
+    """
+    Lista de períodos: um tuplo só é um intervalo se tiver exatamente duas
+    datas; um tuplo de rótulos ('2024Q1', '2025Q1') é uma lista de períodos
+    """
+    if periodos is None or isinstance(periodos, str):
+        return [periodos]
+    if isinstance(periodos, tuple):
+        if _par_de_datas(periodos):
+            return [periodos]
+        if any(_e_data(p) for p in periodos):
+            raise ValueError(
+                f'Tuplo de períodos ambíguo: {periodos!r} (intervalo: par (início, fim) de datas; '
+                'vários períodos: lista de rótulos ou de pares)'
+            )
+    return list(periodos)
+
+
+def _valor(v):
+    """Escalares numpy passam a tipos Python (chaves estáveis)"""
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def normalizar_filtros(filtros):
+    """{dimensão: valor ou lista} -> tuplo ordenado de (dimensão, tuplo de valores)"""
+    normalizados = []
+    for nome, valores in (filtros or {}).items():
+        if nome not in DIMENSOES + DIMENSOES_DERIVADAS:
+            raise KeyError(f'Dimensão desconhecida: {nome} (disponíveis: {DIMENSOES + DIMENSOES_DERIVADAS})')
+        if isinstance(valores, (str, bytes)) or not np.iterable(valores):
+            valores = [valores]
+        normalizados.append((nome, tuple(sorted({_valor(v) for v in valores}, key=str))))
+    return tuple(sorted(normalizados))
+
+
+def _normalizar_por(por):
+    por = (por,) if isinstance(por, str) else tuple(por)
+    desconhecidas = [d for d in por if d not in DIMENSOES + DIMENSOES_DERIVADAS]
+    if desconhecidas:
+        raise KeyError(f'Dimensões desconhecidas: {desconhecidas}')
+    return por
+
+
+def normalizar_consulta(taxa='taxa_absentismo', filtros=None, periodos=None, por=()):
+    """Chave canónica (hashable) de uma consulta"""
+    if taxa not in TAXAS:
+        raise ValueError(f'Taxa desconhecida: {taxa} (disponíveis: {list(TAXAS)})')
+    periodos = _lista_periodos(periodos)
+    return (taxa, normalizar_filtros(filtros), tuple(intervalo_periodo(p) for p in periodos), _normalizar_por(por))
+
+
+# ======================================================================
+# CACHE EM NÍVEIS
+# ======================================================================
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _recorte(filtros, dia_inicio, dia_fim):
+    """Linhas do cubo dentro dos filtros e do período"""
+    if _CUBO is None:
+        raise RuntimeError('Nenhum cubo definido: chamar carregar_cubo() ou definir_cubo(df_cubo)')
+    mascara = np.ones(len(_CUBO), dtype=bool)
+    if dia_inicio is not None:
+        dias = _CUBO['dia'].values
+        mascara &= (dias >= dia_inicio) & (dias <= dia_fim)
+    for nome, valores in filtros:
+        mascara &= dimensao(_CUBO, nome).isin(valores).values
+    return _CUBO[mascara]
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _contagens(filtros, dia_inicio, dia_fim, por):
+    """Medidas do recorte, agrupadas por (uma linha se por vazio)"""
+    recorte = _recorte(filtros, dia_inicio, dia_fim)
+    if not por:
+        return agregar(recorte).to_frame().T.reset_index(drop=True)
+    return agregar(recorte, por).reset_index()
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _consulta(taxa, filtros, periodos, por):
+    numerador, denominador = TAXAS[taxa]
+    partes = []
+    for rotulo, dia_inicio, dia_fim in periodos:
+        df = _contagens(filtros, dia_inicio, dia_fim, por)[list(por) + [numerador, denominador]]
+        partes.append(df.assign(periodo=rotulo))
+
+    df = pd.concat(partes, ignore_index=True)
+    df[taxa] = (df[numerador] / df[denominador].where(df[denominador] > 0) * 100).fillna(0)
+    return df[['periodo'] + list(por) + [numerador, denominador, taxa]]
+
+
+def consultar(taxa='taxa_absentismo', filtros=None, periodos=None, por=()):
+    """
+    Taxa por período (e por cada combinação das dimensões em por)
+
+    filtros: {dimensão: valor ou lista de valores}, com dimensões do cubo
+    (operacao, categoria_profissional) ou derivadas (ano, mes, dia_semana, ...).
+    periodos: um período ou lista de períodos (ver intervalo_periodo); um
+    tuplo é um intervalo só se for um par de datas ('2025-01-01',
+    '2025-03-31'); um tuplo de rótulos ('2024Q1', '2025Q1') é lido como lista.
+    Devolve um DataFrame com periodo, as dimensões de por, numerador,
+    denominador e a taxa em %.
+    """
+    return _consulta(*normalizar_consulta(taxa, filtros, periodos, por)).copy()
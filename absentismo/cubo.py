@@ -0,0 +1,140 @@
+"""
+Cubo de contagens aditivas por operação × categoria profissional × dia
+
+Em vez de um groupby(...).size() sobre df_base_absentismo/df_faltas para cada
+numerador e denominador, as contagens diárias são materializadas uma vez:
+
+    operacao, categoria_profissional  categóricas (códigos inteiros)
+    dia                               número de dia (int32, dias desde 1970)
+    dias_base                         Trabalho Pago + faltas
+    dias_falta                        Falta Justificada + Falta Injustificada
+    dias_trabalho                     Trabalho Pago
+    dias_atraso                       Atraso (hierarquia de atrasos)
+
+Taxas, contribuições e tabelas de Pareto são roll-ups deste cubo (algumas
+dezenas de milhares de linhas) com agregar/taxas/pareto.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import atributos_dia, dimensao_para
+from absentismo.limpeza import NIVEL1_FALTAS
+
+DIMENSOES = ['operacao', 'categoria_profissional', 'dia']
+MEDIDAS = ['dias_base', 'dias_falta', 'dias_trabalho', 'dias_atraso']
+
+# Dimensões obtidas a partir de 'dia' (dimensão de calendário de datas.py) no momento do roll-up
+DIMENSOES_DERIVADAS = ['data', 'ano', 'mes', 'ano_mes', 'dia_semana', 'dia_mes', 'ano_iso', 'semana_iso', 'periodo_mes']
+
+
+def _categorias(*series):
+    """Valores distintos (ordenados, sem nulos) de várias colunas"""
+    valores = pd.concat([pd.Series(s, dtype=object) for s in series], ignore_index=True)
+    return pd.Index(sorted(valores.dropna().unique()))
+
+
+def construir_cubo(df_base_absentismo, df_atrasos):
+    """Cubo de contagens (uma linha por operação, categoria e dia com registos)"""
+    partes = (df_base_absentismo, df_atrasos)
+    categorias = {
+        coluna: _categorias(*(df[coluna].astype(object) for df in partes))
+        for coluna in DIMENSOES[:2]
+    }
+    dias = [df['Data'].values.astype('datetime64[D]').astype(np.int64) for df in partes]
+    dia_min = min((d.min() for d in dias if len(d)), default=0)
+    num_dias = max((d.max() for d in dias if len(d)), default=0) - dia_min + 1
+
+    # Chave única por (operação, categoria, dia); código -1 (nulo) passa a 0
+    chaves = []
+    for df, dia in zip(partes, dias):
+        chave = np.zeros(len(df), dtype=np.int64)
+        for coluna in DIMENSOES[:2]:
+            codigos = pd.Categorical(df[coluna].astype(object), categories=categorias[coluna]).codes
+            chave = chave * (len(categorias[coluna]) + 1) + codigos + 1
+        chaves.append(chave * num_dias + (dia - dia_min))
+
+    unicas, inverso = np.unique(np.concatenate(chaves), return_inverse=True)
+    inv_base, inv_atrasos = inverso[:len(chaves[0])], inverso[len(chaves[0]):]
+    nivel_base = df_base_absentismo['Nivel 1']
+    n = len(unicas)
+
+    medidas = {
+        'dias_base': np.bincount(inv_base, minlength=n),
+        'dias_falta': np.bincount(inv_base[nivel_base.isin(NIVEL1_FALTAS).values], minlength=n),
+        'dias_trabalho': np.bincount(inv_base[(nivel_base == 'Trabalho Pago').values], minlength=n),
+        'dias_atraso': np.bincount(inv_atrasos[(df_atrasos['Nivel 1'] == 'Atraso').values], minlength=n),
+    }
+
+    # Descodificar a chave
+    dia = unicas % num_dias + dia_min
+    resto = unicas // num_dias
+    num_cat = len(categorias['categoria_profissional']) + 1
+    cubo = pd.DataFrame({
+        'operacao': pd.Categorical.from_codes(resto // num_cat - 1, categories=categorias['operacao']),
+        'categoria_profissional': pd.Categorical.from_codes(resto % num_cat - 1, categories=categorias['categoria_profissional']),
+        'dia': dia.astype(np.int32),
+    })
+    for nome in MEDIDAS:
+        cubo[nome] = medidas[nome].astype(np.int32)
+    return cubo
+
+
+def combinar_cubos(cubos):
+    """Soma cubos parciais (por exemplo de partições disjuntas de colaboradores)"""
+    cubos = list(cubos)
+    categorias = {coluna: _categorias(*(c[coluna].astype(object) for c in cubos)) for coluna in DIMENSOES[:2]}
+    juntos = pd.concat([
+        c.assign(**{coluna: pd.Categorical(c[coluna].astype(object), categories=categorias[coluna]) for coluna in categorias})
+        for c in cubos
+    ], ignore_index=True)
+    cubo = juntos.groupby(DIMENSOES, observed=True, dropna=False)[MEDIDAS].sum().reset_index()
+    for nome in MEDIDAS:
+        cubo[nome] = cubo[nome].astype(np.int32)
+    cubo['dia'] = cubo['dia'].astype(np.int32)
+    return cubo
+
+
+def dimensao(cubo, nome):
+    """Coluna de dimensão (guardada ou derivada de 'dia') com o nome dado"""
+    if nome in DIMENSOES:
+        return cubo[nome]
+    if nome not in DIMENSOES_DERIVADAS:
+        raise KeyError(f'Dimensão desconhecida: {nome} (disponíveis: {DIMENSOES + DIMENSOES_DERIVADAS})')
+
+    valores = atributos_dia(cubo['dia'], dimensao_para(cubo['dia']), nome)
+    if nome == 'ano_mes':
+        return valores.astype(str)
+    return valores if nome == 'data' else valores.astype(np.int64)
+
+
+def agregar(cubo, por=()):
+    """Roll-up das medidas pelas dimensões em por (vazio: totais, como Series)"""
+    por = [por] if isinstance(por, str) else list(por)
+    if not por:
+        return cubo[MEDIDAS].sum()
+    return cubo[MEDIDAS].groupby([dimensao(cubo, d) for d in por], observed=True).sum()
+
+
+def _com_taxas(df):
+    df['taxa_absentismo'] = (df['dias_falta'] / df['dias_base'].where(df['dias_base'] > 0) * 100).fillna(0)
+    df['taxa_atrasos'] = (df['dias_atraso'] / df['dias_trabalho'].where(df['dias_trabalho'] > 0) * 100).fillna(0)
+    total_faltas = df['dias_falta'].sum()
+    df['contribuicao_pct'] = df['dias_falta'] / total_faltas * 100 if total_faltas > 0 else 0.0
+    return df
+
+
+def taxas(cubo, por=()):
+    """
+    Roll-up com taxa de absentismo (faltas / base), taxa de atrasos
+    (atrasos / trabalho pago) e contribuição para o total de faltas, em %
+    """
+    if isinstance(por, str) or por:
+        return _com_taxas(agregar(cubo, por))
+    return _com_taxas(agregar(cubo).to_frame().T).iloc[0].rename(None)
+
+
+def pareto(cubo, por='operacao'):
+    """Segmentos por contribuição decrescente, com a contribuição acumulada"""
+    df = taxas(cubo, por).sort_values('contribuicao_pct', ascending=False)
+    df['contribuicao_acumulada'] = df['contribuicao_pct'].cumsum()
+    return df
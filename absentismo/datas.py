@@ -0,0 +1,141 @@
+"""
+Conversões entre datas e número de dia inteiro (dias desde 1970-01-01)
+
+O número de dia é a chave de uma dimensão de calendário (dimensao_datas):
+uma linha por dia com dia da semana, semana ISO, ano-mês, período do mês,
+feriado e dia útil. As tabelas de factos guardam só a data (ou o número de
+dia) e os atributos são obtidos por posição com atributos_dia, calculados
+uma vez por dia distinto em vez de uma vez por registo:
+
+    dimensao = dimensao_datas('2024-01-01', '2025-12-31', indice_feriados)
+    atributos_dia(df['Data'], dimensao, ['nome_dia', 'ano_mes'])
+"""
+import numpy as np
+import pandas as pd
+
+# Nomes dos dias (como Series.dt.day_name), indexados por segunda=0 ... domingo=6
+DIAS_SEMANA = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                       dtype=object)
+
+# Períodos do mês (Grupo 3): dias 1-3, 4-6, ..., 25-27, 28-31
+LIMITES_PERIODO_MES = [3, 6, 9, 12, 15, 18, 21, 24, 27]
+
+COLUNAS_DIMENSAO = ['data', 'ano', 'mes', 'ano_mes', 'dia_mes', 'dia_semana', 'nome_dia',
+                    'ano_iso', 'semana_iso', 'periodo_mes', 'feriado', 'dia_util']
+
+
+def numero_dia(datas):
+    """Converte datas (Series, Index ou array) em número de dia int64"""
+    valores = np.asarray(datas, dtype='datetime64[ns]')
+    return valores.astype('datetime64[D]').astype(np.int64)
+
+
+def data_do_dia(dias):
+    """Converte números de dia em datas (datetime64[ns])"""
+    return np.asarray(dias, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def dia_semana(dias):
+    """Índice do dia da semana (segunda=0) a partir do número de dia (1970-01-01 foi quinta)"""
+    return (np.asarray(dias, dtype=np.int64) + 3) % 7
+
+
+def ordenar_colaborador_dia(df, coluna_colaborador='login_colaborador', coluna_data='Data'):
+    """
+    Ordena (estável) as linhas por colaborador e dia
+
+    Devolve (ordem, inicios): a permutação das linhas e a posição, dentro dessa
+    ordem, onde começa cada grupo (colaborador, dia).
+    """
+    login_cod, _ = pd.factorize(df[coluna_colaborador], sort=True)
+    dia = numero_dia(df[coluna_data])
+
+    ordem = np.lexsort((dia, login_cod))
+    login_ord = login_cod[ordem]
+    dia_ord = dia[ordem]
+
+    novo = np.ones(len(df), dtype=bool)
+    novo[1:] = (login_ord[1:] != login_ord[:-1]) | (dia_ord[1:] != dia_ord[:-1])
+    return ordem, np.flatnonzero(novo)
+
+
+def periodo_mes(dias):
+    """Índice do período de 3 dias do mês (0 = dias 1-3, 9 = dias 28-31)"""
+    return np.digitize(np.asarray(dias), LIMITES_PERIODO_MES, right=True)
+
+
+# ======================================================================
+# DIMENSÃO DE CALENDÁRIO
+# ======================================================================
+
+def _numero(valor):
+    """Número de dia de uma data (ou de um número de dia)"""
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    return int(numero_dia([pd.Timestamp(valor)])[0])
+
+
+def dimensao_datas(primeiro, ultimo, indice_feriados=()):
+    """
+    Dimensão de calendário de primeiro a ultimo (datas ou números de dia,
+    incluídos), indexada pelo número de dia, com COLUNAS_DIMENSAO
+
+    dia_semana é 0 à segunda; nome_dia e ano_mes são categóricas (nome_dia
+    ordenada de segunda a domingo); feriado usa indice_feriados (números de
+    dia ordenados, ver feriados.indice_feriados) e dia_util é segunda a
+    sexta sem feriado.
+    """
+    dia = np.arange(_numero(primeiro), _numero(ultimo) + 1, dtype=np.int64)
+    dias = dia.astype('datetime64[D]')
+    meses = dias.astype('datetime64[M]')
+    semana = dia_semana(dia)
+
+    # Semana ISO: a da quinta-feira da mesma semana (segunda a domingo)
+    quinta = (dia - semana + 3).astype('datetime64[D]')
+    anos_iso = quinta.astype('datetime64[Y]')
+    indice = np.asarray(indice_feriados, dtype=np.int64)
+    feriado = np.isin(dia, indice)
+    nomes_mes, codigos_mes = np.unique(np.datetime_as_string(meses), return_inverse=True)
+
+    return pd.DataFrame({
+        'data': data_do_dia(dia),
+        'ano': (dias.astype('datetime64[Y]').astype(np.int64) + 1970).astype(np.int16),
+        'mes': (meses.astype(np.int64) % 12 + 1).astype(np.int8),
+        'ano_mes': pd.Categorical.from_codes(codigos_mes, categories=nomes_mes),
+        'dia_mes': ((dias - meses).astype(np.int64) + 1).astype(np.int8),
+        'dia_semana': semana.astype(np.int8),
+        'nome_dia': pd.Categorical.from_codes(semana, categories=DIAS_SEMANA, ordered=True),
+        'ano_iso': (anos_iso.astype(np.int64) + 1970).astype(np.int16),
+        'semana_iso': ((quinta - anos_iso.astype('datetime64[D]')).astype(np.int64) // 7 + 1).astype(np.int8),
+        'periodo_mes': periodo_mes((dias - meses).astype(np.int64) + 1).astype(np.int8),
+        'feriado': feriado,
+        'dia_util': (semana < 5) & ~feriado,
+    }, index=pd.Index(dia, name='dia'))
+
+
+def dimensao_para(datas, indice_feriados=()):
+    """Dimensão de calendário que cobre as datas (Series/array de datas ou números de dia)"""
+    dia = _dias(datas)
+    if len(dia) == 0:
+        return dimensao_datas(0, -1, indice_feriados)
+    return dimensao_datas(int(dia.min()), int(dia.max()), indice_feriados)
+
+
+def _dias(datas):
+    valores = np.asarray(datas)
+    return valores.astype(np.int64) if np.issubdtype(valores.dtype, np.integer) else numero_dia(valores)
+
+
+def atributos_dia(datas, dimensao, colunas=None):
+    """
+    Atributos da dimensão para cada data (ou número de dia): uma Series se
+    colunas for um nome, DataFrame caso contrário. As linhas vêm da dimensão
+    por posição (número de dia menos o primeiro dia), sem join.
+    """
+    posicao = _dias(datas) - dimensao.index[0] if len(dimensao) else np.zeros(0, dtype=np.int64)
+    if len(posicao) and (posicao.min() < 0 or posicao.max() >= len(dimensao)):
+        raise KeyError('Datas fora da dimensão de calendário')
+    if colunas is None:
+        colunas = COLUNAS_DIMENSAO
+    resultado = dimensao[colunas if isinstance(colunas, str) else list(colunas)].take(posicao)
+    return resultado.set_axis(datas.index if isinstance(datas, pd.Series) else pd.RangeIndex(len(resultado)))
@@ -0,0 +1,339 @@
+"""
+Armazenamento só de exceções: calendário por colaborador + eventos codificados
+
+Quase todos os registos de df_absentismo são dias normais de trabalho com
+os mesmos nomes, operação e categoria repetidos. Aqui cada colaborador tem
+um calendário (uma linha por período com atributos constantes): intervalo
+de datas ativo, dias de descanso esperados (dias da semana quase sempre sem
+registo) e o código do dia normal. Só se guardam as exceções a esse
+calendário, com códigos inteiros:
+
+- dias com registo cujo código não é o do dia normal, ou em dia de descanso;
+- dias úteis esperados sem registo (código SEM_REGISTO);
+- atrasos (de df_atrasos), que se sobrepõem ao dia de trabalho.
+
+As contagens do denominador (dias de base) saem aritmeticamente do
+calendário (np.busday_count com os dias de descanso) corrigidas pelas
+exceções, sem reconstruir os registos; expandir devolve df_absentismo e
+df_atrasos completos, com os dtypes originais (as categorias das colunas
+categóricas ficam no armazém, como em particoes).
+
+    from absentismo import excecoes
+    armazem = excecoes.gerar()        # pipeline (cache) -> .excecoes/
+    excecoes.contagens_colaborador(excecoes.carregar(), '2025-01-01', '2025-06-30')
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import data_do_dia, dia_semana, numero_dia, ordenar_colaborador_dia
+from absentismo.limpeza import NIVEL1_BASE, NIVEL1_FALTAS
+
+PASTA_EXCECOES = '.excecoes'
+
+# Atributos do colaborador (constantes em cada período do calendário)
+COLUNAS_CALENDARIO = ['nome_colaborador', 'operacao', 'categoria_profissional', 'Activo?', 'DtActivacao']
+# Colunas do código de cada dia
+COLUNAS_CODIGO = ['segmento_processado_codigo', 'Codigo Segmento', 'Nivel 1', 'Nivel 2']
+
+SEM_REGISTO = 0
+LIMITE_DESCANSO = 0.5  # Dia da semana com registo em menos de metade das semanas = descanso
+TABELAS = ['calendario', 'excecoes', 'atrasos', 'codigos']
+
+
+def _codificar(df, colunas):
+    """Código por linha da combinação de valores de colunas (nulos incluídos) e a tabela de combinações"""
+    codigo, unicas = np.zeros(len(df), dtype=np.int64), [0]
+    for coluna in colunas:
+        # Refatorizar a cada coluna mantém a chave pequena (sem overflow)
+        valores, nomes = pd.factorize(df[coluna].astype(object), use_na_sentinel=False)
+        codigo, unicas = pd.factorize(codigo * len(nomes) + valores)
+    primeira = np.zeros(len(unicas), dtype=np.intp)
+    primeira[codigo[::-1]] = np.arange(len(df))[::-1]
+    tabela = df[colunas].iloc[primeira].reset_index(drop=True)
+    return codigo, tabela
+
+
+def _dias_semana_periodo(inicio, fim):
+    """Número de segundas, terças, ... entre inicio e fim (incluídos), uma coluna por dia da semana"""
+    return np.column_stack([
+        np.busday_count(np.asarray(inicio, dtype='datetime64[D]'), np.asarray(fim + 1, dtype='datetime64[D]'),
+                        weekmask=[int(d == w) for d in range(7)])
+        for w in range(7)
+    ])
+
+
+def _mascara_descanso(descanso):
+    """Bitmask de descanso (bit w = dia da semana w) -> weekmask dos dias úteis"""
+    return [int(not (descanso >> w) & 1) for w in range(7)]
+
+
+def _grelha(inicio, fim):
+    """(periodo, dia) de todos os dias dos períodos, ordenados, e a posição onde começa cada período"""
+    inicio = np.asarray(inicio, dtype=np.int64)
+    extensao = np.asarray(fim, dtype=np.int64) - inicio + 1
+    posicao_periodo = np.cumsum(extensao) - extensao
+    periodo = np.repeat(np.arange(len(inicio)), extensao)
+    dia = np.arange(len(periodo)) - posicao_periodo[periodo] + inicio[periodo]
+    return periodo, dia, posicao_periodo
+
+
+# ======================================================================
+# COMPRESSÃO
+# ======================================================================
+
+def comprimir(df_absentismo, df_atrasos=None):
+    """
+    Armazém (dicionário de tabelas) a partir de df_absentismo (uma linha por
+    colaborador e dia) e, opcionalmente, dos atrasos de df_atrasos
+
+    calendario: login_colaborador, COLUNAS_CALENDARIO, inicio e fim (número de
+    dia), descanso (bitmask dos dias da semana) e padrao (código do dia
+    normal); excecoes e atrasos: periodo (linha do calendário), dia e codigo;
+    codigos: COLUNAS_CODIGO de cada código (linha SEM_REGISTO vazia).
+    """
+    ordem, inicios_grupo = ordenar_colaborador_dia(df_absentismo)
+    if len(inicios_grupo) != len(df_absentismo):
+        raise ValueError('df_absentismo tem mais de um registo por colaborador e dia')
+    df = df_absentismo.take(ordem).reset_index(drop=True)
+    dia = numero_dia(df['Data'])
+
+    # Períodos: mudança de colaborador ou de algum atributo
+    atributos, _ = _codificar(df, ['login_colaborador'] + COLUNAS_CALENDARIO)
+    novo = np.ones(len(df), dtype=bool)
+    novo[1:] = atributos[1:] != atributos[:-1]
+    periodo = np.cumsum(novo) - 1
+    inicios = np.flatnonzero(novo)
+    num_periodos = len(inicios)
+    inicio = dia[inicios]
+    fim = dia[np.append(inicios[1:], len(df)) - 1] if num_periodos else inicio
+
+    # Códigos dos dias (0 reservado para SEM_REGISTO) e dia normal de cada período
+    codigo, tabela_codigos = _codificar(df, COLUNAS_CODIGO)
+    codigo = codigo + 1
+    num_codigos = len(tabela_codigos) + 1
+    por_codigo = np.bincount(periodo * num_codigos + codigo, minlength=num_periodos * num_codigos)
+    padrao = por_codigo.reshape(num_periodos, num_codigos).argmax(axis=1)
+
+    # Dias de descanso: dias da semana com registo em menos de LIMITE_DESCANSO das semanas do período
+    semana = dia_semana(dia)
+    com_registo = np.bincount(periodo * 7 + semana, minlength=num_periodos * 7).reshape(num_periodos, 7)
+    e_descanso = com_registo < LIMITE_DESCANSO * _dias_semana_periodo(inicio, fim) if num_periodos else np.zeros((0, 7), bool)
+    descanso = (e_descanso * (1 << np.arange(7))).sum(axis=1).astype(np.uint8)
+
+    # Exceções com registo: código diferente do normal ou dia de descanso
+    descanso_dia = e_descanso[periodo, semana]
+    excecao = descanso_dia | (codigo != padrao[periodo])
+    partes = [pd.DataFrame({'periodo': periodo[excecao], 'dia': dia[excecao], 'codigo': codigo[excecao]})]
+
+    # Exceções sem registo: dias úteis esperados do período sem registo (grelha ordenada por período e dia)
+    periodo_grelha, dia_grelha, posicao_periodo = _grelha(inicio, fim)
+    registado = np.zeros(len(dia_grelha), dtype=bool)
+    registado[posicao_periodo[periodo] + dia - inicio[periodo]] = True
+    falta_registo = ~registado & ~e_descanso[periodo_grelha, dia_semana(dia_grelha)]
+    partes.append(pd.DataFrame({
+        'periodo': periodo_grelha[falta_registo], 'dia': dia_grelha[falta_registo], 'codigo': SEM_REGISTO,
+    }))
+
+    calendario = df.loc[inicios, ['login_colaborador'] + COLUNAS_CALENDARIO].reset_index(drop=True)
+    calendario['inicio'] = inicio.astype(np.int32)
+    calendario['fim'] = fim.astype(np.int32)
+    calendario['descanso'] = descanso
+    calendario['padrao'] = padrao.astype(np.int16)
+
+    codigos = pd.concat([pd.DataFrame({c: [None] for c in COLUNAS_CODIGO}), tabela_codigos], ignore_index=True)
+    armazem = {
+        'calendario': calendario,
+        'excecoes': _ordenar_eventos(pd.concat(partes, ignore_index=True)),
+        'codigos': codigos.astype(object),
+        'colunas': list(df_absentismo.columns),
+        'categorias': {c: [str(v) for v in df_absentismo[c].cat.categories] for c in df_absentismo.columns
+                       if isinstance(df_absentismo[c].dtype, pd.CategoricalDtype)},
+        'tipos': {c: str(df_absentismo[c].dtype) for c in df_absentismo.columns
+                  if not isinstance(df_absentismo[c].dtype, pd.CategoricalDtype)},
+    }
+    armazem['atrasos'] = _atrasos(armazem, df_atrasos)
+    return armazem
+
+
+def _ordenar_eventos(df):
+    df = df.sort_values(['periodo', 'dia'], ignore_index=True)
+    return df.astype({'periodo': np.int32, 'dia': np.int32, 'codigo': np.int16})
+
+
+def _atrasos(armazem, df_atrasos):
+    """Eventos de atraso (Nivel 1 == 'Atraso') no período do calendário do colaborador"""
+    vazio = _ordenar_eventos(pd.DataFrame({'periodo': [], 'dia': [], 'codigo': []}))
+    if df_atrasos is None:
+        return vazio
+    atrasos = df_atrasos[df_atrasos['Nivel 1'] == 'Atraso']
+    if atrasos.empty:
+        return vazio
+
+    # Códigos dos atrasos acrescentados à tabela (os existentes mantêm a posição: factorize por ordem de ocorrência)
+    existentes = armazem['codigos'].iloc[1:]
+    codigo, tabela = _codificar(pd.concat([existentes, atrasos[COLUNAS_CODIGO].astype(object)], ignore_index=True), COLUNAS_CODIGO)
+    armazem['codigos'] = pd.concat([armazem['codigos'].iloc[:1], tabela], ignore_index=True).astype(object)
+    codigo = codigo[len(existentes):] + 1
+
+    periodo = _periodo_do_dia(armazem['calendario'], atrasos['login_colaborador'], numero_dia(atrasos['Data']))
+    if np.any(periodo < 0):
+        raise ValueError('Atrasos fora do calendário de df_absentismo')
+    return _ordenar_eventos(pd.DataFrame({'periodo': periodo, 'dia': numero_dia(atrasos['Data']), 'codigo': codigo}))
+
+
+def _periodo_do_dia(calendario, logins, dias):
+    """Linha do calendário de cada (login, dia); -1 se não houver"""
+    cal_login, nomes = pd.factorize(calendario['login_colaborador'].astype(object))
+    login = pd.Index(nomes).get_indexer(np.asarray(logins, dtype=object))
+    # Chave (login, início) ordenada: o período é o último com início <= dia
+    chave_cal = cal_login.astype(np.int64) << 32 | calendario['inicio'].to_numpy().astype(np.int64) + (1 << 31)
+    ordem = np.argsort(chave_cal, kind='stable')
+    chave = login.astype(np.int64) << 32 | np.asarray(dias, dtype=np.int64) + (1 << 31)
+    j = ordem[np.maximum(np.searchsorted(chave_cal[ordem], chave, side='right') - 1, 0)]
+    encontrado = (login >= 0) & (cal_login[j] == login) & (np.asarray(dias) <= calendario['fim'].to_numpy()[j])
+    return np.where(encontrado, j, -1)
+
+
+# ======================================================================
+# GUARDAR / CARREGAR
+# ======================================================================
+
+def guardar(armazem, pasta=PASTA_EXCECOES):
+    """Escreve as tabelas do armazém em Parquet (e a ordem das colunas, dtypes e categorias em JSON)"""
+    os.makedirs(pasta, exist_ok=True)
+    for nome in TABELAS:
+        armazem[nome].to_parquet(os.path.join(pasta, f'{nome}.parquet'), index=False)
+    with open(os.path.join(pasta, 'colunas.json'), 'w', encoding='utf-8') as f:
+        json.dump({chave: armazem.get(chave, {}) for chave in ['colunas', 'tipos', 'categorias']}, f, ensure_ascii=False)
+
+
+def carregar(pasta=PASTA_EXCECOES):
+    armazem = {nome: pd.read_parquet(os.path.join(pasta, f'{nome}.parquet')) for nome in TABELAS}
+    armazem['codigos'] = armazem['codigos'].astype(object)
+    with open(os.path.join(pasta, 'colunas.json'), encoding='utf-8') as f:
+        colunas = json.load(f)
+    # Armazéns antigos guardavam só a lista de colunas
+    armazem.update(colunas if isinstance(colunas, dict) else {'colunas': colunas})
+    return armazem
+
+
+def gerar(pasta=PASTA_EXCECOES, **opcoes_pipeline):
+    """Comprime df_absentismo e df_atrasos do pipeline (opções como em pipeline.executar), guarda e devolve o armazém"""
+    from absentismo.pipeline import executar
+
+    opcoes_pipeline.setdefault('verbose', False)
+    artefactos = executar(['df_absentismo', 'df_atrasos'], **opcoes_pipeline)
+    armazem = comprimir(artefactos['df_absentismo'], artefactos['df_atrasos'])
+    guardar(armazem, pasta)
+    return armazem
+
+
+# ======================================================================
+# CONTAGENS (sem expandir)
+# ======================================================================
+
+def _em(codigos, coluna, valores):
+    """Booleano por código: valor de coluna em valores (SEM_REGISTO é sempre False)"""
+    return codigos[coluna].isin(valores).to_numpy() & (np.arange(len(codigos)) != SEM_REGISTO)
+
+
+def contagens_colaborador(armazem, inicio=None, fim=None):
+    """
+    dias_base, dias_falta, dias_trabalho e dias_atraso por colaborador entre
+    inicio e fim (datas incluídas; por omissão, tudo), como no cubo
+
+    Os dias úteis esperados de cada período são contados com np.busday_count
+    (dias de descanso como weekmask); as exceções somam ou retiram a
+    diferença entre o seu código e o do dia normal.
+    """
+    calendario, codigos = armazem['calendario'], armazem['codigos']
+    dia_min = numero_dia([pd.Timestamp(inicio)])[0] if inicio is not None else np.iinfo(np.int32).min
+    dia_max = numero_dia([pd.Timestamp(fim)])[0] if fim is not None else np.iinfo(np.int32).max
+    medidas = {
+        'dias_base': _em(codigos, 'Nivel 1', NIVEL1_BASE),
+        'dias_falta': _em(codigos, 'Nivel 1', NIVEL1_FALTAS),
+        'dias_trabalho': _em(codigos, 'Nivel 1', ['Trabalho Pago']),
+    }
+
+    # Dias úteis esperados de cada período dentro da janela
+    ini = np.maximum(calendario['inicio'].to_numpy().astype(np.int64), dia_min)
+    fim_ = np.minimum(calendario['fim'].to_numpy().astype(np.int64), dia_max)
+    uteis = np.zeros(len(calendario), dtype=np.int64)
+    descanso = calendario['descanso'].to_numpy()
+    for mascara in np.unique(descanso):
+        linhas = np.flatnonzero((descanso == mascara) & (ini <= fim_))
+        uteis[linhas] = np.busday_count(ini[linhas].astype('datetime64[D]'), (fim_[linhas] + 1).astype('datetime64[D]'),
+                                        weekmask=_mascara_descanso(int(mascara)))
+
+    excecoes = armazem['excecoes']
+    excecoes = excecoes[(excecoes['dia'] >= dia_min) & (excecoes['dia'] <= dia_max)]
+    periodo_exc = excecoes['periodo'].to_numpy()
+    codigo_exc = excecoes['codigo'].to_numpy()
+    util_exc = ((descanso[periodo_exc] >> dia_semana(excecoes['dia'].to_numpy())) & 1) == 0
+    padrao = calendario['padrao'].to_numpy()
+
+    resultado = pd.DataFrame({'login_colaborador': calendario['login_colaborador'].astype(object)})
+    for nome, conta in medidas.items():
+        # Dia normal nos dias úteis + correção das exceções (o código da exceção substitui o normal)
+        ajuste = conta[codigo_exc].astype(np.int64) - (util_exc & conta[padrao[periodo_exc]])
+        resultado[nome] = uteis * conta[padrao] + np.bincount(periodo_exc, weights=ajuste, minlength=len(calendario)).astype(np.int64)
+
+    atrasos = armazem['atrasos']
+    atrasos = atrasos[(atrasos['dia'] >= dia_min) & (atrasos['dia'] <= dia_max)]
+    resultado['dias_atraso'] = np.bincount(atrasos['periodo'].to_numpy(), minlength=len(calendario))
+    return resultado.groupby('login_colaborador', sort=True).sum().reset_index()
+
+
+# ======================================================================
+# EXPANSÃO
+# ======================================================================
+
+def _expandir_codigos(armazem, eventos_sobrepostos=None):
+    """(periodo, dia, codigo) de todos os dias com registo"""
+    calendario = armazem['calendario']
+    inicio = calendario['inicio'].to_numpy().astype(np.int64)
+    periodo, dia, posicao_periodo = _grelha(inicio, calendario['fim'].to_numpy())
+    descanso = ((calendario['descanso'].to_numpy()[periodo] >> dia_semana(dia)) & 1) == 1
+    codigo = np.where(descanso, SEM_REGISTO, calendario['padrao'].to_numpy()[periodo]).astype(np.int64)
+
+    # Posição de cada evento na grelha por aritmética
+    for eventos in [armazem['excecoes']] + ([eventos_sobrepostos] if eventos_sobrepostos is not None else []):
+        p = eventos['periodo'].to_numpy()
+        codigo[posicao_periodo[p] + eventos['dia'].to_numpy() - inicio[p]] = eventos['codigo'].to_numpy()
+
+    registo = codigo != SEM_REGISTO
+    return periodo[registo], dia[registo], codigo[registo]
+
+
+def _coluna(armazem, tabela, coluna, linhas):
+    """tabela[coluna] nas linhas indicadas; as categóricas são repostas na tabela pequena e expandidas pelos códigos"""
+    categorias = armazem.get('categorias', {}).get(coluna)
+    if categorias is None:
+        return tabela[coluna].to_numpy()[linhas]
+    tipo = pd.CategoricalDtype(categorias)
+    return pd.Categorical.from_codes(pd.Categorical(tabela[coluna].astype(object), dtype=tipo).codes[linhas], dtype=tipo)
+
+
+def _tabela(armazem, periodo, dia, codigo):
+    calendario, codigos = armazem['calendario'], armazem['codigos']
+    df = pd.DataFrame({'login_colaborador': _coluna(armazem, calendario, 'login_colaborador', periodo),
+                       'Data': data_do_dia(dia)})
+    for coluna in COLUNAS_CALENDARIO:
+        df[coluna] = _coluna(armazem, calendario, coluna, periodo)
+    for coluna in COLUNAS_CODIGO:
+        df[coluna] = _coluna(armazem, codigos, coluna, codigo)
+    # Restantes colunas com o dtype original (ex.: resolução de Data)
+    for coluna, tipo in armazem.get('tipos', {}).items():
+        if str(df[coluna].dtype) != tipo:
+            df[coluna] = df[coluna].astype(tipo)
+    return df[armazem['colunas']]
+
+
+def expandir(armazem):
+    """Reconstrói (df_absentismo, df_atrasos), ordenados por colaborador e dia"""
+    df_absentismo = _tabela(armazem, *_expandir_codigos(armazem))
+    df_atrasos = _tabela(armazem, *_expandir_codigos(armazem, armazem['atrasos']))
+    return df_absentismo, df_atrasos
@@ -0,0 +1,116 @@
+"""
+Calendário de feriados nacionais de Angola (PASSO 6.2 - padrão de ponte)
+
+Os feriados são gerados para qualquer intervalo de anos: datas fixas mais os
+móveis calculados a partir da Páscoa (Carnaval e Sexta-feira Santa). O
+calendário é indexado como um array ordenado de números de dia, pelo que a
+distância ao feriado mais próximo e a adjacência são calculadas para arrays
+inteiros de datas com searchsorted (O(log n) por data).
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import dia_semana, numero_dia
+
+# (mês, dia, nome)
+FERIADOS_FIXOS = [
+    (1, 1, 'Ano Novo'),
+    (2, 4, 'Início da Luta Armada'),
+    (3, 8, 'Dia Internacional da Mulher'),
+    (4, 4, 'Dia da Paz'),
+    (5, 1, 'Dia do Trabalhador'),
+    (9, 17, 'Dia dos Heróis Nacionais'),
+    (11, 2, 'Dia dos Finados'),
+    (11, 11, 'Dia da Independência'),
+    (12, 25, 'Natal'),
+]
+
+# (dias relativos ao domingo de Páscoa, nome)
+FERIADOS_MOVEIS = [
+    (-47, 'Carnaval'),
+    (-2, 'Sexta-feira Santa'),
+    (0, 'Páscoa'),
+]
+
+TOLERANCIA_DIAS = 1
+
+
+def domingo_pascoa(ano):
+    """Domingo de Páscoa (calendário gregoriano, algoritmo de Meeus/Jones/Butcher)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return pd.Timestamp(ano, mes, dia + 1)
+
+
+def calendario_feriados(ano_inicio, ano_fim):
+    """DataFrame (Data, feriado) com os feriados de ano_inicio a ano_fim (inclusive), ordenado"""
+    registos = []
+    for ano in range(ano_inicio, ano_fim + 1):
+        for mes, dia, nome in FERIADOS_FIXOS:
+            registos.append((pd.Timestamp(ano, mes, dia), nome))
+        pascoa = domingo_pascoa(ano)
+        for desvio, nome in FERIADOS_MOVEIS:
+            registos.append((pascoa + pd.Timedelta(days=desvio), nome))
+
+    return pd.DataFrame(registos, columns=['Data', 'feriado']).sort_values('Data').reset_index(drop=True)
+
+
+def indice_feriados(feriados):
+    """Índice ordenado (números de dia únicos) a partir de datas ou de calendario_feriados()"""
+    if isinstance(feriados, pd.DataFrame):
+        feriados = feriados['Data']
+    return np.unique(numero_dia(pd.to_datetime(feriados)))
+
+
+def distancia_feriado(datas, indice):
+    """Distância absoluta (em dias) de cada data ao feriado mais próximo"""
+    dia = numero_dia(datas)
+    if len(indice) == 0:
+        return np.full(len(dia), np.iinfo(np.int64).max, dtype=np.int64)
+
+    pos = np.searchsorted(indice, dia)
+    seguinte = indice[np.minimum(pos, len(indice) - 1)]
+    anterior = indice[np.maximum(pos - 1, 0)]
+    return np.minimum(np.abs(seguinte - dia), np.abs(dia - anterior))
+
+
+def adjacente_feriado(datas, indice, tolerancia=TOLERANCIA_DIAS):
+    """Verifica se cada data está a ±tolerancia dias de um feriado"""
+    return distancia_feriado(datas, indice) <= tolerancia
+
+
+def e_feriado(datas, indice):
+    """Verifica se cada data é feriado"""
+    return _no_indice(numero_dia(datas), indice)
+
+
+def _no_indice(dia, indice):
+    """Pertença de números de dia ao índice ordenado (searchsorted)"""
+    if len(indice) == 0:
+        return np.zeros(len(dia), dtype=bool)
+    pos = np.minimum(np.searchsorted(indice, dia), len(indice) - 1)
+    return indice[pos] == dia
+
+
+def dia_ponte(datas, indice):
+    """
+    Dia útil entre um feriado e o fim de semana (ex.: segunda antes de um
+    feriado à terça, sexta depois de um feriado à quinta)
+    """
+    dia = numero_dia(datas)
+    fim_semana_antes = dia_semana(dia - 1) >= 5
+    fim_semana_depois = dia_semana(dia + 1) >= 5
+
+    util = (dia_semana(dia) < 5) & ~_no_indice(dia, indice)
+    return util & (
+        (_no_indice(dia - 1, indice) & fim_semana_depois) |
+        (_no_indice(dia + 1, indice) & fim_semana_antes)
+    )
@@ -0,0 +1,282 @@
+"""
+Figuras estáticas do relatório (PNG/SVG), renderizadas sem interface
+
+Cada figura de FIGURAS tem um extrator (os dados que usa, tirados do
+dicionário de métricas de absentismo.metricas) e um construtor (dados ->
+figura Plotly, como nos notebooks). O ficheiro de cada figura chama-se
+<nome>-<hash>.<formato>, com o hash dos dados, do formato, do tamanho e do
+código deste módulo (construtores, _layout e constantes de cores e rótulos):
+num refresh só são renderizadas as figuras cujos dados ou código mudaram; as
+restantes são reutilizadas da pasta. As figuras em falta são
+renderizadas num pool de processos.
+
+Só PNG é embutido no DOCX (FORMATOS_DOCX): o python-docx não aceita SVG, que
+fica como exportação à parte (gerar_figuras(formato='svg')).
+
+Dependência opcional: a exportação usa o kaleido (plotly.io.write_image;
+pip install kaleido), que por sua vez precisa de um Chrome/Chromium
+instalado (o do sistema, ou o descarregado com plotly_get_chrome). Sem
+kaleido, ou quando a exportação de uma figura falha (por exemplo, sem
+Chrome), essa figura não é devolvida e o relatório mantém o marcador de
+texto.
+
+    from absentismo.figuras import gerar_figuras
+    metricas['figuras'] = gerar_figuras(metricas, processos=4)
+"""
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+PASTA_FIGURAS = '.figuras'
+FORMATOS = ['png', 'svg']
+FORMATOS_DOCX = ['png']  # add_picture do python-docx só aceita imagens raster
+LARGURA = 1000
+ALTURA = 500
+ESCALA = 2  # PNG com o dobro da resolução (impressão)
+
+COR_PRINCIPAL = '#3498db'
+COR_ALERTA = '#e74c3c'
+CORES_ANOS = ['#95a5a6', '#3498db', '#2ecc71', '#9b59b6']
+CORES_RISCO = ['#2ecc71', '#f1c40f', '#e67e22', '#e74c3c', '#8e44ad']
+
+DIAS_PT = {
+    'Monday': 'Segunda', 'Tuesday': 'Terça', 'Wednesday': 'Quarta', 'Thursday': 'Quinta',
+    'Friday': 'Sexta', 'Saturday': 'Sábado', 'Sunday': 'Domingo',
+}
+MESES_ABREV = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+PERIODOS_MES = ['1-3', '4-6', '7-9', '10-12', '13-15', '16-18', '19-21', '22-24', '25-27', '28-31']
+
+
+def _layout(fig, titulo, eixo_x, eixo_y):
+    fig.update_layout(
+        title=titulo, xaxis_title=eixo_x, yaxis_title=eixo_y,
+        template='plotly_white', font=dict(size=14), showlegend=len(fig.data) > 1,
+        margin=dict(l=70, r=30, t=70, b=60),
+    )
+    return fig
+
+
+# ======================================================================
+# CONSTRUTORES (dados -> figura)
+# ======================================================================
+
+def _fig_dia_semana(taxas):
+    import plotly.graph_objects as go
+
+    dias = [DIAS_PT[d] for d, _ in taxas]
+    valores = [t for _, t in taxas]
+    cores = [COR_ALERTA if d in ('Saturday', 'Sunday') else COR_PRINCIPAL for d, _ in taxas]
+    fig = go.Figure(go.Bar(x=dias, y=valores, marker_color=cores,
+                           text=[f'{v:.2f}%' for v in valores], textposition='outside'))
+    return _layout(fig, 'Taxa de Absentismo por Dia da Semana', 'Dia da semana', 'Taxa de absentismo (%)')
+
+
+def _fig_duracao_spells(distribuicao):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=[f for f, _, _ in distribuicao], y=[n for _, n, _ in distribuicao],
+                           marker_color=COR_PRINCIPAL,
+                           text=[f'{pct:.1f}%' for _, _, pct in distribuicao], textposition='outside'))
+    return _layout(fig, 'Distribuição de Episódios por Duração', 'Duração (dias)', 'Número de episódios')
+
+
+def _fig_periodo_mes(taxas):
+    import plotly.graph_objects as go
+
+    media = sum(taxas[1:9]) / 8
+    cores = [COR_ALERTA if i in (0, len(taxas) - 1) else COR_PRINCIPAL for i in range(len(taxas))]
+    fig = go.Figure(go.Bar(x=PERIODOS_MES[:len(taxas)], y=taxas, marker_color=cores))
+    fig.add_hline(y=media, line_dash='dash', line_color='gray', annotation_text='Média (dias 4-27)')
+    return _layout(fig, 'Taxa de Início de Episódios por Período do Mês', 'Dias do mês', 'Inícios por 1000 dias de base')
+
+
+def _fig_bradford(niveis):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Funnel(y=[nome for nome, _, _ in niveis], x=[n for _, n, _ in niveis],
+                              textinfo='value+percent initial', marker_color=CORES_RISCO[:len(niveis)]))
+    return _layout(fig, 'Distribuição por Nível de Risco Bradford', None, None)
+
+
+def _fig_tendencia_mensal(mensal):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for i, ano in enumerate(sorted({a for a, _, _ in mensal})):
+        pontos = [(mes, taxa) for a, mes, taxa in mensal if a == ano]
+        fig.add_trace(go.Scatter(
+            x=[MESES_ABREV[mes - 1] for mes, _ in pontos], y=[taxa for _, taxa in pontos],
+            mode='lines+markers', name=str(ano), line=dict(color=CORES_ANOS[i % len(CORES_ANOS)], width=3),
+        ))
+    return _layout(fig, 'Evolução Mensal da Taxa de Absentismo', 'Mês', 'Taxa de absentismo (%)')
+
+
+def _fig_u_chart(u_chart):
+    import numpy as np
+    import plotly.graph_objects as go
+
+    semanas = [s for s, _, _ in u_chart['semanas']]
+    ausencias = np.array([a for _, a, _ in u_chart['semanas']], dtype=float)
+    colaboradores = np.array([c for _, _, c in u_chart['semanas']], dtype=float)
+    taxa = ausencias / colaboradores
+    media = u_chart['media']
+    ucl = media + 3 * np.sqrt(media / colaboradores)
+    lcl = np.clip(media - 3 * np.sqrt(media / colaboradores), 0, None)
+    fora = (taxa > ucl) | (taxa < lcl)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=semanas, y=taxa, mode='lines+markers', name='Taxa observada',
+                             line=dict(color=COR_PRINCIPAL, width=2),
+                             marker=dict(size=8, color=np.where(fora, COR_ALERTA, COR_PRINCIPAL))))
+    fig.add_trace(go.Scatter(x=semanas, y=ucl, mode='lines', name='UCL', line=dict(color=COR_ALERTA, dash='dash')))
+    fig.add_trace(go.Scatter(x=semanas, y=lcl, mode='lines', name='LCL', line=dict(color=COR_ALERTA, dash='dash')))
+    fig.add_hline(y=media, line_color='gray', annotation_text='Média')
+    return _layout(fig, 'U-Chart: Faltas por Colaborador Ativo por Semana', 'Semana', 'Faltas / colaborador')
+
+
+def _fig_matriz_operacoes(dados):
+    import plotly.graph_objects as go
+
+    operacoes = dados['operacoes']
+    fig = go.Figure(go.Scatter(
+        x=[contrib for _, _, _, contrib in operacoes], y=[taxa for _, taxa, _, _ in operacoes],
+        mode='markers', text=[op for op, _, _, _ in operacoes],
+        marker=dict(size=12, color=[COR_ALERTA if taxa > dados['taxa_global'] else COR_PRINCIPAL
+                                    for _, taxa, _, _ in operacoes]),
+    ))
+    fig.add_hline(y=dados['taxa_global'], line_dash='dash', line_color='gray', annotation_text='Taxa global')
+    return _layout(fig, 'Matriz Taxa vs Contribuição - Operações', 'Contribuição para o total de faltas (%)',
+                   'Taxa de absentismo (%)')
+
+
+def _fig_cotovelo(varrimento):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    ks = [k for k, _, _ in varrimento]
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Método do Cotovelo', 'Silhouette Score'))
+    fig.add_trace(go.Scatter(x=ks, y=[i for _, i, _ in varrimento], mode='lines+markers', name='Inércia',
+                             line=dict(color=COR_PRINCIPAL, width=3)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=ks, y=[s for _, _, s in varrimento], mode='lines+markers', name='Silhouette',
+                             line=dict(color='#2ecc71', width=3)), row=1, col=2)
+    fig.update_xaxes(title_text='Número de clusters (K)')
+    return _layout(fig, 'Escolha do Número de Clusters', None, None)
+
+
+# nome: (extrator de dados das métricas, construtor)
+FIGURAS = {
+    'dia_semana': (lambda m: m['dia_semana']['taxas'], _fig_dia_semana),
+    'duracao_spells': (lambda m: m['spells']['distribuicao'], _fig_duracao_spells),
+    'periodo_mes': (lambda m: m['spells'].get('taxa_periodo_mes'), _fig_periodo_mes),
+    'bradford': (lambda m: m['bradford']['niveis'], _fig_bradford),
+    'tendencia_mensal': (lambda m: m['comparacao'].get('mensal'), _fig_tendencia_mensal),
+    'u_chart': (lambda m: m.get('u_chart') if m.get('u_chart', {}).get('semanas') else None, _fig_u_chart),
+    'matriz_operacoes': (lambda m: {'operacoes': m['operacoes'].get('matriz'), 'taxa_global': m['kpis']['taxa_absentismo']}
+                         if m['operacoes'].get('matriz') else None, _fig_matriz_operacoes),
+    'cotovelo': (lambda m: m.get('varrimento_k'), _fig_cotovelo),
+}
+
+
+# ======================================================================
+# CACHE E RENDERIZAÇÃO
+# ======================================================================
+
+def renderizacao_disponivel():
+    """True se o kaleido (exportação estática do Plotly) está instalado"""
+    return importlib.util.find_spec('kaleido') is not None
+
+
+def chave_figura(nome, dados, formato='png', largura=LARGURA, altura=ALTURA):
+    """
+    Hash dos dados, das opções de exportação e do código do módulo do
+    construtor (inclui _layout e as constantes COR_*, CORES_*, DIAS_PT, ...)
+    """
+    conteudo = json.dumps(
+        [nome, dados, formato, largura, altura, ESCALA, inspect.getsource(inspect.getmodule(FIGURAS[nome][1]))],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+
+
+def _renderizar(tarefa):
+    """
+    Constrói e exporta uma figura (corre num processo do pool)
+
+    Devolve (nome, erro): erro é None se a figura foi escrita, ou a mensagem
+    da exceção (kaleido sem Chrome, etc.), sem interromper as restantes.
+    """
+    nome, dados, caminho, formato, largura, altura = tarefa
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    try:
+        fig = FIGURAS[nome][1](dados)
+        fig.write_image(temporario, format=formato, width=largura, height=altura, scale=ESCALA)
+        os.replace(temporario, caminho)
+    except Exception as erro:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        mensagem = next((linha.strip() for linha in str(erro).splitlines() if linha.strip()), '')
+        return nome, f'{type(erro).__name__}: {mensagem}'
+    return nome, None
+
+
+def _limpar_antigas(pasta, nome, formato, atual):
+    """Remove versões anteriores da figura (outros hashes)"""
+    for ficheiro in os.listdir(pasta):
+        if ficheiro.startswith(f'{nome}-') and ficheiro.endswith(f'.{formato}') and ficheiro != atual:
+            os.remove(os.path.join(pasta, ficheiro))
+
+
+def gerar_figuras(m, nomes=None, pasta=PASTA_FIGURAS, formato='png', processos=None,
+                  largura=LARGURA, altura=ALTURA, limpar=False, verbose=True):
+    """
+    Renderiza as figuras de nomes (por omissão, todas) a partir das métricas m
+
+    Devolve {nome: caminho} das figuras disponíveis; as que já existem na
+    pasta com o mesmo hash são reutilizadas. Figuras sem dados (por exemplo,
+    métricas de uma versão anterior) são omitidas. Com limpar=True são
+    apagadas as versões anteriores de cada figura. processos: tamanho do pool
+    (por omissão, um por core; 1 renderiza no próprio processo).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato inválido: {formato} (esperado: {FORMATOS})')
+    nomes = list(FIGURAS) if nomes is None else list(nomes)
+    desconhecidas = [n for n in nomes if n not in FIGURAS]
+    if desconhecidas:
+        raise KeyError(f'Figuras desconhecidas: {desconhecidas} (disponíveis: {list(FIGURAS)})')
+    os.makedirs(pasta, exist_ok=True)
+
+    figuras, tarefas = {}, []
+    for nome in nomes:
+        dados = FIGURAS[nome][0](m)
+        if not dados:
+            continue
+        ficheiro = f'{nome}-{chave_figura(nome, dados, formato, largura, altura)}.{formato}'
+        caminho = os.path.join(pasta, ficheiro)
+        if limpar:
+            _limpar_antigas(pasta, nome, formato, ficheiro)
+        figuras[nome] = caminho
+        if not os.path.exists(caminho):
+            tarefas.append((nome, dados, caminho, formato, largura, altura))
+
+    if tarefas and not renderizacao_disponivel():
+        if verbose:
+            print(f'Figuras: kaleido não instalado, {len(tarefas)} figuras por renderizar ficam como marcador')
+        por_renderizar = {t[0] for t in tarefas}
+        return {nome: caminho for nome, caminho in figuras.items() if nome not in por_renderizar}
+
+    if len(tarefas) > 1 and processos != 1:
+        with ProcessPoolExecutor(max_workers=min(processos or os.cpu_count() or 1, len(tarefas))) as pool:
+            resultados = list(pool.map(_renderizar, tarefas))
+    else:
+        resultados = [_renderizar(tarefa) for tarefa in tarefas]
+
+    # Figuras que falharam ficam fora do resultado (o relatório usa o marcador)
+    falhadas = {nome: erro for nome, erro in resultados if erro is not None}
+    if verbose:
+        print(f'Figuras: {len(tarefas) - len(falhadas)} renderizadas, {len(figuras) - len(tarefas)} reutilizadas ({pasta})')
+        for nome, erro in falhadas.items():
+            print(f'  {nome}: não renderizada, fica como marcador ({erro})')
+    return {nome: caminho for nome, caminho in figuras.items() if nome not in falhadas}
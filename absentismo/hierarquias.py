@@ -0,0 +1,86 @@
+"""
+Deduplicação hierárquica de (colaborador, dia) numa única passagem (PASSO 1.5)
+
+Em vez de copiar df_limpo uma vez por hierarquia e ordenar cada cópia, as
+linhas são ordenadas uma única vez por (colaborador, dia). Para cada
+hierarquia, o Nivel 1 é convertido num código inteiro de prioridade e a linha
+vencedora de cada grupo é escolhida com um arg-min agrupado (a primeira linha,
+na ordem original, com a menor prioridade do grupo). O resultado são arrays
+de índices de linhas de df_limpo; os DataFrames só são materializados no fim,
+apenas com as linhas escolhidas.
+"""
+import numpy as np
+
+from absentismo.datas import ordenar_colaborador_dia
+
+# Definir hierarquias (ordem = prioridade decrescente)
+HIERARQUIA_ATRASOS = {
+    'Atraso': 1,
+    'Trabalho Pago': 2,
+    'Ausência': 3,
+    'Falta Justificada': 3,
+    'Falta Injustificada': 3
+}
+
+HIERARQUIA_ABSENTISMO = {
+    'Trabalho Pago': 1,
+    'Ausência': 2,
+    'Falta Justificada': 2,
+    'Falta Injustificada': 2,
+    'Atraso': 99  # Nunca deve ser escolhido
+}
+
+HIERARQUIAS = {
+    'atrasos': HIERARQUIA_ATRASOS,
+    'absentismo': HIERARQUIA_ABSENTISMO,
+}
+
+# Nivel 1 fora da hierarquia (ou nulo) fica sempre atrás de qualquer prioridade
+PRIORIDADE_AUSENTE = np.iinfo(np.int32).max
+
+
+def codigos_prioridade(nivel1, hierarquia):
+    """Converte a coluna Nivel 1 em códigos inteiros de prioridade"""
+    return nivel1.map(hierarquia).astype('float64').fillna(PRIORIDADE_AUSENTE).to_numpy(dtype=np.int64)
+
+
+def argmin_agrupado(valores, inicios):
+    """
+    Posição (dentro de valores) do primeiro mínimo de cada grupo contíguo
+
+    valores já está ordenado por grupo; inicios marca onde começa cada grupo.
+    """
+    if len(inicios) == 0:
+        return np.empty(0, dtype=np.intp)
+    minimos = np.minimum.reduceat(valores, inicios)
+    tamanhos = np.diff(np.append(inicios, len(valores)))
+    posicoes_min = np.flatnonzero(valores == np.repeat(minimos, tamanhos))
+    return posicoes_min[np.searchsorted(posicoes_min, inicios)]
+
+
+def indices_hierarquias(df, hierarquias=HIERARQUIAS, coluna_nivel='Nivel 1'):
+    """
+    Índices (posicionais) das linhas vencedoras de cada hierarquia
+
+    Devolve {nome: array de posições em df}, uma linha por (colaborador, dia),
+    ordenadas por colaborador e data. Empates de prioridade são resolvidos pela
+    ordem original das linhas, como no sort_values + first do notebook.
+    """
+    ordem, inicios = ordenar_colaborador_dia(df)
+    nivel1 = df[coluna_nivel]
+    return {
+        nome: ordem[argmin_agrupado(codigos_prioridade(nivel1, hierarquia)[ordem], inicios)]
+        for nome, hierarquia in hierarquias.items()
+    }
+
+
+def materializar(df, indices, chaves=('login_colaborador', 'Data')):
+    """Constrói o DataFrame deduplicado (chaves primeiro, índice 0..n-1)"""
+    colunas = list(chaves) + [c for c in df.columns if c not in chaves]
+    return df.take(indices)[colunas].reset_index(drop=True)
+
+
+def separar_atrasos_absentismo(df_limpo):
+    """Devolve (df_atrasos, df_absentismo) a partir de uma única ordenação"""
+    indices = indices_hierarquias(df_limpo)
+    return materializar(df_limpo, indices['atrasos']), materializar(df_limpo, indices['absentismo'])
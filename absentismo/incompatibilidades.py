@@ -0,0 +1,116 @@
+"""
+Deteção vetorizada de dias com registos incompatíveis (PASSO 1.3)
+
+Cada Nivel 2 é codificado como um bit e cada (colaborador, dia) como a
+máscara (OR) das categorias presentes. As máscaras distintas são poucas, por
+isso a regra de incompatibilidade é avaliada uma vez por máscara única e
+propagada para todos os dias numa única passagem NumPy.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import ordenar_colaborador_dia
+
+# Matriz de compatibilidade (Nivel 2)
+REGRAS_COMPATIBILIDADE = [
+    # Compativeis
+    ('Presença', 'Atraso', 1),
+    ('Presença', 'Formação', 1),
+
+    # Incompativeis
+    ('Presença', 'Ausência Médica', 0),
+    ('Presença', 'Ausência Injustificada', 0),
+    ('Presença', 'Licença Mat/Pat', 0),
+    ('Presença', 'Férias', 0),
+    ('Presença', 'Falta Justificada', 0),
+    ('Presença', 'Ferias / Feriado / Folga', 0),
+    ('Trabalho Pago', 'Ausência Médica', 0),
+    ('Trabalho Pago', 'Falta Injustificada', 0),
+]
+
+COLUNAS_RESULTADO = ['login_colaborador', 'Data', 'nome_colaborador', 'categorias', 'pares_incompativeis']
+
+# Máscaras em uint64: no máximo 64 subcategorias distintas
+MAX_CATEGORIAS = 64
+
+
+def dicionario_compatibilidade(regras=REGRAS_COMPATIBILIDADE):
+    """Cria o dicionário {(cat1, cat2) ordenado: compativel}"""
+    return {tuple(sorted([cat1, cat2])): compativel for cat1, cat2, compativel in regras}
+
+
+def _descrever_dia(categorias_dia, compat_dict):
+    """Lista de categorias (por ordem de aparecimento) e pares incompatíveis"""
+    categorias = list(dict.fromkeys(c for c in categorias_dia if not pd.isna(c)))
+    pares_incompat = []
+    for i, cat1 in enumerate(categorias):
+        for cat2 in categorias[i + 1:]:
+            key = tuple(sorted([cat1, cat2]))
+            if key in compat_dict and compat_dict[key] == 0:
+                pares_incompat.append(f'{cat1} + {cat2}')
+    return categorias, pares_incompat
+
+
+def detetar_incompatibilidades(df_temp, regras=REGRAS_COMPATIBILIDADE):
+    """
+    Identifica dias (colaborador, Data) com categorias de Nivel 2 incompatíveis
+
+    Devolve o mesmo formato que df_incompativeis do PASSO 1.3: login_colaborador,
+    Data, nome_colaborador, categorias e pares_incompativeis, ordenado por
+    colaborador e data.
+    """
+    if len(df_temp) == 0:
+        return pd.DataFrame(columns=COLUNAS_RESULTADO)
+
+    compat_dict = dicionario_compatibilidade(regras)
+
+    # Codificar Nivel 2 como bits
+    nivel2_cod, nivel2_cats = pd.factorize(df_temp['Nivel 2'])
+    if len(nivel2_cats) > MAX_CATEGORIAS:
+        raise ValueError(f'Demasiadas categorias de Nivel 2 para máscara de bits: {len(nivel2_cats)}')
+    posicao = {cat: i for i, cat in enumerate(nivel2_cats)}
+    bits = np.where(
+        nivel2_cod >= 0,
+        np.left_shift(np.uint64(1), np.maximum(nivel2_cod, 0).astype(np.uint64)),
+        np.uint64(0)
+    )
+
+    # Máscara de categorias presentes por (colaborador, dia)
+    ordem, inicios = ordenar_colaborador_dia(df_temp)
+    mascara = np.bitwise_or.reduceat(bits[ordem], inicios)
+    num_registos = np.diff(np.append(inicios, len(df_temp)))
+
+    # Tabela de consulta: pares incompatíveis presentes nos dados
+    mascaras_pares = [
+        np.uint64((1 << posicao[a]) | (1 << posicao[b]))
+        for (a, b), compativel in compat_dict.items()
+        if compativel == 0 and a in posicao and b in posicao and a != b
+    ]
+    mascaras_unicas, inverso = np.unique(mascara, return_inverse=True)
+    conflito_unico = np.zeros(len(mascaras_unicas), dtype=bool)
+    for mp in mascaras_pares:
+        conflito_unico |= (mascaras_unicas & mp) == mp
+
+    grupos = np.flatnonzero(conflito_unico[inverso.ravel()] & (num_registos > 1))
+
+    # Descrição textual apenas para os (poucos) dias incompatíveis
+    fins = np.append(inicios[1:], len(df_temp))
+    nivel2 = df_temp['Nivel 2'].to_numpy(dtype=object)
+    nomes = df_temp['nome_colaborador'].to_numpy(dtype=object)
+    logins = df_temp['login_colaborador'].to_numpy(dtype=object)
+    datas = df_temp['Data'].to_numpy()
+
+    incompativeis = []
+    for g in grupos:
+        linhas = ordem[inicios[g]:fins[g]]
+        categorias, pares_incompat = _descrever_dia(nivel2[linhas], compat_dict)
+        nomes_validos = [n for n in nomes[linhas] if not pd.isna(n)]
+        incompativeis.append({
+            'login_colaborador': logins[linhas[0]],
+            'Data': datas[linhas[0]],
+            'nome_colaborador': nomes_validos[0] if nomes_validos else np.nan,
+            'categorias': ', '.join(categorias),
+            'pares_incompativeis': ' | '.join(pares_incompat)
+        })
+
+    return pd.DataFrame(incompativeis, columns=COLUNAS_RESULTADO)
@@ -0,0 +1,295 @@
+"""
+Classificação e limpeza dos registos (PASSOS 1.2 a 1.X) e subsets do Grupo 2
+
+classificar aplica a tabela de códigos, remover_incompativeis retira os dias
+com categorias incompatíveis e normalizar_categorias agrega as categorias
+profissionais. A normalização é feita uma vez por categoria distinta (e não
+por linha) e aplicada por mapeamento.
+"""
+import pandas as pd
+
+from absentismo.datas import atributos_dia, dimensao_para
+from absentismo.incompatibilidades import detetar_incompatibilidades
+
+# Dicionário de mapeamento das categorias profissionais
+CATEGORIAS_AGREGADAS = {
+    # Contact / Call Center
+    "ASSISTENTE DE CONTACT CENTER (N1)": "Assistente de Contact Center",
+    "ASSISTENTE DE CONTACT CENTER (N2)": "Assistente de Contact Center",
+    "ASSISTENTE DE CONTACT CENTER (N3)": "Assistente de Contact Center",
+    "ASSISTENTE DE CONTACT CENTER (N4)": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER - SERV SEGMENTADOS": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER - SERV PARTILHADOS": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER - SUPORTE TÉCNICO": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER - BACK OFFICE": "Assistente de Contact Center",
+    "ASSISTENTE DE CALL CENTER - UMBI UMBI CLUB": "Assistente de Contact Center",
+    "ASSISTENTE BACKOFFICE - SWAT": "Assistente Backoffice",
+
+    # Experiência de Cliente
+    "ASSISTENTE DE EXPERIÊNCIA DE CLIENTE N1": "Assistente de Contact Center",
+    "ASSISTENTE DE EXPERIÊNCIA DE CLIENTE N2": "Assistente de Contact Center",
+    "ASSISTENTE DE EXPERIÊNCIA DE CLIENTE N3": "Assistente de Contact Center",
+    "GESTOR DE GESTÃO DE EXPERIÊNCIA DE CLIENTE": "Gestor de Experiência do Cliente",
+    "TÉCNICO DE GESTÃO DE EXPERIÊNCIA DE CLIENTE": "Técnico de Experiência do Cliente",
+
+    # Vendas & Comercial
+    "DELEGADO COMERCIAL": "Comercial",
+    "PROMOTOR DE VENDAS": "Promotor de Vendas",
+    "CONSULTOR COMERCIAL JR": "Consultor Comercial",
+    "VENDEDOR": "Vendas",
+    "AGENTE DE VENDAS": "Vendas",
+    "ASSISTENTE DE VENDAS": "Assistente de Vendas",
+    "SUPERVISOR DE VENDAS": "Supervisor de Vendas",
+    "CONSULTOR": "Consultor",
+
+    # Loja / Cinema
+    "ASSISTENTE DE LOJA": "Assistente de Loja",
+    "ASSISTENTE DE LOJAS": "Assistente de Loja",
+    "ASSISTENTE DE CAIXA": "Assistente de Loja",
+    "ASSISTENTE DE CINEMA": "Assistente de Loja",
+    "BALCONISTA": "Atendimento Balcão",
+    "DINAMIZADOR DE BALCÃO": "Atendimento Balcão",
+    "EMPREGADO DE BALCAO": "Atendimento Balcão",
+
+    # Supervisores Operacionais
+    "SUPERVISOR OPERACIONAL": "Supervisor Operacional",
+    "SUPERVISOR OPERACIONAL - SERVIÇOS SEGMENTADOS": "Supervisor Operacional",
+    "SUPERVISOR OPERACIONAL - OUTSOURCING": "Supervisor Operacional",
+    "SUPERVISOR OPERACIONAL - ESTAGIÁRIO": "Supervisor Operacional",
+    "SUPERVISOR OPERACIONAL -  OUTSOURCING ESTAGIÁRIO": "Supervisor Operacional",
+    "SUPERVISOR- ESTAGIÁRIO": "Supervisor Operacional",
+
+    # Coordenadores Operacionais
+    "COORDENADOR OPERACIONAL": "Coordenador Operacional",
+    "COORDENADOR OPERACIONAL - ESTAGIÁRIO": "Coordenador Operacional",
+
+    # Brigadistas (categoria específica)
+    "BRIGADISTA": "Brigadista",
+    "SUPERVISOR UNITEL MONEY - BRIGADISTAS Outsourcing": "Supervisor Brigadistas",
+    "COORDENADOR UNITEL MONEY - BRIGADISTAS Outsourcing": "Coordenador Brigadistas",
+
+    # Limpeza / Facilities (categorias SEPARADAS)
+    "AUXILIAR DE LIMPEZA": "Auxiliar de Limpeza",
+    "SUPERVISOR DE LIMPEZA": "Supervisor de Limpeza",
+    "SUPERVISOR DE SERVIÇOS GERAIS": "Supervisor de Serviços Gerais",
+    "DIRECTOR DE SERVIÇOS GERAIS": "Diretor de Serviços Gerais",
+    "GOVERNANTA": "Serviços Gerais",
+
+    # Recursos Humanos
+    "ASSISTENTE DE RECURSOS HUMANOS": "Assistente de RH",
+    "TÉCNICO  DE RECURSOS HUMANOS": "Técnico de RH",
+    "COORDENADOR DE RECURSOS HUMANOS": "Coordenador de RH",
+    "GESTOR  DE RECURSOS HUMANOS": "Gestor de RH",
+    "TÉCNICO DE DESENVOLVIMENTO DE CAPITAL HUMANO": "Técnico de RH",
+    "GESTOR DE DESENVOLVIMENTO DE CAPITAL HUMANO": "Gestor de RH",
+    "TECNICO DE RECRUTAMENTO E SELECÇÃO": "Técnico de Recrutamento",
+    "COORDENADOR DE RECRUTAMENTO E SELECÇÃO": "Coordenador de Recrutamento",
+    "GESTOR DE RECRUTAMENTO": "Gestor de Recrutamento",
+    "ASSISTENTE DE RECRUTAMENTO E SELECÇÃO": "Assistente de Recrutamento",
+    "DIRECTOR DE PESSOAS": "Diretor de RH",
+
+    # Formação
+    "FORMADOR": "Formador",
+    "FORMADOR - ESTAGIÁRIO": "Formador",
+    "GESTOR DE ACADEMIA DE FORMAÇÃO": "Gestor de Formação",
+    "COORDENADOR DA ACADEMIA DA  FORMAÇÃO": "Coordenador de Formação",
+
+    # Qualidade / Auditoria
+    "TÉCNICO DE GESTÃO DE QUALIDADE": "Técnico de Qualidade",
+    "TÉCNICO DE GESTÃO DE QUALIDADE - ESTAGIÁRIO": "Técnico de Qualidade",
+    "SUPERVISOR DE GESTÃO DE QUALIDADE": "Supervisor de Qualidade",
+    "AUDITOR DE QUALIDADE": "Auditor de Qualidade",
+    "COORDENADOR DE AUDITORIA E CONTROLO DE QUALIDADE": "Coordenador de Qualidade",
+
+    # Finanças & Contabilidade
+    "TÉCNICO DE CONTABILIDADE": "Técnico de Contabilidade",
+    "ASSISTENTE DE CONTABILIDADE": "Assistente de Contabilidade",
+    "ASSISTENTE DE CONTABILIDADE - ESTAGIÁRIO": "Assistente de Contabilidade",
+    "TÉCNICO DE CONTAS": "Técnico Financeiro",
+    "TÉCNICO DE TESOURARIA": "Técnico de Tesouraria",
+    "ASSISTENTE DE TESOURARIA": "Assistente de Tesouraria",
+    "COORDENADOR DE TESOURARIA": "Coordenador de Tesouraria",
+    "DIRECTOR FINANCEIRO": "Diretor Financeiro",
+
+    # TI / Sistemas / Desenvolvimento
+    "TÉCNICO DE INFORMÁTICA": "Técnico Informática",
+    "TÉCNICO DE HELPDESK": "Helpdesk",
+    "COORDENADOR DE HELPDESK": "Coordenador Helpdesk",
+    "ADMINISTRADOR DE SISTEMAS": "Administrador de Sistemas",
+    "DIRECTOR DE SISTEMAS DE INFORMAÇÃO": "Diretor de Sistemas",
+    "DIRECTOR ADJUNTO DE SISTEMAS": "Diretor de Sistemas",
+    "ADMINISTRADOR DE REDES E TELECOMUNICAÇÕES": "Administrador Redes",
+    "ANALISTA DE SUPORTES INFORMÁTICO": "Analista de Suporte",
+    "TÉCNICO DE REDES E TELECOMUNICAÇÕES": "Técnico Redes",
+    "TÉCNICO DE BASE DE DADOS": "Técnico Base de Dados",
+    "COORDENADOR DE BASE DE DADOS E VOZ": "Coordenador Base Dados e Voz",
+    "PROGRAMADOR": "Programador",
+    "PROGRAMADOR - ESTAGIÁRIO": "Programador",
+    "ANALISTA DE SISTEMAS": "Analista de Sistemas",
+    "TECNICO DE VOZ": "Técnico de Voz",
+    "TÉCNICO DE GRELHA E ALINHAMENTO": "Técnico de Sistemas",
+    "GESTOR DE REDES E SEGURANÇA": "Gestor Redes e Segurança",
+
+    # Marketing / Comunicação
+    "TÉCNICO DE MARKETING DIGITAL": "Marketing Digital",
+    "DIRECTOR DE MARKETING E COMUNICAÇÃO": "Diretor Marketing",
+    "GESTOR DE MARKETING E COMUNICAÇÃO": "Gestor Marketing",
+    "DIRECTOR DE MARKETING, COMUNICAÇÃO, R.I.& LOYALTY": "Diretor Marketing",
+    "TÉCNICO DE COMUNICACÃO": "Comunicação",
+    "GESTOR CRIATIVO ": "Criativo",
+    "RELAÇÕES PUBLICAS": "Relações Públicas",
+
+    # Dados & Analytics
+    "ANALISTA DE DADOS": "Analista de Dados",
+    "Business Analyst": "Analista de Negócio",
+    "Data & Business Control Manager": "Gestor de Controlo de Dados",
+    "TÉCNICO DE ANALISE DE DADOS TEMPO REAL": "Técnico de Dados",
+    "TÉCNICO JR. DE REPORTING": "Técnico de Reporting",
+    "TÉCNICO DE REPORTING": "Técnico de Reporting",
+    "COORDENADOR DE REPORTING": "Coordenador de Reporting",
+    "TÉCNICO DE ANÁLISE E CONTROLO INTERNO": "Técnico de Análise",
+    "TÉCNICO DE ANÁLISE E GESTÃO DE INFORMAÇÃO - IV": "Técnico de Análise",
+    "Workforce Manager": "Workforce Manager",
+
+    # Manutenção e Operações Técnicas
+    "TÉCNICO DE MANUTENÇÃO": "Técnico de Manutenção",
+    "ASSISTENTE DE MANUTENÇÃO": "Assistente de Manutenção",
+    "COORDENADOR DE MANUTENÇÃO": "Coordenador de Manutenção",
+    "ELECTRICISTA": "Manutenção Elétrica",
+    "ASSISTENTE DE FRIO": "Técnico de Frio",
+
+    # Projetos
+    "TÉCNICO DE PROJECTOS TECNOLÓGICOS": "Técnico Projetos Tecnológicos",
+    "COORDENADOR DE PROJECTOS TECNOLÓGICOS": "Coordenador Projetos Tecnológicos",
+    "GESTOR DE PROJECTOS TECNOLÓGICOS": "Gestor Projetos Tecnológicos",
+    "GESTOR DE PROJECTOS": "Gestor Projetos",
+
+    # Gestão / Direção
+    "GESTOR DE SALA": "Gestor de Sala",
+    "GESTOR DE SALA - ESTAGIÁRIO": "Gestor de Sala",
+    "GESTOR DE CONTA": "Gestor de Conta",
+    "GESTOR": "Gestor",
+    "GESTOR DE DESENVOLVIMENTO E INOVAÇÃO": "Gestor de Desenvolvimento",
+    "GESTOR DE DESENVOLVIMENTO DE NEGÓCIO": "Gestor de Negócio",
+    "GESTOR DE GABINETE JURÍDICO": "Gestor Jurídico",
+    "DIRECTOR DE CLIENTES": "Diretor de Clientes",
+    "DIRECTOR GERAL ADJUNTO": "Diretor Geral",
+    "DIRECTOR DE LOGÍSTICA E PATRIMÓNIO": "Diretor Logística",
+    "DIRECTOR DE MELHORIA CONTINUA": "Diretor Melhoria Contínua",
+    "DIRECTOR ADJUNTO DE MELHORIA CONTINUA": "Diretor Melhoria Contínua",
+    "COORDENADOR": "Coordenador",
+    "COORDENADOR DO DIGITAL": "Coordenador Digital",
+
+    # Conteúdos / Multimédia / Design
+    "EDITOR DE VIDEOS": "Editor de Vídeo",
+    "SUPERVISOR DE PRODUÇÃO DE CONTEÚDOS": "Supervisor Conteúdos",
+    "FOTOGRAFO": "Fotógrafo",
+    "TÉCNICO DE DESIGN": "Designer",
+    "TÉCNICO DE GESTÃO DE CONTEÚDOS": "Técnico de Conteúdos",
+
+    # Logística / Armazém / Transportes
+    "FIEL DE ARMAZEM": "Responsável de Armazém",
+    "RESPONSÁVEL DE ARMAZÉM": "Responsável de Armazém",
+    "MOTORISTA DE LIGEIROS": "Motorista",
+    "SUPERVISOR DE TRANSPORTES": "Supervisor de Transportes",
+
+    # Administrativos
+    "ASSISTENTE ADMINISTRATIVO": "Assistente Administrativo",
+    "ASSISTENTE ADMINISTRATIVO - ESTAGIÁRIO": "Assistente Administrativo",
+    "ASSISTENTE JURÍDICO": "Assistente Jurídico",
+    "RECEPCIONISTA": "Recepcionista",
+
+    # Compras / Negócios
+    "TÉCNICO DE COMPRAS": "Técnico de Compras",
+    "TÉCNICO DE DESENVOLVIMENTO DE NEGÓCIOS": "Técnico de Negócios",
+    "TÉCNICO DE GESTÃO DE MATERIAL": "Técnico de Gestão Material",
+
+    # HSST
+    "TÉCNICO DE HSST": "Técnico de HSST",
+
+    # Outros específicos
+    "PROMOTOR DE FELICIDADE": "Engagement Interno",
+    "ESTAGIÁRIO": "Estagiário",
+}
+
+
+NIVEL1_FALTAS = ['Falta Justificada', 'Falta Injustificada']
+NIVEL1_BASE = ['Trabalho Pago', 'Falta Justificada', 'Falta Injustificada']
+
+
+def classificar(df_raw, df_codigos):
+    """PASSO 1.2: aplica a classificação (Nivel 1 / Nivel 2) a cada registo"""
+    return df_raw.merge(
+        df_codigos,
+        left_on='segmento_processado_codigo',
+        right_on='Codigo Segmento',
+        how='left'
+    )
+
+
+def remover_incompativeis(df_temp, df_incompativeis):
+    """PASSO 1.4: remove todos os registos dos dias (colaborador, Data) incompatíveis"""
+    if len(df_incompativeis) == 0:
+        return df_temp.copy()
+    chaves = pd.MultiIndex.from_arrays([df_incompativeis['login_colaborador'], df_incompativeis['Data']])
+    idx_remover = pd.MultiIndex.from_arrays([df_temp['login_colaborador'], df_temp['Data']]).isin(chaves)
+    return df_temp[~idx_remover].copy()
+
+
+def normalizar_categoria(categoria, dict_normalizado=None):
+    """
+    Normaliza categorias usando dicionário de mapeamento
+    """
+    if pd.isna(categoria):
+        return 'Não Especificado'
+
+    if dict_normalizado is None:
+        dict_normalizado = {k.upper(): v for k, v in CATEGORIAS_AGREGADAS.items()}
+
+    # Procurar no dicionário (case insensitive); se não encontrou, manter original mas limpar
+    return dict_normalizado.get(str(categoria).strip().upper(), str(categoria).strip())
+
+
+def normalizar_categorias(categorias):
+    """Aplica normalizar_categoria a uma Series (uma chamada por valor distinto)"""
+    dict_normalizado = {k.upper(): v for k, v in CATEGORIAS_AGREGADAS.items()}
+    valores = pd.Series(categorias.astype(object).unique())
+    mapa = dict(zip(valores, valores.map(lambda c: normalizar_categoria(c, dict_normalizado))))
+    return categorias.astype(object).map(mapa).fillna('Não Especificado')
+
+
+def limpar(df_temp):
+    """PASSOS 1.3 a 1.X: devolve (df_incompativeis, df_limpo)"""
+    df_incompativeis = detetar_incompatibilidades(df_temp)
+    df_limpo = remover_incompativeis(df_temp, df_incompativeis)
+    df_limpo['categoria_profissional'] = normalizar_categorias(df_limpo['categoria_profissional'])
+    return df_incompativeis, df_limpo
+
+
+def subconjuntos(df_absentismo, df_atrasos):
+    """
+    Subsets do Grupo 2.2 com as colunas auxiliares criadas no Grupo 2.8
+
+    Devolve um dicionário com df_faltas, df_base_absentismo, df_ausencias e
+    df_apenas_atrasos (Dia_Semana em todos; Ano_Mes em df_faltas e
+    df_base_absentismo; ambas categóricas, da dimensão de calendário).
+    """
+    df_faltas = df_absentismo[df_absentismo['Nivel 1'].isin(NIVEL1_FALTAS)].copy()
+    df_base_absentismo = df_absentismo[df_absentismo['Nivel 1'].isin(NIVEL1_BASE)].copy()
+    df_ausencias = df_absentismo[df_absentismo['Nivel 1'] == 'Ausência'].copy()
+    df_apenas_atrasos = df_atrasos[df_atrasos['Nivel 1'].astype(object).str.contains('Atraso', na=False)].copy()
+
+    # Atributos da dimensão de calendário (calculados por dia, não por registo; categóricos)
+    dimensao = dimensao_para(pd.concat([df_absentismo['Data'], df_atrasos['Data']], ignore_index=True))
+    for df in (df_faltas, df_base_absentismo, df_ausencias, df_apenas_atrasos):
+        df['Dia_Semana'] = atributos_dia(df['Data'], dimensao, 'nome_dia')
+    for df in (df_faltas, df_base_absentismo):
+        df['Ano_Mes'] = atributos_dia(df['Data'], dimensao, 'ano_mes')
+
+    return {
+        'df_faltas': df_faltas,
+        'df_base_absentismo': df_base_absentismo,
+        'df_ausencias': df_ausencias,
+        'df_apenas_atrasos': df_apenas_atrasos,
+    }
@@ -0,0 +1,210 @@
+"""
+Matriz colaborador × dia com o estado de cada dia (uint8), em memória mapeada
+
+Cada célula guarda o código do estado do dia (Nivel 1 de df_absentismo,
+depois das hierarquias): 0 = sem registo, 1..N = estados por ordem
+alfabética. As linhas são os logins ordenados e as colunas os dias
+consecutivos a partir de primeiro_dia, por isso login -> linha é um
+searchsorted e data -> coluna uma subtração.
+
+A matriz é guardada em <pasta>/estados.npy (mais o índice em JSON) e aberta
+com np.load(mmap_mode='r'): abrir é instantâneo e os processos que a abrem
+partilham as páginas do ficheiro em cache. Ausências num dia, sequências de
+ausência (spells), Bradford e taxas por dia da semana são operações sobre
+arrays.
+
+    from absentismo import matriz
+    m = matriz.gerar_matriz()          # pipeline (cache) -> .matriz/
+    m = matriz.abrir_matriz()          # noutro processo
+    matriz.estado(m, 'S000123', '2025-03-14')
+    matriz.taxa_dia_semana(m)
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from absentismo.bradford import categorizar_bradford
+from absentismo.datas import data_do_dia, dia_semana, numero_dia
+from absentismo.limpeza import NIVEL1_BASE, NIVEL1_FALTAS
+from absentismo.spells import LIMITE_SHORT_TERM
+
+PASTA_MATRIZ = '.matriz'
+FICHEIRO_ESTADOS = 'estados.npy'
+FICHEIRO_INDICE = 'indice.json'
+
+SEM_REGISTO = 0
+MAX_ESTADOS = 255
+
+
+def construir_matriz(df_absentismo, coluna='Nivel 1'):
+    """
+    Matriz (dicionário) a partir de uma tabela com uma linha por colaborador
+    e dia: estados (uint8, colaboradores × dias), logins (ordenados),
+    primeiro_dia (número de dia da coluna 0) e codigos (nome de cada código;
+    codigos[0] é None)
+    """
+    valores, nomes = pd.factorize(df_absentismo[coluna].astype(object), sort=True)
+    if len(nomes) > MAX_ESTADOS:
+        raise ValueError(f'{coluna} tem {len(nomes)} valores (máximo {MAX_ESTADOS})')
+    linha, logins = pd.factorize(df_absentismo['login_colaborador'].astype(object), sort=True)
+    dia = numero_dia(df_absentismo['Data'])
+    primeiro_dia = int(dia.min()) if len(dia) else 0
+    num_dias = int(dia.max()) - primeiro_dia + 1 if len(dia) else 0
+
+    estados = np.zeros((len(logins), num_dias), dtype=np.uint8)
+    # Estados nulos (-1) ficam sem registo; linhas sem login são ignoradas
+    validas = linha >= 0
+    estados[linha[validas], dia[validas] - primeiro_dia] = valores[validas] + 1
+    return {
+        'estados': estados,
+        'logins': np.asarray(logins, dtype=object),
+        'primeiro_dia': primeiro_dia,
+        'codigos': [None] + [str(n) for n in nomes],
+    }
+
+
+def guardar_matriz(matriz, pasta=PASTA_MATRIZ):
+    """Escreve estados.npy e o índice (substitui o conteúdo anterior de pasta)"""
+    os.makedirs(pasta, exist_ok=True)
+    temporario = os.path.join(pasta, f'{FICHEIRO_ESTADOS}.tmp')
+    with open(temporario, 'wb') as f:
+        np.save(f, np.ascontiguousarray(matriz['estados']))
+    os.replace(temporario, os.path.join(pasta, FICHEIRO_ESTADOS))
+
+    indice = {
+        'logins': [str(login) for login in matriz['logins']],
+        'primeiro_dia': int(matriz['primeiro_dia']),
+        'codigos': matriz['codigos'],
+    }
+    with open(os.path.join(pasta, FICHEIRO_INDICE), 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False)
+
+
+def abrir_matriz(pasta=PASTA_MATRIZ):
+    """Abre a matriz guardada em pasta (estados em memória mapeada, só leitura)"""
+    with open(os.path.join(pasta, FICHEIRO_INDICE), encoding='utf-8') as f:
+        indice = json.load(f)
+    return {
+        'estados': np.load(os.path.join(pasta, FICHEIRO_ESTADOS), mmap_mode='r'),
+        'logins': np.asarray(indice['logins'], dtype=object),
+        'primeiro_dia': indice['primeiro_dia'],
+        'codigos': indice['codigos'],
+    }
+
+
+def gerar_matriz(pasta=PASTA_MATRIZ, **opcoes_pipeline):
+    """Constrói a matriz a partir de df_absentismo do pipeline (opções como em pipeline.executar), guarda-a e abre-a"""
+    from absentismo.pipeline import executar
+
+    opcoes_pipeline.setdefault('verbose', False)
+    guardar_matriz(construir_matriz(executar(['df_absentismo'], **opcoes_pipeline)['df_absentismo']), pasta)
+    return abrir_matriz(pasta)
+
+
+# ======================================================================
+# ÍNDICES
+# ======================================================================
+
+def datas(matriz):
+    """Data de cada coluna"""
+    return data_do_dia(matriz['primeiro_dia'] + np.arange(matriz['estados'].shape[1]))
+
+
+def linhas(matriz, logins):
+    """Linha de cada login (KeyError se algum não existir)"""
+    procurados = np.asarray(logins, dtype=object).astype(str)
+    pos = np.searchsorted(matriz['logins'].astype(str), procurados)
+    pos = np.minimum(pos, len(matriz['logins']) - 1)
+    existe = matriz['logins'][pos] == procurados
+    if not np.all(existe):
+        raise KeyError(f'Logins sem linha na matriz: {list(procurados[~existe][:5])}')
+    return pos
+
+
+def colunas(matriz, datas_):
+    """Coluna de cada data (KeyError fora do intervalo da matriz)"""
+    coluna = numero_dia(pd.to_datetime(np.atleast_1d(datas_))) - matriz['primeiro_dia']
+    fora = (coluna < 0) | (coluna >= matriz['estados'].shape[1])
+    if np.any(fora):
+        raise KeyError(f'Datas fora da matriz: {list(data_do_dia(coluna[fora] + matriz["primeiro_dia"])[:5])}')
+    return coluna
+
+
+def tabela_codigos(matriz, valores):
+    """Tabela (256 posições) que é True nos códigos dos estados em valores"""
+    tabela = np.zeros(MAX_ESTADOS + 1, dtype=bool)
+    for codigo, nome in enumerate(matriz['codigos']):
+        if nome is not None and nome in valores:
+            tabela[codigo] = True
+    return tabela
+
+
+def mascara(matriz, valores, linhas_=slice(None)):
+    """Matriz booleana dos dias com estado em valores (ex.: NIVEL1_FALTAS)"""
+    return tabela_codigos(matriz, valores)[matriz['estados'][linhas_]]
+
+
+def estado(matriz, login, data):
+    """Estado (nome; None sem registo) de um colaborador num dia"""
+    codigo = matriz['estados'][linhas(matriz, [login])[0], colunas(matriz, data)[0]]
+    return matriz['codigos'][codigo]
+
+
+# ======================================================================
+# ANÁLISES SOBRE A MATRIZ
+# ======================================================================
+
+def taxa_dia_semana(matriz, base=NIVEL1_BASE, faltas=NIVEL1_FALTAS):
+    """Taxa de absentismo (%) por dia da semana (0 = segunda), como no Grupo 4"""
+    dia = dia_semana(matriz['primeiro_dia'] + np.arange(matriz['estados'].shape[1]))
+    dias_base = np.bincount(dia, weights=mascara(matriz, base).sum(axis=0), minlength=7)
+    dias_falta = np.bincount(dia, weights=mascara(matriz, faltas).sum(axis=0), minlength=7)
+    taxa = np.divide(dias_falta * 100, dias_base, out=np.zeros(7), where=dias_base > 0)
+    return pd.Series(taxa, index=pd.RangeIndex(7, name='dia_semana'), name='taxa_absentismo')
+
+
+def sequencias(matriz, valores=NIVEL1_FALTAS):
+    """
+    Sequências de dias consecutivos com estado em valores (os spells, se
+    valores são as faltas): login_colaborador, data_inicio, data_fim e
+    duracao_dias, ordenadas por colaborador e início
+    """
+    presente = mascara(matriz, valores).astype(np.int8)
+    limites = np.diff(np.pad(presente, ((0, 0), (1, 1))), axis=1)
+    linha_inicio, coluna_inicio = np.nonzero(limites == 1)
+    _, coluna_fim = np.nonzero(limites == -1)
+    del presente, limites
+
+    return pd.DataFrame({
+        'login_colaborador': matriz['logins'][linha_inicio],
+        'data_inicio': data_do_dia(matriz['primeiro_dia'] + coluna_inicio),
+        'data_fim': data_do_dia(matriz['primeiro_dia'] + coluna_fim - 1),
+        'duracao_dias': (coluna_fim - coluna_inicio).astype(np.int64),
+    })
+
+
+def bradford(matriz, ano, ativos=None, limite_dias=LIMITE_SHORT_TERM):
+    """
+    Bradford disruptivo (S² × D) de um ano a partir das sequências de faltas
+    short-term (até limite_dias) iniciadas no ano; ativos restringe os
+    colaboradores. Colunas como em df_bradford_disruptivo (sem nome/categoria).
+    """
+    df = sequencias(matriz)
+    curtas = (df['duracao_dias'] <= limite_dias) & (df['data_inicio'].dt.year == ano)
+    if ativos is not None:
+        curtas &= df['login_colaborador'].isin(pd.Index(ativos).astype(str))
+    df = df[curtas]
+
+    logins, linha = np.unique(df['login_colaborador'].to_numpy().astype(str), return_inverse=True)
+    num_spells = np.bincount(linha, minlength=len(logins)).astype(np.int64)
+    total_dias = np.bincount(linha, weights=df['duracao_dias'].to_numpy(), minlength=len(logins)).astype(np.int64)
+    score = num_spells ** 2 * total_dias
+    return pd.DataFrame({
+        'login_colaborador': logins.astype(object),
+        'num_spells_short': num_spells,
+        'total_dias_short': total_dias,
+        'bradford_disruptivo': score,
+        'risk_level': categorizar_bradford(score),
+    })
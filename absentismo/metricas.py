@@ -0,0 +1,454 @@
+"""
+Métricas do relatório executivo (criar_relatorio.py)
+
+Calcula, a partir dos artefactos do pipeline, todos os números e tabelas
+citados no relatório e guarda-os num ficheiro JSON. O relatório é gerado só a
+partir deste ficheiro, por isso um refresh dos dados é:
+    python criar_relatorio.py --calcular
+
+Valores em unidades naturais (percentagens já multiplicadas por 100, dias,
+contagens); a formatação fica a cargo do relatório.
+"""
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from absentismo.bradford import LIMITES_BRADFORD, NIVEIS_RISCO
+from absentismo.cohorts import cohorts_senioridade
+from absentismo.comparacao import comparar_anos
+from absentismo.cubo import agregar, pareto, taxas
+from absentismo.datas import atributos_dia, data_do_dia, dia_semana, dimensao_para, numero_dia, periodo_mes
+from absentismo.feriados import adjacente_feriado, calendario_feriados, indice_feriados
+from absentismo.pipeline import PARAMETROS, executar
+from absentismo.spells import BINS_DURACAO, LABELS_DURACAO, LIMITE_LONG_TERM, LIMITE_SHORT_TERM
+
+FICHEIRO_METRICAS = 'metricas_relatorio.json'
+
+# Artefactos do pipeline de que as métricas dependem
+ARTEFACTOS_METRICAS = [
+    'df_registos_raw', 'df_incompativeis', 'df_atrasos', 'df_absentismo', 'df_faltas',
+    'df_base_absentismo', 'df_cubo', 'df_spells', 'df_colaboradores_ativos',
+    'df_bradford_disruptivo', 'df_ponte_colab', 'df_padroes_seg_sex',
+    'df_medicas_colab', 'df_sintese', 'df_cluster', 'df_cohort_stats',
+    'df_metricas_comp', 'df_comp_mensal', 'df_k',
+]
+
+# Segmentos (relatórios por operação / categoria): artefactos com uma linha por
+# registo (ou contagens por operação e categoria) são filtrados pela coluna; os
+# restantes pelos colaboradores do segmento
+COLUNAS_SEGMENTO = ['operacao', 'categoria_profissional']
+ARTEFACTOS_REGISTO = ['df_registos_raw', 'df_atrasos', 'df_absentismo', 'df_faltas', 'df_base_absentismo', 'df_cubo']
+
+MIN_COLABORADORES_SEGMENTO = 20  # Rankings por operação/categoria
+TOP_SEGMENTOS = 10
+TOP_TIPOS_AUSENCIA = 5
+TOP_PARETO = [5, 10, 15]
+TOP_PRIORITARIAS = 3
+
+ORDEM_DIAS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DIAS_UTEIS = ORDEM_DIAS[:5]
+
+
+def _pct(parte, total):
+    return float(parte / total * 100) if total > 0 else 0.0
+
+
+def _variacao(antes, depois):
+    return float((depois - antes) / antes * 100) if antes else 0.0
+
+
+# ======================================================================
+# SECÇÕES
+# ======================================================================
+
+def _ambito(a):
+    df_base = a['df_base_absentismo']
+    return {
+        'data_inicio': df_base['Data'].min().date().isoformat(),
+        'data_fim': df_base['Data'].max().date().isoformat(),
+        'num_meses': int(df_base['Ano_Mes'].nunique()),
+        'num_colaboradores': int(df_base['login_colaborador'].nunique()),
+        'num_registos': int(a['df_registos_raw']['num_registos'].sum()),
+        'dias_colaborador': int(len(a['df_absentismo'])),
+        'num_incompatibilidades': int(len(a['df_incompativeis'])),
+    }
+
+
+def _kpis(a):
+    """KPIs do Grupo 4 (PASSO 4.1); taxas a partir dos totais do cubo"""
+    df_spells, df_atrasos = a['df_spells'], a['df_atrasos']
+    totais = taxas(a['df_cubo'])
+
+    num_colaboradores = a['df_base_absentismo']['login_colaborador'].nunique()
+    com_atraso = df_atrasos['Nivel 1'] == 'Atraso'
+
+    return {
+        'taxa_absentismo': float(totais['taxa_absentismo']),
+        'taxa_atrasos': float(totais['taxa_atrasos']),
+        'pct_colaboradores_com_atraso': _pct(
+            df_atrasos.loc[com_atraso, 'login_colaborador'].nunique(),
+            df_atrasos['login_colaborador'].nunique()
+        ),
+        'dias_perdidos': int(totais['dias_falta']),
+        'lost_time_rate': float(df_spells['duracao_dias'].sum() / num_colaboradores),
+        'frequency_rate': float(len(df_spells) / num_colaboradores),
+        'duracao_media_spell': float(df_spells['duracao_dias'].mean()),
+        'pct_sem_ausencias': _pct(num_colaboradores - df_spells['login_colaborador'].nunique(), num_colaboradores),
+    }
+
+
+def _tipos_ausencia(a):
+    """Dias de falta por Nivel 2 (top TOP_TIPOS_AUSENCIA + Outras)"""
+    contagem = a['df_faltas']['Nivel 2'].astype(object).fillna('Não Especificado').value_counts()
+    total = int(contagem.sum())
+    tipos = [[str(t), int(n), _pct(n, total)] for t, n in contagem.head(TOP_TIPOS_AUSENCIA).items()]
+    outras = int(contagem.iloc[TOP_TIPOS_AUSENCIA:].sum())
+    if outras > 0:
+        tipos.append(['Outras', outras, _pct(outras, total)])
+    return tipos
+
+
+def _dia_semana(a):
+    """Taxa de absentismo por dia da semana e acréscimo do fim de semana face aos dias úteis"""
+    taxa = taxas(a['df_cubo'], 'dia_semana')['taxa_absentismo'].reindex(range(7), fill_value=0)
+    taxa.index = ORDEM_DIAS
+
+    media_uteis = taxa[DIAS_UTEIS].mean()
+    acrescimo = [_variacao(media_uteis, taxa[d]) for d in ('Saturday', 'Sunday')]
+    return {
+        'taxas': [[d, float(taxa[d])] for d in ORDEM_DIAS],
+        'acrescimo_fim_semana_min': min(acrescimo),
+        'acrescimo_fim_semana_max': max(acrescimo),
+    }
+
+
+def _spells(a):
+    df_spells = a['df_spells']
+    total = len(df_spells)
+    faixas = pd.cut(df_spells['duracao_dias'], bins=BINS_DURACAO, labels=LABELS_DURACAO)
+    contagem = faixas.value_counts().reindex(LABELS_DURACAO, fill_value=0)
+
+    short = df_spells[df_spells['short_term']]
+    long = df_spells[df_spells['long_term']]
+    total_dias = df_spells['duracao_dias'].sum()
+
+    # Taxa de início por período do mês (por 1000 dias de base, Grupo 3)
+    inicios = np.bincount(periodo_mes(df_spells['data_inicio'].dt.day), minlength=10)
+    base = agregar(a['df_cubo'], 'periodo_mes')['dias_base'].reindex(range(10), fill_value=0).to_numpy()
+    taxa_periodo = np.divide(inicios * 1000, base, out=np.zeros(10), where=base > 0)
+    taxa_meio = taxa_periodo[1:9].mean()
+
+    return {
+        'total': int(total),
+        'limite_short_term': LIMITE_SHORT_TERM,
+        'limite_long_term': LIMITE_LONG_TERM,
+        'distribuicao': [[faixa, int(n), _pct(n, total)] for faixa, n in contagem.items()],
+        'short_term_num': int(len(short)),
+        'short_term_dias': int(short['duracao_dias'].sum()),
+        'short_term_pct': _pct(len(short), total),
+        'long_term_num': int(len(long)),
+        'long_term_dias': int(long['duracao_dias'].sum()),
+        'long_term_pct': _pct(len(long), total),
+        'long_term_pct_dias': _pct(long['duracao_dias'].sum(), total_dias),
+        'taxa_periodo_mes': [float(t) for t in taxa_periodo],
+        'acrescimo_inicio_mes': _variacao(taxa_meio, taxa_periodo[0]),
+        'acrescimo_fim_mes': _variacao(taxa_meio, taxa_periodo[9]),
+        'pct_short_term_segunda': _pct((short['dia_semana_inicio'] == 'Monday').sum(), len(short)),
+    }
+
+
+def _bradford(a):
+    df_bradford = a['df_bradford_disruptivo']
+    total = len(df_bradford)
+    contagem = df_bradford['risk_level'].value_counts().reindex(NIVEIS_RISCO, fill_value=0)
+    num_ativos = len(a['df_colaboradores_ativos'])
+    acima_100 = int((df_bradford['bradford_disruptivo'] >= 100).sum())
+    acima_200 = int((df_bradford['bradford_disruptivo'] >= 200).sum())
+
+    return {
+        'limites': list(LIMITES_BRADFORD),
+        'niveis': [[nivel.split('. ')[1], int(n), _pct(n, total)] for nivel, n in contagem.items()],
+        'num_colaboradores': int(total),
+        'num_ativos': int(num_ativos),
+        'pct_base_ativa': _pct(total, num_ativos),
+        'acima_100_num': acima_100,
+        'acima_100_pct': _pct(acima_100, total),
+        'acima_200_num': acima_200,
+        'acima_200_pct': _pct(acima_200, total),
+        'media': float(df_bradford['bradford_disruptivo'].mean()) if total > 0 else 0.0,
+    }
+
+
+def _ranking_bradford(df_segmentos, coluna):
+    """Bradford médio por segmento (>= MIN_COLABORADORES_SEGMENTO), ordenado do maior para o menor"""
+    ranking = df_segmentos.groupby(coluna, observed=True)['bradford_disruptivo'].agg(['mean', 'count'])
+    ranking = ranking[ranking['count'] >= MIN_COLABORADORES_SEGMENTO].sort_values('mean', ascending=False)
+    return [[str(s), float(r['mean']), int(r['count'])] for s, r in ranking.head(TOP_SEGMENTOS).iterrows()]
+
+
+def _segmentos_bradford(a, ano):
+    """PASSO 5.2: Bradford disruptivo por operação e por categoria profissional"""
+    df_base = a['df_base_absentismo']
+    df_bradford = a['df_bradford_disruptivo']
+    df_segmentos = df_bradford.merge(
+        df_base[(df_base['Activo?'] == 'Sim') & (df_base['Data'].dt.year == ano)][
+            ['login_colaborador', 'operacao']
+        ].drop_duplicates(),
+        on='login_colaborador',
+        how='left'
+    )
+    categorias = df_bradford['categoria_profissional'].value_counts()
+    return {
+        'min_colaboradores': MIN_COLABORADORES_SEGMENTO,
+        'operacoes': _ranking_bradford(df_segmentos, 'operacao'),
+        'categorias': _ranking_bradford(df_bradford, 'categoria_profissional'),
+        'categoria_maior': str(categorias.index[0]) if len(categorias) else '',
+        'categoria_maior_bradford': float(
+            df_bradford.loc[df_bradford['categoria_profissional'] == categorias.index[0], 'bradford_disruptivo'].mean()
+        ) if len(categorias) else 0.0,
+    }
+
+
+def _padroes(a):
+    df_spells, df_faltas = a['df_spells'], a['df_faltas']
+    short = df_spells[df_spells['short_term']]
+    ambito = a['df_base_absentismo']['Data']
+
+    calendario = calendario_feriados(ambito.min().year, ambito.max().year)
+    no_periodo = calendario['Data'].between(ambito.min(), ambito.max())
+    indice = indice_feriados(calendario_feriados(ambito.min().year - 1, ambito.max().year + 1))
+
+    medicas_short = short[short['nivel2_predominante'] == 'Ausência Médica']
+    num_medicas = int((df_spells['nivel2_predominante'] == 'Ausência Médica').sum())
+    num_flags = a['df_sintese']['num_flags'].value_counts()
+
+    return {
+        'num_feriados': int(no_periodo.sum()),
+        'pct_short_term_feriado': _pct(adjacente_feriado(short['data_inicio'], indice).sum(), len(short)),
+        'colaboradores_ponte': int(a['df_ponte_colab']['flag_bridge_pattern'].sum()),
+        'colaboradores_seg_sex': int(a['df_padroes_seg_sex']['flag_weekend_pattern'].sum()),
+        'colaboradores_medica': int(a['df_medicas_colab']['flag_medica_suspeita'].sum()),
+        'dias_ausencia_medica': int((df_faltas['Nivel 2'] == 'Ausência Médica').sum()),
+        'medicas_short_num': int(len(medicas_short)),
+        'medicas_short_pct': _pct(len(medicas_short), num_medicas),
+        'medicas_short_pct_segunda': _pct((medicas_short['dia_semana_inicio'] == 'Monday').sum(), len(medicas_short)),
+        'num_flags': [[int(n), int(num_flags.get(n, 0))] for n in range(4)],
+    }
+
+
+def _comparacao(a, parametros):
+    df_comp = a['df_metricas_comp'].sort_values('Ano')
+    anos = [
+        {
+            'ano': int(r['Ano']),
+            'taxa_absentismo': float(r['Taxa Absentismo (%)']),
+            'faltas': int(r['Faltas']),
+            'num_spells': int(r['Num Spells']),
+            'duracao_media': float(r['Duração Média Spell']),
+        }
+        for _, r in df_comp.iterrows()
+    ]
+    primeiro, ultimo = anos[0], anos[-1]
+
+    mensal = a['df_comp_mensal'].pivot(index='mes', columns='ano', values='taxa_abs')
+    resultado = {
+        'mes_max': int(parametros['mes_max_comparacao']),
+        'anos': anos,
+        'variacao_taxa': _variacao(primeiro['taxa_absentismo'], ultimo['taxa_absentismo']),
+        'variacao_faltas': _variacao(primeiro['faltas'], ultimo['faltas']),
+        'variacao_spells': _variacao(primeiro['num_spells'], ultimo['num_spells']),
+        'variacao_duracao': _variacao(primeiro['duracao_media'], ultimo['duracao_media']),
+        'meses_inferiores': 0,
+        'num_meses': 0,
+        'maior_reducao_mes': None,
+        'mensal': [
+            [int(r['ano']), int(r['mes']), float(r['taxa_abs'])]
+            for _, r in a['df_comp_mensal'].sort_values(['ano', 'mes']).iterrows()
+        ],
+    }
+    if primeiro['ano'] in mensal.columns and ultimo['ano'] in mensal.columns:
+        pares = mensal[[primeiro['ano'], ultimo['ano']]].dropna()
+        reducao = pares[primeiro['ano']] - pares[ultimo['ano']]
+        resultado['meses_inferiores'] = int((reducao > 0).sum())
+        resultado['num_meses'] = int(len(pares))
+        if len(pares) > 0:
+            mes = reducao.idxmax()
+            resultado['maior_reducao_mes'] = [int(mes), float(pares.loc[mes, primeiro['ano']]), float(pares.loc[mes, ultimo['ano']])]
+    return resultado
+
+
+def _operacoes(a, taxa_global):
+    """Pareto e matriz taxa vs. contribuição por operação (Grupo 2), roll-up do cubo"""
+    df_op = pareto(a['df_cubo'], 'operacao')
+    acumulado = df_op['contribuicao_acumulada']
+    prioritarias = df_op[df_op['taxa_absentismo'] > taxa_global].head(TOP_PRIORITARIAS)
+    return {
+        'matriz': [
+            [str(op), float(r['taxa_absentismo']), int(r['dias_falta']), float(r['contribuicao_pct'])]
+            for op, r in df_op.iterrows()
+        ],
+        'pareto': [[n, float(acumulado.iloc[min(n, len(acumulado)) - 1]) if len(acumulado) else 0.0] for n in TOP_PARETO],
+        'prioritarias': [
+            [str(op), float(r['taxa_absentismo']), int(r['dias_falta']), float(r['contribuicao_pct'])]
+            for op, r in prioritarias.iterrows()
+        ],
+    }
+
+
+def _clusters(a):
+    df_cluster = a['df_cluster']
+    perfis = df_cluster.groupby('cluster_nome').agg(
+        num_colaboradores=('login_colaborador', 'count'),
+        bradford=('bradford_disruptivo', 'mean'),
+        num_spells=('num_spells_short', 'mean'),
+    ).sort_values('bradford')
+    return [
+        [str(nome), int(r['num_colaboradores']), float(r['bradford']), float(r['num_spells'])]
+        for nome, r in perfis.iterrows()
+    ]
+
+
+def _varrimento_k(a):
+    """Inércia e silhouette por K (método do cotovelo, Grupo 9)"""
+    return [[int(r['K']), float(r['inertia']), float(r['silhouette'])] for _, r in a['df_k'].iterrows()]
+
+
+def _u_chart(a, ano):
+    """
+    Faltas por colaborador ativo em cada semana de ano, com limites de controlo
+    u ± 3·sqrt(u/n) (Grupo 7)
+    """
+    df_faltas, df_base = a['df_faltas'], a['df_base_absentismo']
+    dimensao = dimensao_para(df_base['Data'])
+
+    def segunda_feira(df):
+        # Semana (número de dia da segunda-feira) dos registos do ano
+        dia = numero_dia(df['Data'])
+        no_ano = atributos_dia(dia, dimensao, 'ano').to_numpy() == ano
+        return dia[no_ano] - dia_semana(dia[no_ano]), no_ano
+
+    semana_falta, _ = segunda_feira(df_faltas)
+    ausencias = pd.Series(semana_falta).value_counts()
+    trabalho = df_base[(df_base['Nivel 1'] == 'Trabalho Pago').to_numpy()]
+    semana_trabalho, no_ano = segunda_feira(trabalho)
+    ativos = pd.Series(trabalho['login_colaborador'].to_numpy()[no_ano]).groupby(semana_trabalho).nunique()
+
+    semanas = pd.DataFrame({'ausencias': ausencias, 'colaboradores': ativos.reindex(ausencias.index)}).sort_index()
+    semanas = semanas[semanas['colaboradores'] > 0]
+    taxa = semanas['ausencias'] / semanas['colaboradores']
+    media = float(taxa.mean()) if len(taxa) else 0.0
+    desvio = 3 * np.sqrt(media / semanas['colaboradores'])
+    fora = (taxa > media + desvio) | (taxa < (media - desvio).clip(lower=0))
+    return {
+        'media': media,
+        'semanas_fora_controlo': int(fora.sum()),
+        'semanas': [
+            [inicio.date().isoformat(), int(r['ausencias']), int(r['colaboradores'])]
+            for inicio, r in semanas.set_axis(pd.DatetimeIndex(data_do_dia(semanas.index))).iterrows()
+        ],
+    }
+
+
+def _cohorts(a):
+    return [[str(r['cohort']), float(r['taxa_absentismo'])] for _, r in a['df_cohort_stats'].iterrows()]
+
+
+# ======================================================================
+# SEGMENTOS
+# ======================================================================
+
+def filtrar_segmento(artefactos, coluna, valor, parametros=None):
+    """
+    Artefactos restritos a um segmento (coluna em COLUNAS_SEGMENTO)
+
+    Os artefactos por registo ficam só com as linhas do segmento; os artefactos
+    por colaborador (spells, Bradford, flags, clusters) com os colaboradores
+    que têm registos no segmento. Cohorts e comparação anual são recalculados
+    sobre o segmento.
+    """
+    if coluna not in COLUNAS_SEGMENTO:
+        raise ValueError(f'Coluna de segmento inválida: {coluna} (esperado: {COLUNAS_SEGMENTO})')
+    parametros = {**PARAMETROS, **(parametros or {})}
+
+    filtrados = {
+        nome: df[df[coluna] == valor]
+        for nome, df in artefactos.items() if nome in ARTEFACTOS_REGISTO
+    }
+    logins = filtrados['df_base_absentismo']['login_colaborador'].unique()
+    for nome, df in artefactos.items():
+        if nome not in filtrados and 'login_colaborador' in df.columns:
+            filtrados[nome] = df[df['login_colaborador'].isin(logins)]
+    # Artefactos globais (varrimento de K do clustering) ficam inalterados
+    filtrados['df_k'] = artefactos['df_k']
+
+    filtrados['df_cohort_stats'] = cohorts_senioridade(
+        filtrados['df_base_absentismo'], parametros['ano_analise'], parametros['data_ref_cohort']
+    ).reset_index()
+    filtrados['df_metricas_comp'], filtrados['df_comp_mensal'] = comparar_anos(
+        filtrados['df_base_absentismo'], filtrados['df_spells'],
+        parametros['anos_comparacao'], parametros['mes_max_comparacao']
+    )
+    return filtrados
+
+
+def segmentos_principais(artefactos, coluna='operacao', top=15):
+    """Os top segmentos por número de dias de falta"""
+    return artefactos['df_faltas'][coluna].value_counts().head(top).index.astype(str).tolist()
+
+
+# ======================================================================
+# BUNDLE
+# ======================================================================
+
+def calcular_metricas(artefactos, parametros=None, segmento=None):
+    """
+    Dicionário (serializável em JSON) com todas as métricas do relatório
+
+    segmento: (coluna, valor) se os artefactos foram filtrados com
+    filtrar_segmento (fica registado no bundle).
+    """
+    parametros = {**PARAMETROS, **(parametros or {})}
+    kpis = _kpis(artefactos)
+    return {
+        'data_geracao': date.today().isoformat(),
+        'segmento': list(segmento) if segmento else None,
+        'ano_analise': int(parametros['ano_analise']),
+        'ambito': _ambito(artefactos),
+        'kpis': kpis,
+        'tipos_ausencia': _tipos_ausencia(artefactos),
+        'dia_semana': _dia_semana(artefactos),
+        'spells': _spells(artefactos),
+        'bradford': _bradford(artefactos),
+        'segmentos': _segmentos_bradford(artefactos, parametros['ano_analise']),
+        'padroes': _padroes(artefactos),
+        'comparacao': _comparacao(artefactos, parametros),
+        'operacoes': _operacoes(artefactos, kpis['taxa_absentismo']),
+        'clusters': _clusters(artefactos),
+        'varrimento_k': _varrimento_k(artefactos),
+        'u_chart': _u_chart(artefactos, parametros['ano_analise']),
+        'cohorts': _cohorts(artefactos),
+    }
+
+
+def guardar_metricas(metricas, caminho=FICHEIRO_METRICAS):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(metricas, f, ensure_ascii=False, indent=1)
+
+
+def carregar_metricas(caminho=FICHEIRO_METRICAS):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gerar_metricas(caminho=FICHEIRO_METRICAS, parametros=None, **kwargs):
+    """Executa o pipeline (usando a cache), calcula as métricas e guarda-as em caminho"""
+    artefactos = executar(ARTEFACTOS_METRICAS, parametros=parametros, **kwargs)
+    metricas = calcular_metricas(artefactos, parametros)
+    guardar_metricas(metricas, caminho)
+    return metricas
@@ -0,0 +1,149 @@
+"""
+Deteção de padrões suspeitos nos spells short-term (Grupo 6)
+
+Três flags por colaborador, calculadas sobre df_spells_disruptivos:
+- Segunda/Sexta: >50% dos spells começam à segunda OU terminam à sexta (mínimo 5 spells)
+- Ponte: >40% dos inícios/fins adjacentes (±1 dia) a feriados (mínimo 5 spells)
+- Baixa médica: >=3 baixas médicas short-term, >60% começam à segunda
+
+Todas as contagens por colaborador saem de uma única passagem
+(contagens_padroes): dia da semana como inteiro (segunda = 0), distância ao
+feriado mais próximo por searchsorted e somas por colaborador com
+np.bincount. Flags, número de flags e nível de suspeita são colunas
+vetorizadas.
+"""
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import dia_semana, numero_dia
+from absentismo.feriados import TOLERANCIA_DIAS, distancia_feriado
+
+MIN_SPELLS_PADRAO = 5
+LIMITE_WEEKEND = 0.5
+LIMITE_PONTE = 0.4
+MIN_MEDICAS = 3
+LIMITE_MEDICAS_SEGUNDA = 0.6
+
+SEGUNDA, SEXTA = 0, 4
+NIVEL2_MEDICA = 'Ausência Médica'
+
+FLAGS = ['flag_weekend_pattern', 'flag_bridge_pattern', 'flag_medica_suspeita']
+NIVEIS_SUSPEITA = ['Sem flags', '1 flag', '2 flags', '3 flags']
+
+
+def _colaboradores(logins):
+    """Grupo de cada linha e colaboradores distintos, na ordem do groupby por login"""
+    if isinstance(logins.dtype, pd.CategoricalDtype):
+        codigos = logins.cat.codes.to_numpy()
+        presentes = np.unique(codigos)
+        return np.searchsorted(presentes, codigos), pd.Categorical.from_codes(presentes, dtype=logins.dtype)
+    return pd.factorize(logins.to_numpy(), sort=True)
+
+
+def contagens_padroes(df_spells_disruptivos, indice_feriados=()):
+    """
+    Contagens por colaborador: total_spells, inicio_segunda, fim_sexta,
+    inicio_adj / fim_adj (a ±TOLERANCIA_DIAS de um feriado de
+    indice_feriados), num_medicas_short e medicas_segunda
+    """
+    df = df_spells_disruptivos
+    grupo, logins = _colaboradores(df['login_colaborador'])
+    indice = np.asarray(indice_feriados, dtype=np.int64)
+    inicio, fim = numero_dia(df['data_inicio']), numero_dia(df['data_fim'])
+    inicio_segunda = dia_semana(inicio) == SEGUNDA
+    medica = (df['nivel2_predominante'] == NIVEL2_MEDICA).to_numpy()
+
+    def somar(valores=None):
+        return np.bincount(grupo, weights=valores, minlength=len(logins)).astype(np.int64)
+
+    return pd.DataFrame({
+        'login_colaborador': logins,
+        'total_spells': somar(),
+        'inicio_segunda': somar(inicio_segunda),
+        'fim_sexta': somar(dia_semana(fim) == SEXTA),
+        'inicio_adj': somar(distancia_feriado(df['data_inicio'], indice) <= TOLERANCIA_DIAS),
+        'fim_adj': somar(distancia_feriado(df['data_fim'], indice) <= TOLERANCIA_DIAS),
+        'num_medicas_short': somar(medica),
+        'medicas_segunda': somar(medica & inicio_segunda),
+    })
+
+
+# ======================================================================
+# FLAGS (a partir das contagens)
+# ======================================================================
+
+def _fim_de_semana(contagens):
+    df = contagens[['login_colaborador', 'total_spells', 'inicio_segunda', 'fim_sexta']].copy()
+    df['prop_inicio_segunda'] = df['inicio_segunda'] / df['total_spells']
+    df['prop_fim_sexta'] = df['fim_sexta'] / df['total_spells']
+    df['flag_weekend_pattern'] = (
+        ((df['prop_inicio_segunda'] > LIMITE_WEEKEND) | (df['prop_fim_sexta'] > LIMITE_WEEKEND)) &
+        (df['total_spells'] >= MIN_SPELLS_PADRAO)
+    )
+    return df
+
+
+def _ponte(contagens):
+    df = contagens[['login_colaborador', 'total_spells', 'inicio_adj', 'fim_adj']].copy()
+    df['num_adj_total'] = df['inicio_adj'] + df['fim_adj']
+    df['prop_ponte'] = df['num_adj_total'] / (df['total_spells'] * 2)
+    df['flag_bridge_pattern'] = (df['prop_ponte'] > LIMITE_PONTE) & (df['total_spells'] >= MIN_SPELLS_PADRAO)
+    return df
+
+
+def _medico(contagens):
+    df = contagens.loc[contagens['num_medicas_short'] > 0, ['login_colaborador', 'num_medicas_short', 'medicas_segunda']]
+    df = df.rename(columns={'medicas_segunda': 'inicio_segunda'}).reset_index(drop=True)
+    df['prop_segunda'] = df['inicio_segunda'] / df['num_medicas_short']
+    df['flag_medica_suspeita'] = (df['num_medicas_short'] >= MIN_MEDICAS) & (df['prop_segunda'] > LIMITE_MEDICAS_SEGUNDA)
+    return df
+
+
+def padrao_fim_de_semana(df_spells_disruptivos):
+    """PASSO 6.1: df_padroes_seg_sex (spells que começam à segunda / terminam à sexta)"""
+    return _fim_de_semana(contagens_padroes(df_spells_disruptivos))
+
+
+def padrao_ponte(df_spells_disruptivos, indice_feriados):
+    """PASSO 6.2: df_ponte_colab (inícios/fins adjacentes a feriados)"""
+    return _ponte(contagens_padroes(df_spells_disruptivos, indice_feriados))
+
+
+def padrao_medico(df_spells_disruptivos):
+    """PASSO 6.3: df_medicas_colab (baixas médicas short-term que começam à segunda)"""
+    return _medico(contagens_padroes(df_spells_disruptivos))
+
+
+# ======================================================================
+# SÍNTESE
+# ======================================================================
+
+def nivel_suspeita(num_flags):
+    """Nível de suspeita a partir do número de flags (vetorizado)"""
+    return np.asarray(NIVEIS_SUSPEITA, dtype=object)[np.clip(np.asarray(num_flags, dtype=np.int64), 0, 3)]
+
+
+def sintese_padroes(df_bradford_disruptivo, df_padroes_seg_sex, df_ponte_colab, df_medicas_colab):
+    """PASSO 6.4: df_sintese (Bradford + flags + nível de suspeita por colaborador)"""
+    df_sintese = df_bradford_disruptivo[['login_colaborador', 'nome_colaborador', 'bradford_disruptivo', 'risk_level']].copy()
+
+    for df_flag, flag in zip((df_padroes_seg_sex, df_ponte_colab, df_medicas_colab), FLAGS):
+        df_sintese[flag] = df_sintese['login_colaborador'].map(
+            df_flag.set_index('login_colaborador')[flag]
+        ).astype('boolean').fillna(False).astype(bool)
+
+    df_sintese['num_flags'] = df_sintese[FLAGS].sum(axis=1).astype(np.int64)
+    df_sintese['nivel_suspeita'] = pd.Series(nivel_suspeita(df_sintese['num_flags']), index=df_sintese.index, dtype='str')
+    return df_sintese
+
+
+def padroes_suspeitos(df_spells_disruptivos, df_bradford_disruptivo, indice_feriados):
+    """
+    PASSOS 6.1 a 6.4 numa passagem pelos spells
+
+    Devolve (df_padroes_seg_sex, df_ponte_colab, df_medicas_colab, df_sintese).
+    """
+    contagens = contagens_padroes(df_spells_disruptivos, indice_feriados)
+    df_padroes_seg_sex, df_ponte_colab, df_medicas_colab = _fim_de_semana(contagens), _ponte(contagens), _medico(contagens)
+    df_sintese = sintese_padroes(df_bradford_disruptivo, df_padroes_seg_sex, df_ponte_colab, df_medicas_colab)
+    return df_padroes_seg_sex, df_ponte_colab, df_medicas_colab, df_sintese
@@ -0,0 +1,137 @@
+"""
+Execução multi-core das análises por colaborador (spells, Bradford, padrões)
+
+Spells, Bradford disruptivo e as flags de segunda/sexta, ponte e baixa médica
+só dependem dos registos de cada colaborador. Os colaboradores são repartidos
+por hash do login em fragmentos (um por processo), cada fragmento é analisado
+num ProcessPoolExecutor e os resultados são concatenados numa ordem
+determinística: por colaborador (a ordem do groupby em série) e, nos spells,
+com spell_id renumerado por (colaborador, data de início). O resultado é
+idêntico ao da execução em série.
+
+O pool só compensa com muitos registos: arrancar os processos, serializar os
+fragmentos e juntar os resultados custa ~0,1 s por processo, enquanto a versão
+em série processa ~1-2M linhas/s (60k faltas: 43 ms em série, 160 ms com 2
+processos, 260 ms com 4). Por isso cada processo tem de receber pelo menos
+LINHAS_POR_PROCESSO linhas: abaixo disso usam-se menos processos e, com menos
+de duas vezes esse valor, a função em série. Mesmo acima do limiar o ganho
+fica abaixo de linear (a junção final é em série).
+
+Na prática o pool só serve para volumes de 2M+ linhas: os dados reais ficam
+abaixo disso e correm sempre em série. O limiar é uma estimativa a partir
+daqueles custos, medidos numa máquina de um só core (sintético 10×, 617k
+faltas: 0,25 s em série, 0,77 s com 2 processos); o ganho em multi-core não
+foi medido. Para o calibrar, correr benchmark.py a 10× e 100× numa
+máquina multi-core e comparar as linhas spells_1p e spells_<N>p.
+
+    from absentismo import paralelo
+    df_spells, df_colab_spells, df_spells_abertos = paralelo.construir_spells(df_faltas, processos=16)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from absentismo import bradford, padroes, spells
+
+# Linhas mínimas por processo para o pool compensar o arranque (estimativa; ver benchmark.py)
+LINHAS_POR_PROCESSO = 1_000_000
+
+
+def num_processos(processos=None, linhas=None):
+    """
+    Número de processos a usar (por omissão, um por core), limitado a um por
+    LINHAS_POR_PROCESSO linhas quando linhas é indicado (1: execução em série)
+    """
+    processos = max(1, processos or os.cpu_count() or 1)
+    if linhas is not None:
+        processos = max(1, min(processos, linhas // LINHAS_POR_PROCESSO))
+    return processos
+
+
+def particao_colaborador(logins, num_particoes):
+    """Partição de cada login (hash estável entre blocos e execuções)"""
+    chaves = pd.util.hash_pandas_object(pd.Series(logins, dtype=object).astype(str), index=False)
+    return (chaves.to_numpy() % np.uint64(num_particoes)).astype(np.int64)
+
+
+def fragmentar(df, num_fragmentos, coluna='login_colaborador'):
+    """Divide df em fragmentos disjuntos de colaboradores (mantém o índice e a ordem das linhas)"""
+    particao = particao_colaborador(df[coluna], num_fragmentos)
+    return [df[particao == p] for p in range(num_fragmentos) if (particao == p).any()]
+
+
+def _ordenar_colaborador(partes, coluna='login_colaborador'):
+    """Concatena resultados por colaborador na ordem do groupby em série"""
+    return pd.concat(partes).sort_values(coluna, kind='stable', ignore_index=True)
+
+
+def _mapear(funcao, fragmentos, processos, *argumentos):
+    with ProcessPoolExecutor(max_workers=min(processos, len(fragmentos))) as executor:
+        return list(executor.map(funcao, fragmentos, *([a] * len(fragmentos) for a in argumentos)))
+
+
+# ======================================================================
+# TRABALHO POR FRAGMENTO
+# ======================================================================
+
+def _spells_fragmento(df_faltas):
+    df_ausencias, df_spells = spells.construir_spells(df_faltas)
+    return df_spells, spells.agregar_spells_colaborador(df_spells), spells.spells_abertos(df_ausencias)
+
+
+def _bradford_fragmento(df_spells, ativos, ano):
+    return bradford.bradford_anual(df_spells, ativos, ano)
+
+
+def _padroes_fragmento(df_spells_disruptivos, df_bradford_disruptivo, indice_feriados):
+    return padroes.padroes_suspeitos(df_spells_disruptivos, df_bradford_disruptivo, indice_feriados)
+
+
+# ======================================================================
+# API (mesmos resultados que as funções em série)
+# ======================================================================
+
+def construir_spells(df_faltas, processos=None):
+    """Devolve (df_spells, df_colab_spells, df_spells_abertos), como no PASSO 3"""
+    processos = num_processos(processos, len(df_faltas))
+    if processos == 1:
+        return _spells_fragmento(df_faltas)
+
+    resultados = _mapear(_spells_fragmento, fragmentar(df_faltas, processos), processos)
+    df_spells, df_spells_abertos = spells.combinar_spells([r[0] for r in resultados], [r[2] for r in resultados])
+    return df_spells, _ordenar_colaborador([r[1] for r in resultados]), df_spells_abertos
+
+
+def bradford_anual(df_spells, ativos, ano, processos=None):
+    """Devolve (df_spells_disruptivos, df_bradford_disruptivo), como bradford.bradford_anual"""
+    processos = num_processos(processos, len(df_spells))
+    if processos == 1:
+        return bradford.bradford_anual(df_spells, ativos, ano)
+
+    resultados = _mapear(_bradford_fragmento, fragmentar(df_spells, processos), processos, ativos, ano)
+    # Os spells disruptivos mantêm o índice de df_spells: a ordem original é a do índice
+    df_spells_disruptivos = pd.concat([r[0] for r in resultados]).sort_index()
+    return df_spells_disruptivos, _ordenar_colaborador([r[1] for r in resultados])
+
+
+def padroes_suspeitos(df_spells_disruptivos, df_bradford_disruptivo, indice_feriados, processos=None):
+    """Devolve (df_padroes_seg_sex, df_ponte_colab, df_medicas_colab, df_sintese), como no Grupo 6"""
+    processos = num_processos(processos, len(df_spells_disruptivos) + len(df_bradford_disruptivo))
+    if processos == 1 or len(df_bradford_disruptivo) == 0:
+        return _padroes_fragmento(df_spells_disruptivos, df_bradford_disruptivo, indice_feriados)
+
+    # Fragmentos alinhados: o mesmo colaborador fica no mesmo fragmento nas duas tabelas
+    particao_spells = particao_colaborador(df_spells_disruptivos['login_colaborador'], processos)
+    particao_bradford = particao_colaborador(df_bradford_disruptivo['login_colaborador'], processos)
+    presentes = [p for p in range(processos) if (particao_bradford == p).any() or (particao_spells == p).any()]
+
+    with ProcessPoolExecutor(max_workers=min(processos, len(presentes))) as executor:
+        resultados = list(executor.map(
+            _padroes_fragmento,
+            [df_spells_disruptivos[particao_spells == p] for p in presentes],
+            [df_bradford_disruptivo[particao_bradford == p] for p in presentes],
+            [indice_feriados] * len(presentes),
+        ))
+    return tuple(_ordenar_colaborador([r[i] for r in resultados]) for i in range(4))
@@ -0,0 +1,172 @@
+"""
+Dataset Parquet particionado por ano/mês com filtros de período e de estado
+
+As análises filtram repetidamente df_base_absentismo por ano, por meses e por
+'Activo?' == 'Sim', recalculando os acessores .dt sobre o frame completo. Aqui
+os registos limpos são escritos uma vez como dataset Parquet em partições
+hive (<pasta>/ano=2025/mes=3/...), ordenados dentro de cada partição por
+'Activo?', colaborador e dia, em grupos de linhas de LINHAS_GRUPO. Assim:
+
+- o filtro de período descarta partições inteiras pelo caminho (ano, mes) e
+  os limites de datas dentro do mês pelas estatísticas de Data;
+- o filtro de ativos descarta grupos de linhas pelas estatísticas de
+  'Activo?' (cada grupo tem quase sempre um único valor).
+
+estatisticas.json guarda, por partição, o número de registos, de ativos e de
+colaboradores e as datas mínima e máxima (mais as categorias das colunas
+categóricas, repostas na leitura).
+
+    from absentismo import particoes
+    particoes.gerar_dataset()                                   # pipeline (cache) -> .dataset_absentismo/
+    df = particoes.ler_dataset(periodo=('2025-01-01', '2025-06-30'), ativos=True)
+    particoes.estatisticas()
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from absentismo.comparacao import intervalo
+
+PASTA_DATASET = '.dataset_absentismo'
+FICHEIRO_ESTATISTICAS = 'estatisticas.json'
+LINHAS_GRUPO = 16_384
+ESQUEMA_PARTICAO = pa.schema([('ano', pa.int16()), ('mes', pa.int8())])
+
+
+def escrever_dataset(df, pasta=PASTA_DATASET, linhas_grupo=LINHAS_GRUPO):
+    """
+    Escreve df (registos com Data e 'Activo?') como dataset particionado por
+    ano/mês (substitui o conteúdo de pasta) e devolve as estatísticas por
+    partição
+    """
+    datas = df['Data'].to_numpy().astype('datetime64[M]').astype(np.int64)
+    ativo = (df['Activo?'] == 'Sim').to_numpy()
+    ordem = np.lexsort((df['Data'].to_numpy(), pd.factorize(df['login_colaborador'], sort=True)[0], ~ativo, datas))
+    df = df.take(ordem).reset_index(drop=True)
+    mes = datas[ordem]
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False).append_column(
+        'ano', pa.array(mes // 12 + 1970, pa.int16())
+    ).append_column('mes', pa.array(mes % 12 + 1, pa.int8()))
+
+    temporaria = pasta + '.tmp'
+    shutil.rmtree(temporaria, ignore_errors=True)
+    ds.write_dataset(
+        tabela, temporaria, format='parquet',
+        partitioning=ds.partitioning(ESQUEMA_PARTICAO, flavor='hive'),
+        basename_template='parte-{i}.parquet',
+        max_rows_per_group=linhas_grupo, min_rows_per_group=linhas_grupo,
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+    estatisticas = pd.DataFrame({
+        'mes': mes, 'ativo': ativo[ordem], 'login_colaborador': df['login_colaborador'].astype(object), 'Data': df['Data'],
+    }).groupby('mes', sort=True).agg(
+        registos=('ativo', 'size'),
+        registos_ativos=('ativo', 'sum'),
+        colaboradores=('login_colaborador', 'nunique'),
+        data_min=('Data', 'min'),
+        data_max=('Data', 'max'),
+    ).reset_index()
+    estatisticas.insert(0, 'ano', estatisticas['mes'] // 12 + 1970)
+    estatisticas['mes'] = estatisticas['mes'] % 12 + 1
+
+    indice = {
+        'colunas': list(df.columns),
+        'categorias': {c: [str(v) for v in df[c].cat.categories] for c in df.columns
+                       if isinstance(df[c].dtype, pd.CategoricalDtype)},
+        'particoes': json.loads(estatisticas.to_json(orient='records', date_format='iso')),
+    }
+    with open(os.path.join(temporaria, FICHEIRO_ESTATISTICAS), 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False)
+
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.replace(temporaria, pasta)
+    return estatisticas
+
+
+def gerar_dataset(pasta=PASTA_DATASET, artefacto='df_base_absentismo', linhas_grupo=LINHAS_GRUPO, **opcoes_pipeline):
+    """Escreve o dataset a partir de um artefacto do pipeline (opções como em pipeline.executar)"""
+    from absentismo.pipeline import executar
+
+    opcoes_pipeline.setdefault('verbose', False)
+    return escrever_dataset(executar([artefacto], **opcoes_pipeline)[artefacto], pasta, linhas_grupo)
+
+
+def _indice(pasta):
+    with open(os.path.join(pasta, FICHEIRO_ESTATISTICAS), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def estatisticas(pasta=PASTA_DATASET):
+    """Estatísticas por partição (ano, mes, registos, registos_ativos, colaboradores, data_min, data_max)"""
+    df = pd.DataFrame(_indice(pasta)['particoes'])
+    for coluna in ['data_min', 'data_max']:
+        df[coluna] = pd.to_datetime(df[coluna]).dt.tz_localize(None)
+    return df
+
+
+# ======================================================================
+# LEITURA COM FILTROS
+# ======================================================================
+
+def filtro(periodo=None, ativos=None):
+    """
+    Expressão de filtro do dataset: periodo (aceite por comparacao.intervalo:
+    '2025', '2025Q1', '2025-03' ou par de datas) e ativos (True: só
+    'Activo?' == 'Sim'; False: só os restantes; None: todos)
+    """
+    expressao = None
+
+    def juntar(parte):
+        return parte if expressao is None else expressao & parte
+
+    if periodo is not None:
+        _, inicio, fim = intervalo(periodo)
+        mes_inicio, mes_fim = inicio.year * 12 + inicio.month - 1, fim.year * 12 + fim.month - 1
+        # Partições: (ano, mes) entre o mês inicial e o final
+        mes = ds.field('ano').cast(pa.int32()) * 12 + ds.field('mes').cast(pa.int32()) - 1
+        expressao = juntar((mes >= mes_inicio) & (mes <= mes_fim))
+        # Grupos de linhas: limites de datas dentro dos meses extremos
+        expressao = juntar((ds.field('Data') >= pa.scalar(inicio.to_datetime64())) &
+                           (ds.field('Data') < pa.scalar((fim + pd.Timedelta(days=1)).to_datetime64())))
+    if ativos is not None:
+        expressao = juntar(ds.field('Activo?') == 'Sim' if ativos else ds.field('Activo?') != 'Sim')
+    return expressao
+
+
+def ler_dataset(pasta=PASTA_DATASET, periodo=None, ativos=None, colunas=None):
+    """
+    Registos do dataset que cumprem periodo e ativos (ver filtro), só com as
+    colunas pedidas; só são lidas as partições e os grupos de linhas que
+    podem conter registos do filtro
+
+    As colunas categóricas voltam com as categorias do frame original. As
+    linhas vêm ordenadas por mês, 'Activo?', colaborador e dia.
+    """
+    indice = _indice(pasta)
+    colunas = indice['colunas'] if colunas is None else list(colunas)
+    dataset = ds.dataset(pasta, format='parquet', partitioning=ds.partitioning(ESQUEMA_PARTICAO, flavor='hive'),
+                         ignore_prefixes=['.', FICHEIRO_ESTATISTICAS])
+    fragmentos = sorted(dataset.get_fragments(filter=filtro(periodo)), key=_ordem_fragmento)
+    tabela = ds.FileSystemDataset(fragmentos, dataset.schema, dataset.format).to_table(
+        columns=colunas, filter=filtro(periodo, ativos)
+    )
+
+    df = tabela.to_pandas()
+    for coluna in colunas:
+        if coluna in indice['categorias']:
+            # Dicionário do Arrow -> categorias do original (só remapeia os códigos)
+            df[coluna] = df[coluna].astype('category').cat.set_categories(indice['categorias'][coluna])
+    return df
+
+
+def _ordem_fragmento(fragmento):
+    """(ano, mes, ficheiro) de um fragmento: mantém a ordem cronológica das partições"""
+    chave = ds.get_partition_keys(fragmento.partition_expression)
+    return chave['ano'], chave['mes'], fragmento.path
@@ -0,0 +1,364 @@
+"""
+Pipeline por etapas com artefactos em cache (Grupos 1 a 9 sem estado partilhado)
+
+Cada etapa declara as entradas (artefactos de etapas anteriores) e os
+parâmetros que usa. A chave de uma etapa é o hash do seu código e dos módulos
+absentismo.* de que depende (os que a função usa e, transitivamente, os que
+esses importam), dos valores dos parâmetros e das chaves das etapas de que
+depende (na etapa de carregamento, do conteúdo dos ficheiros fonte). As saídas
+são guardadas em Parquet em PASTA_ARTEFACTOS/<etapa>/<chave>/, por isso
+alterar uma etapa (ou um parâmetro) só volta a executar essa etapa e as que
+dependem dela; tudo o resto é lido da cache.
+
+Uso num notebook:
+    from absentismo.pipeline import executar
+    artefactos = executar(['df_faltas', 'df_base_absentismo', 'df_spells'])
+    df_faltas = artefactos['df_faltas']
+"""
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from absentismo import bradford, carregamento, clustering, cohorts, comparacao, cubo, datas
+from absentismo import feriados, hierarquias, incompatibilidades, limpeza, padroes, paralelo, spells
+
+PASTA_ARTEFACTOS = '.artefactos'
+
+# Parâmetros da análise (só os usados por uma etapa entram na sua chave)
+PARAMETROS = {
+    'ano_analise': 2025,
+    'data_ref_cohort': '2025-06-30',
+    'anos_comparacao': [2024, 2025],
+    'mes_max_comparacao': 6,
+    'k_min': 2,
+    'k_max': 8,
+    'random_state': 42,
+    'modo_clustering': 'auto',       # 'auto', 'kmeans' ou 'minibatch'
+    'amostra_silhouette': 'auto',    # 'auto', None (todos) ou tamanho da amostra
+    # Processos das etapas por colaborador (spells, bradford, padroes) e do
+    # varrimento de K; não entra nas chaves porque o resultado é o mesmo
+    'processos': 1,
+}
+
+MARCADOR_CONCLUIDO = '_concluido'
+
+
+# ======================================================================
+# ETAPAS
+# ======================================================================
+
+def _carregar(entradas, parametros, fontes):
+    df_raw, df_codigos = carregamento.carregar_dados(fontes['dados'], fontes['codigos'], usar_cache=False)
+    return {'df_raw': df_raw, 'df_codigos': df_codigos, 'df_registos_raw': carregamento.contar_registos(df_raw)}
+
+
+def _classificar(entradas, parametros, fontes):
+    return {'df_temp': limpeza.classificar(entradas['df_raw'], entradas['df_codigos'])}
+
+
+def _limpar(entradas, parametros, fontes):
+    df_incompativeis, df_limpo = limpeza.limpar(entradas['df_temp'])
+    return {'df_incompativeis': df_incompativeis, 'df_limpo': df_limpo}
+
+
+def _deduplicar(entradas, parametros, fontes):
+    df_atrasos, df_absentismo = hierarquias.separar_atrasos_absentismo(entradas['df_limpo'])
+    return {'df_atrasos': df_atrasos, 'df_absentismo': df_absentismo}
+
+
+def _subconjuntos(entradas, parametros, fontes):
+    return limpeza.subconjuntos(entradas['df_absentismo'], entradas['df_atrasos'])
+
+
+def _cubo(entradas, parametros, fontes):
+    return {'df_cubo': cubo.construir_cubo(entradas['df_base_absentismo'], entradas['df_atrasos'])}
+
+
+def _spells(entradas, parametros, fontes):
+    df_spells, df_colab_spells, df_spells_abertos = paralelo.construir_spells(
+        entradas['df_faltas'], parametros['processos']
+    )
+    return {
+        'df_spells': df_spells,
+        'df_colab_spells': df_colab_spells,
+        'df_spells_abertos': df_spells_abertos,
+    }
+
+
+def _bradford(entradas, parametros, fontes):
+    ativos = bradford.colaboradores_ativos(entradas['df_base_absentismo'], parametros['ano_analise'])
+    df_spells_disruptivos, df_bradford_disruptivo = paralelo.bradford_anual(
+        entradas['df_spells'], ativos, parametros['ano_analise'], parametros['processos']
+    )
+    return {
+        'df_colaboradores_ativos': pd.DataFrame({'login_colaborador': pd.Series(ativos, dtype=object)}),
+        'df_spells_disruptivos': df_spells_disruptivos,
+        'df_bradford_disruptivo': df_bradford_disruptivo,
+    }
+
+
+def _padroes(entradas, parametros, fontes):
+    indice = feriados.indice_feriados(feriados.calendario_feriados(
+        parametros['ano_analise'] - 1, parametros['ano_analise'] + 1
+    ))
+    df_padroes_seg_sex, df_ponte_colab, df_medicas_colab, df_sintese = paralelo.padroes_suspeitos(
+        entradas['df_spells_disruptivos'], entradas['df_bradford_disruptivo'], indice, parametros['processos']
+    )
+    return {
+        'df_padroes_seg_sex': df_padroes_seg_sex,
+        'df_ponte_colab': df_ponte_colab,
+        'df_medicas_colab': df_medicas_colab,
+        'df_sintese': df_sintese,
+    }
+
+
+def _features_clustering(entradas, parametros, fontes):
+    return {'df_features_clustering': clustering.tabela_features(entradas['df_bradford_disruptivo'])}
+
+
+def _clustering(entradas, parametros, fontes):
+    df_cluster, X_scaled = clustering.separar_features(entradas['df_features_clustering'])
+    df_k = clustering.varrer_k(
+        X_scaled, range(parametros['k_min'], parametros['k_max'] + 1), parametros['random_state'],
+        parametros['modo_clustering'], parametros['amostra_silhouette'], parametros['processos']
+    )
+    df_cluster, cluster_profiles = clustering.aplicar_clustering(
+        df_cluster, X_scaled, clustering.melhor_k(df_k), parametros['random_state'],
+        modo=parametros['modo_clustering']
+    )
+    return {'df_k': df_k, 'df_cluster': df_cluster, 'df_cluster_profiles': cluster_profiles.reset_index()}
+
+
+def _cohorts(entradas, parametros, fontes):
+    ano = parametros['ano_analise']
+    tabela = cohorts.tabela_cohorts(entradas['df_base_absentismo'])
+    cohort_stats = cohorts.taxas_cohort(tabela, parametros['data_ref_cohort'], f'{ano}-01', f'{ano}-12')
+    return {'df_cohort_stats': cohort_stats.reset_index(), 'df_cohort_mensal': cohorts.serie_mensal_cohorts(tabela)}
+
+
+def _comparacao(entradas, parametros, fontes):
+    contagens = comparacao.contagens_diarias(entradas['df_base_absentismo'], entradas['df_spells'])
+    df_metricas_comp, df_comp_mensal = comparacao.comparar_anos(
+        entradas['df_base_absentismo'], entradas['df_spells'],
+        parametros['anos_comparacao'], parametros['mes_max_comparacao'], contagens=contagens
+    )
+    return {'df_metricas_comp': df_metricas_comp, 'df_comp_mensal': df_comp_mensal, 'df_contagens_diarias': contagens}
+
+
+# nome: funcao, entradas (artefactos), saidas, parametros usados (os módulos saem de modulos_etapa)
+ETAPAS = {
+    'carregar': {
+        'funcao': _carregar, 'entradas': [], 'saidas': ['df_raw', 'df_codigos', 'df_registos_raw'],
+        'parametros': [],
+    },
+    'classificar': {
+        'funcao': _classificar, 'entradas': ['df_raw', 'df_codigos'], 'saidas': ['df_temp'],
+        'parametros': [],
+    },
+    'limpar': {
+        'funcao': _limpar, 'entradas': ['df_temp'], 'saidas': ['df_incompativeis', 'df_limpo'],
+        'parametros': [],
+    },
+    'deduplicar': {
+        'funcao': _deduplicar, 'entradas': ['df_limpo'], 'saidas': ['df_atrasos', 'df_absentismo'],
+        'parametros': [],
+    },
+    'subconjuntos': {
+        'funcao': _subconjuntos, 'entradas': ['df_absentismo', 'df_atrasos'],
+        'saidas': ['df_faltas', 'df_base_absentismo', 'df_ausencias', 'df_apenas_atrasos'],
+        'parametros': [],
+    },
+    'cubo': {
+        'funcao': _cubo, 'entradas': ['df_base_absentismo', 'df_atrasos'], 'saidas': ['df_cubo'],
+        'parametros': [],
+    },
+    'spells': {
+        'funcao': _spells, 'entradas': ['df_faltas'],
+        'saidas': ['df_spells', 'df_colab_spells', 'df_spells_abertos'],
+        'parametros': [],
+    },
+    'bradford': {
+        'funcao': _bradford, 'entradas': ['df_spells', 'df_base_absentismo'],
+        'saidas': ['df_colaboradores_ativos', 'df_spells_disruptivos', 'df_bradford_disruptivo'],
+        'parametros': ['ano_analise'],
+    },
+    'padroes': {
+        'funcao': _padroes, 'entradas': ['df_spells_disruptivos', 'df_bradford_disruptivo'],
+        'saidas': ['df_padroes_seg_sex', 'df_ponte_colab', 'df_medicas_colab', 'df_sintese'],
+        'parametros': ['ano_analise'],
+    },
+    'features_clustering': {
+        'funcao': _features_clustering, 'entradas': ['df_bradford_disruptivo'],
+        'saidas': ['df_features_clustering'],
+        'parametros': [],
+    },
+    'clustering': {
+        'funcao': _clustering, 'entradas': ['df_features_clustering'],
+        'saidas': ['df_k', 'df_cluster', 'df_cluster_profiles'],
+        'parametros': ['k_min', 'k_max', 'random_state', 'modo_clustering', 'amostra_silhouette'],
+    },
+    'cohorts': {
+        'funcao': _cohorts, 'entradas': ['df_base_absentismo'], 'saidas': ['df_cohort_stats', 'df_cohort_mensal'],
+        'parametros': ['ano_analise', 'data_ref_cohort'],
+    },
+    'comparacao': {
+        'funcao': _comparacao, 'entradas': ['df_base_absentismo', 'df_spells'],
+        'saidas': ['df_metricas_comp', 'df_comp_mensal', 'df_contagens_diarias'],
+        'parametros': ['anos_comparacao', 'mes_max_comparacao'],
+    },
+}
+
+# Artefacto -> etapa que o produz
+PRODUTOR = {saida: nome for nome, etapa in ETAPAS.items() for saida in etapa['saidas']}
+
+
+# ======================================================================
+# CHAVES E ARTEFACTOS
+# ======================================================================
+
+def _imports_pacote(modulo):
+    """Nomes dos módulos absentismo.* importados por modulo (também dentro de funções)"""
+    pacote = __package__
+    nomes = set()
+    for no in ast.walk(ast.parse(inspect.getsource(modulo))):
+        if isinstance(no, ast.Import):
+            nomes.update(a.name for a in no.names if a.name.startswith(pacote + '.'))
+        elif isinstance(no, ast.ImportFrom) and no.module == pacote:
+            # from absentismo import x: x é um submódulo
+            nomes.update(f'{pacote}.{a.name}' for a in no.names)
+        elif isinstance(no, ast.ImportFrom) and (no.module or '').startswith(pacote + '.'):
+            nomes.add(no.module)
+    return nomes
+
+
+def modulos_etapa(etapa):
+    """
+    Módulos absentismo.* de que a etapa depende: os usados pela função e o
+    fecho transitivo dos seus imports (sem este módulo), ordenados por nome
+    """
+    pendentes = [m for m in inspect.getclosurevars(etapa['funcao']).globals.values() if inspect.ismodule(m)]
+    modulos = {}
+    while pendentes:
+        modulo = pendentes.pop()
+        if modulo.__name__ in modulos or modulo.__name__ == __name__ or not modulo.__name__.startswith(__package__ + '.'):
+            continue
+        modulos[modulo.__name__] = modulo
+        pendentes.extend(importlib.import_module(nome) for nome in _imports_pacote(modulo))
+    return [modulos[nome] for nome in sorted(modulos)]
+
+
+def hash_codigo(etapa):
+    """Hash do código da etapa e dos módulos de que depende (modulos_etapa)"""
+    h = hashlib.sha256(inspect.getsource(etapa['funcao']).encode())
+    for modulo in modulos_etapa(etapa):
+        h.update(inspect.getsource(modulo).encode())
+    return h.hexdigest()
+
+
+def chaves_etapas(parametros, fontes):
+    """Chave de cada etapa (hash de código, parâmetros, fontes e chaves das dependências)"""
+    chaves = {}
+
+    def chave(nome):
+        if nome not in chaves:
+            etapa = ETAPAS[nome]
+            conteudo = {
+                'etapa': nome,
+                'codigo': hash_codigo(etapa),
+                'parametros': {p: parametros[p] for p in etapa['parametros']},
+                'entradas': {e: chave(PRODUTOR[e]) for e in etapa['entradas']},
+            }
+            if not etapa['entradas']:
+                conteudo['fontes'] = carregamento.chave_cache(fontes['dados'], fontes['codigos'])
+            chaves[nome] = hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode()).hexdigest()[:20]
+        return chaves[nome]
+
+    for nome in ETAPAS:
+        chave(nome)
+    return chaves
+
+
+def _pasta_etapa(pasta, nome, chave):
+    return os.path.join(pasta, nome, chave)
+
+
+def _guardar_artefactos(pasta_etapa, saidas):
+    """Escreve as saídas em Parquet; o marcador só é criado depois de todas"""
+    temporaria = pasta_etapa + '.tmp'
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    for nome, df in saidas.items():
+        df.to_parquet(os.path.join(temporaria, f'{nome}.parquet'))
+    open(os.path.join(temporaria, MARCADOR_CONCLUIDO), 'w').close()
+    shutil.rmtree(pasta_etapa, ignore_errors=True)
+    os.replace(temporaria, pasta_etapa)
+
+
+def _ler_artefactos(pasta_etapa, nomes):
+    return {nome: pd.read_parquet(os.path.join(pasta_etapa, f'{nome}.parquet')) for nome in nomes}
+
+
+# ======================================================================
+# EXECUÇÃO
+# ======================================================================
+
+def executar(alvos=None, parametros=None, pasta=PASTA_ARTEFACTOS,
+             caminho_dados=carregamento.FICHEIRO_DADOS, caminho_codigos=carregamento.FICHEIRO_CODIGOS,
+             verbose=True, tempos=None):
+    """
+    Devolve {artefacto: DataFrame} para os artefactos pedidos (por omissão todos)
+
+    Só são executadas as etapas cuja chave não está em cache e que são
+    necessárias para os alvos; as restantes são lidas do Parquet guardado.
+    parametros substitui valores de PARAMETROS. Se tempos for um dicionário,
+    recebe {etapa: {'estado', 'segundos'}} de cada etapa usada.
+    """
+    parametros = {**PARAMETROS, **(parametros or {})}
+    fontes = {'dados': caminho_dados, 'codigos': caminho_codigos}
+    alvos = list(PRODUTOR) if alvos is None else list(alvos)
+    desconhecidos = [a for a in alvos if a not in PRODUTOR]
+    if desconhecidos:
+        raise KeyError(f'Artefactos desconhecidos: {desconhecidos}')
+
+    chaves = chaves_etapas(parametros, fontes)
+    resultados = {}
+
+    def obter(nome):
+        if nome in resultados:
+            return resultados[nome]
+
+        etapa = ETAPAS[nome]
+        pasta_etapa = _pasta_etapa(pasta, nome, chaves[nome])
+
+        # Tempo só da própria etapa (as entradas são obtidas antes de iniciar)
+        if os.path.exists(os.path.join(pasta_etapa, MARCADOR_CONCLUIDO)):
+            inicio = time.time()
+            saidas = _ler_artefactos(pasta_etapa, etapa['saidas'])
+            estado = 'cache'
+        else:
+            entradas = {}
+            for entrada in etapa['entradas']:
+                entradas[entrada] = obter(PRODUTOR[entrada])[entrada]
+            inicio = time.time()
+            saidas = etapa['funcao'](entradas, parametros, fontes)
+            _guardar_artefactos(pasta_etapa, saidas)
+            estado = 'executada'
+
+        segundos = time.time() - inicio
+        if tempos is not None:
+            tempos[nome] = {'estado': estado, 'segundos': segundos}
+        if verbose:
+            print(f'  {nome:15s}: {estado:9s} ({segundos:.1f}s)')
+        resultados[nome] = saidas
+        return saidas
+
+    if verbose:
+        print('PIPELINE: etapas')
+    return {alvo: obter(PRODUTOR[alvo])[alvo] for alvo in alvos}
@@ -0,0 +1,235 @@
+"""
+Gerador de dados sintéticos com o esquema de combined_data.csv
+
+Permite partilhar exemplos e medir o pipeline a qualquer escala sem os dados
+reais. Escreve combined_data.csv (login_colaborador, nome_colaborador, Data,
+segmento_processado_codigo, operacao, categoria_profissional, Activo?,
+DtActivacao) e uma tabela de códigos com o esquema de códigos_V2.xlsx.
+
+O calendário de cada colaborador é uma matriz colaborador × dia gerada em
+blocos (a memória não depende do número de colaboradores):
+    - dias úteis trabalhados (Trabalho Pago); fins de semana só ocasionalmente
+    - um bloco de férias por ano
+    - spells de ausência: inícios com propensão por colaborador (gamma, para
+      a cauda do Bradford) e pesos por dia da semana (mais à segunda e à
+      sexta), durações pelas classes de LABELS_DURACAO e tipo pela duração
+      (curtas sobretudo injustificadas, longas sobretudo médicas)
+    - atrasos como segundo registo do dia e uma pequena fração de registos
+      duplicados (incompatibilidades e códigos sem classificação)
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from absentismo.datas import data_do_dia, dia_semana, numero_dia
+from absentismo.spells import LABELS_DURACAO
+
+NUM_COLABORADORES = 3135
+DATA_INICIO = '2024-01-01'
+DATA_FIM = '2025-06-30'
+COLABORADORES_BLOCO = 2000
+
+FICHEIRO_DADOS = 'combined_data.csv'
+FICHEIRO_CODIGOS = 'códigos_V2.xlsx'
+
+# Codigo Segmento, Nivel 1, Nivel 2
+CODIGOS = [
+    ('TP', 'Trabalho Pago', 'Presença'),
+    ('FO', 'Trabalho Pago', 'Formação'),
+    ('AT', 'Atraso', 'Atraso'),
+    ('AM', 'Falta Justificada', 'Ausência Médica'),
+    ('FJ', 'Falta Justificada', 'Falta Justificada'),
+    ('FI', 'Falta Injustificada', 'Falta Injustificada'),
+    ('LM', 'Ausência', 'Licença Mat/Pat'),
+    ('FE', 'Ausência', 'Férias'),
+    ('FF', 'Ausência', 'Ferias / Feriado / Folga'),
+    ('XX', None, None),
+]
+COD = {codigo: i for i, (codigo, _, _) in enumerate(CODIGOS)}
+SEM_REGISTO = -1
+
+OPERACOES = {
+    'Unitel Alpha': 0.30,
+    'Unitel Money': 0.15,
+    'TAAG': 0.15,
+    'ZAP Fibra': 0.15,
+    'ZAP Premium': 0.10,
+    'BAI Directo': 0.10,
+    'ENSA Seguros': 0.05,
+}
+
+# Categorias como aparecem nos dados brutos (agregadas por limpeza.normalizar_categorias)
+CATEGORIAS = {
+    'ASSISTENTE DE CALL CENTER': 0.35,
+    'ASSISTENTE DE CONTACT CENTER (N1)': 0.20,
+    'ASSISTENTE DE CONTACT CENTER (N2)': 0.10,
+    'ASSISTENTE DE CALL CENTER - BACK OFFICE': 0.08,
+    'ASSISTENTE DE EXPERIÊNCIA DE CLIENTE N1': 0.07,
+    'DELEGADO COMERCIAL': 0.07,
+    'PROMOTOR DE VENDAS': 0.06,
+    'SUPERVISOR': 0.04,
+    'FORMADOR': 0.03,
+}
+
+# Probabilidade de cada classe de duração (LABELS_DURACAO) e intervalo de dias
+PROB_DURACAO = [0.50, 0.27, 0.13, 0.06, 0.04]
+INTERVALOS_DURACAO = [(1, 1), (2, 3), (4, 7), (8, 14), (15, 60)]
+
+# Peso relativo do início de um spell por dia da semana (segunda=0)
+PESOS_DIA_SEMANA = np.array([1.35, 1.0, 0.95, 1.0, 1.25, 0.6, 0.6])
+
+# Tipo do spell: (código, probabilidade) para spells curtos (<= 3 dias) e longos
+TIPOS_SPELL_CURTO = [('FI', 0.45), ('FJ', 0.25), ('AM', 0.30)]
+TIPOS_SPELL_LONGO = [('AM', 0.80), ('FJ', 0.15), ('LM', 0.05)]
+
+TAXA_INICIO_SPELL = 0.012    # inícios por dia, em média
+FORMA_PROPENSAO = 1.2        # gamma: forma baixa = mais heterogeneidade
+PROB_ATRASO = 0.05           # por dia trabalhado, em média
+PROB_TRABALHO_FIM_SEMANA = 0.2
+PROB_SAIDA = 0.15            # colaboradores que saem durante o período
+PROB_REGISTO_EXTRA = 0.003   # segundo registo no mesmo dia
+CODIGOS_EXTRA = ['AM', 'FI', 'FO', 'XX']
+DIAS_FERIAS = (10, 22)
+
+COLUNAS = ['login_colaborador', 'nome_colaborador', 'Data', 'segmento_processado_codigo',
+           'operacao', 'categoria_profissional', 'Activo?', 'DtActivacao']
+
+
+def tabela_codigos():
+    """Tabela de classificação com o esquema de códigos_V2.xlsx"""
+    return pd.DataFrame(CODIGOS, columns=['Codigo Segmento', 'Nivel 1', 'Nivel 2'])
+
+
+def _escolher(rng, opcoes, n):
+    """n escolhas de {valor: probabilidade} (ou lista de pares), como índices"""
+    pares = list(opcoes.items()) if isinstance(opcoes, dict) else list(opcoes)
+    prob = np.array([p for _, p in pares], dtype=float)
+    return rng.choice(len(pares), size=n, p=prob / prob.sum())
+
+
+def _preencher(matriz, linhas, colunas, duracoes, codigos, fim):
+    """Escreve codigos[i] nas células (linhas[i], colunas[i] .. + duracoes[i] - 1), até fim da linha"""
+    total = int(duracoes.sum())
+    if total == 0:
+        return
+    deslocamento = np.arange(total) - np.repeat(np.cumsum(duracoes) - duracoes, duracoes)
+    r = np.repeat(linhas, duracoes)
+    c = np.repeat(colunas, duracoes) + deslocamento
+    dentro = c <= fim[r]
+    matriz[r[dentro], c[dentro]] = np.repeat(codigos, duracoes)[dentro]
+
+
+def _duracoes_spell(rng, n):
+    classe = _escolher(rng, list(zip(LABELS_DURACAO, PROB_DURACAO)), n)
+    limites = np.array(INTERVALOS_DURACAO)
+    return rng.integers(limites[classe, 0], limites[classe, 1] + 1)
+
+
+def _tipos_spell(rng, duracoes):
+    tipos = np.empty(len(duracoes), dtype=np.int8)
+    for curtos, opcoes in ((True, TIPOS_SPELL_CURTO), (False, TIPOS_SPELL_LONGO)):
+        mascara = (duracoes <= 3) == curtos
+        escolha = _escolher(rng, opcoes, int(mascara.sum()))
+        tipos[mascara] = np.array([COD[c] for c, _ in opcoes], dtype=np.int8)[escolha]
+    return tipos
+
+
+def gerar_bloco(rng, ids, dias):
+    """DataFrame de registos para os colaboradores ids nos dias (números de dia) dados"""
+    n, num_dias = len(ids), len(dias)
+    dow = dia_semana(dias)
+
+    # Atributos de cada colaborador
+    operacao = _escolher(rng, OPERACOES, n)
+    categoria = _escolher(rng, CATEGORIAS, n)
+    activacao = dias[0] + rng.integers(-6 * 365, num_dias - 30, size=n)
+    inicio = np.clip(activacao - dias[0], 0, num_dias - 1)
+    sai = rng.random(n) < PROB_SAIDA
+    fim = np.where(sai, rng.integers(inicio, num_dias), num_dias - 1)
+    propensao = rng.gamma(FORMA_PROPENSAO, TAXA_INICIO_SPELL / FORMA_PROPENSAO, size=n)
+    prob_atraso = rng.beta(1.0, (1 - PROB_ATRASO) / PROB_ATRASO, size=n)
+
+    # Calendário base: dias úteis trabalhados, fins de semana quase sempre sem registo
+    coluna = np.arange(num_dias)
+    ativo = (coluna >= inicio[:, None]) & (coluna <= fim[:, None])
+    matriz = np.full((n, num_dias), COD['TP'], dtype=np.int8)
+    folga = (dow >= 5) & (rng.random((n, num_dias)) >= PROB_TRABALHO_FIM_SEMANA)
+    matriz[folga] = SEM_REGISTO
+
+    # Férias: um bloco por colaborador e por ano
+    anos = (data_do_dia(dias).astype('datetime64[Y]').astype(np.int64))
+    for ano in np.unique(anos):
+        colunas_ano = np.flatnonzero(anos == ano)
+        inicio_ferias = rng.integers(colunas_ano[0], colunas_ano[-1] + 1, size=n)
+        duracao = rng.integers(DIAS_FERIAS[0], DIAS_FERIAS[1] + 1, size=n)
+        _preencher(matriz, np.arange(n), inicio_ferias, duracao, np.full(n, COD['FE'], dtype=np.int8), fim)
+
+    # Spells de ausência
+    prob_inicio = propensao[:, None] * PESOS_DIA_SEMANA[dow][None, :]
+    linhas, colunas = np.nonzero((rng.random((n, num_dias)) < prob_inicio) & ativo)
+    duracoes = _duracoes_spell(rng, len(linhas))
+    _preencher(matriz, linhas, colunas, duracoes, _tipos_spell(rng, duracoes), fim)
+
+    matriz[~ativo] = SEM_REGISTO
+    linhas, colunas = np.nonzero(matriz != SEM_REGISTO)
+    codigos = matriz[linhas, colunas]
+
+    # Registos extra no mesmo dia: atrasos em dias trabalhados e duplicados
+    atraso = (codigos == COD['TP']) & (rng.random(len(codigos)) < prob_atraso[linhas])
+    extra = rng.random(len(codigos)) < PROB_REGISTO_EXTRA
+    codigos_extra = np.array([COD[c] for c in CODIGOS_EXTRA], dtype=np.int8)[rng.integers(0, len(CODIGOS_EXTRA), int(extra.sum()))]
+    linhas = np.concatenate([linhas, linhas[atraso], linhas[extra]])
+    colunas = np.concatenate([colunas, colunas[atraso], colunas[extra]])
+    codigos = np.concatenate([codigos, np.full(int(atraso.sum()), COD['AT'], dtype=np.int8), codigos_extra])
+    ordem = np.lexsort((colunas, linhas))
+    linhas, colunas, codigos = linhas[ordem], colunas[ordem], codigos[ordem]
+
+    logins = pd.Index([f'S{i:06d}' for i in ids])
+    nomes = pd.Index([f'Colaborador Sintético {i}' for i in ids])
+    dt_activacao = pd.Index(np.datetime_as_string(activacao.astype('datetime64[D]'))).unique()
+    cod_activacao = dt_activacao.get_indexer(np.datetime_as_string(activacao.astype('datetime64[D]')))
+    return pd.DataFrame({
+        'login_colaborador': pd.Categorical.from_codes(linhas, categories=logins),
+        'nome_colaborador': pd.Categorical.from_codes(linhas, categories=nomes),
+        'Data': data_do_dia(dias[colunas]),
+        'segmento_processado_codigo': pd.Categorical.from_codes(codigos, categories=[c for c, _, _ in CODIGOS]),
+        'operacao': pd.Categorical.from_codes(operacao[linhas], categories=list(OPERACOES)),
+        'categoria_profissional': pd.Categorical.from_codes(categoria[linhas], categories=list(CATEGORIAS)),
+        'Activo?': pd.Categorical.from_codes(sai[linhas].astype(np.int8), categories=['Sim', 'Não']),
+        'DtActivacao': pd.Categorical.from_codes(cod_activacao[linhas], categories=dt_activacao),
+    }, columns=COLUNAS)
+
+
+def gerar(pasta='.', num_colaboradores=NUM_COLABORADORES, data_inicio=DATA_INICIO, data_fim=DATA_FIM,
+          semente=42, colaboradores_bloco=COLABORADORES_BLOCO, verbose=True):
+    """
+    Escreve FICHEIRO_DADOS e FICHEIRO_CODIGOS em pasta
+
+    Devolve {'caminho_dados', 'caminho_codigos', 'linhas', 'colaboradores'}.
+    A mesma semente (e o mesmo colaboradores_bloco) gera sempre os mesmos dados.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho_dados = os.path.join(pasta, FICHEIRO_DADOS)
+    caminho_codigos = os.path.join(pasta, FICHEIRO_CODIGOS)
+    tabela_codigos().to_excel(caminho_codigos, index=False)
+
+    rng = np.random.default_rng(semente)
+    dia_inicio, dia_fim = numero_dia([pd.Timestamp(data_inicio), pd.Timestamp(data_fim)])
+    dias = np.arange(dia_inicio, dia_fim + 1)
+    inicio = time.time()
+    linhas = 0
+
+    temporario = caminho_dados + '.tmp'
+    for i, primeiro in enumerate(range(0, num_colaboradores, colaboradores_bloco)):
+        ids = np.arange(primeiro, min(primeiro + colaboradores_bloco, num_colaboradores))
+        df = gerar_bloco(rng, ids, dias)
+        df.to_csv(temporario, mode='w' if i == 0 else 'a', header=i == 0, index=False, date_format='%Y-%m-%d')
+        linhas += len(df)
+        if verbose:
+            print(f'  {ids[-1] + 1:,}/{num_colaboradores:,} colaboradores, {linhas:,} registos ({time.time() - inicio:.1f}s)')
+    os.replace(temporario, caminho_dados)
+
+    return {'caminho_dados': caminho_dados, 'caminho_codigos': caminho_codigos,
+            'linhas': linhas, 'colaboradores': num_colaboradores}
@@ -0,0 +1,522 @@
+"""
+Construção de spells (episódios contínuos de ausência) - Grupo 3
+
+Um spell é uma sequência de dias consecutivos de ausência do mesmo
+colaborador. Os registos são ordenados uma vez por (colaborador, dia) e os
+spells são detetados por run-length sobre números de dia inteiros; todas as
+agregações por spell (início, fim, duração, categoria predominante) são feitas
+sobre arrays NumPy, sem funções Python por grupo.
+
+Para dados diários acrescentados, atualizar_spells mantém o estado dos spells
+abertos (o último spell de cada colaborador) e o histograma de durações por
+colaborador (de onde saem os totais de df_colab_spells), e só estende, fecha
+ou acrescenta spells na fronteira, com custo proporcional aos dias novos e não
+ao histórico; verificar_atualizacao confirma que o resultado é igual ao de
+construir_spells.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from absentismo.carregamento import _guardar_feather, _ler_feather
+from absentismo.datas import DIAS_SEMANA, dia_semana, numero_dia
+
+# Categorizar spells por duração
+BINS_DURACAO = [0, 1, 3, 7, 14, float('inf')]
+LABELS_DURACAO = ['1 dia', '2-3 dias', '4-7 dias', '8-14 dias', '>14 dias']
+
+LIMITE_SHORT_TERM = 3   # Ausências curtas (possível padrão)
+LIMITE_LONG_TERM = 14   # Ausências longas (doença grave)
+
+# Colunas com o primeiro valor do spell
+COLUNAS_PRIMEIRO = ['login_colaborador', 'nome_colaborador', 'categoria_profissional']
+
+
+def marcar_spells(df_ausencias):
+    """
+    Ordena por colaborador e data e atribui spell_id (1, 2, ...)
+
+    Novo spell quando é o primeiro registo do colaborador ou quando o
+    intervalo para o registo anterior é superior a 1 dia. Acrescenta as colunas
+    dias_desde_anterior, novo_spell e spell_id.
+    """
+    login_cod, _ = pd.factorize(df_ausencias['login_colaborador'], sort=True)
+    dia = numero_dia(df_ausencias['Data'])
+    ordem = np.lexsort((dia, login_cod))
+
+    df = df_ausencias.take(ordem).reset_index(drop=True)
+    login_ord = login_cod[ordem]
+    dia_ord = dia[ordem]
+
+    primeiro = np.ones(len(df), dtype=bool)
+    primeiro[1:] = login_ord[1:] != login_ord[:-1]
+
+    diferenca = np.empty(len(df), dtype='float64')
+    diferenca[0:1] = np.nan
+    diferenca[1:] = dia_ord[1:] - dia_ord[:-1]
+    diferenca[primeiro] = np.nan
+
+    df['dias_desde_anterior'] = diferenca
+    df['novo_spell'] = primeiro | (diferenca > 1)
+    df['spell_id'] = np.cumsum(df['novo_spell'].to_numpy())
+    return df
+
+
+def limites_spells(spell_id):
+    """Posições de início e fim (exclusivo) de cada spell num array ordenado por spell"""
+    spell_id = np.asarray(spell_id)
+    novo = np.ones(len(spell_id), dtype=bool)
+    novo[1:] = spell_id[1:] != spell_id[:-1]
+    inicios = np.flatnonzero(novo)
+    fins = np.append(inicios[1:], len(spell_id)) if len(inicios) else inicios.copy()
+    return inicios, fins
+
+
+def primeiro_valido(coluna, inicios, fins):
+    """Primeiro valor não nulo de cada spell (como groupby().first())"""
+    posicoes = np.flatnonzero(coluna.notna().to_numpy())
+    candidato = np.searchsorted(posicoes, inicios)
+    existe = candidato < len(posicoes)
+    existe[existe] = posicoes[candidato[existe]] < fins[existe]
+
+    linhas = np.zeros(len(inicios), dtype=np.intp)
+    linhas[existe] = posicoes[candidato[existe]]
+    valores = coluna.take(linhas).reset_index(drop=True)
+    return valores.where(existe)
+
+
+def moda_por_spell(coluna, inicios):
+    """
+    Categoria predominante de cada spell (como x.mode()[0])
+
+    Contagens por (spell, código) com bincount e argmax por linha; em caso de
+    empate fica a menor categoria (ordem de ordenação), ignorando nulos.
+    """
+    codigos, categorias = pd.factorize(coluna, sort=True)
+    num_spells = len(inicios)
+    num_cats = max(len(categorias), 1)
+
+    spell_linha = np.repeat(np.arange(num_spells), np.diff(np.append(inicios, len(coluna))))
+    validos = codigos >= 0
+    contagens = np.bincount(
+        spell_linha[validos] * num_cats + codigos[validos],
+        minlength=num_spells * num_cats
+    ).reshape(num_spells, num_cats)
+
+    vencedor = contagens.argmax(axis=1)
+    tem_valor = contagens[np.arange(num_spells), vencedor] > 0
+    resultado = pd.Series(categorias.take(vencedor) if len(categorias) else np.full(num_spells, np.nan))
+    return resultado.where(tem_valor)
+
+
+def agregar_spells(df_ausencias):
+    """
+    Constrói df_spells a partir de df_ausencias já marcado com spell_id
+
+    Mesmas colunas que o PASSO 3.2: spell_id, colaborador, datas de início e
+    fim, duração, Nivel 1/2 predominantes, operação (se existir), dia da semana
+    de início e fim, mês, ano, categoria_spell, short_term e long_term.
+    """
+    inicios, fins = limites_spells(df_ausencias['spell_id'].to_numpy())
+    datas = df_ausencias['Data'].reset_index(drop=True)
+
+    df_spells = pd.DataFrame({'spell_id': df_ausencias['spell_id'].to_numpy()[inicios]})
+    for coluna in COLUNAS_PRIMEIRO:
+        df_spells[coluna] = primeiro_valido(df_ausencias[coluna].reset_index(drop=True), inicios, fins)
+
+    df_spells['data_inicio'] = datas.take(inicios).reset_index(drop=True)
+    df_spells['data_fim'] = datas.take(fins - 1).reset_index(drop=True)
+    df_spells['duracao_dias'] = (fins - inicios).astype(np.int64)
+    df_spells['nivel1_predominante'] = moda_por_spell(df_ausencias['Nivel 1'], inicios)
+    df_spells['nivel2_predominante'] = moda_por_spell(df_ausencias['Nivel 2'], inicios)
+
+    # Adicionar operação se existir
+    if 'operacao' in df_ausencias.columns:
+        df_spells['operacao'] = primeiro_valido(df_ausencias['operacao'].reset_index(drop=True), inicios, fins)
+
+    # Adicionar features temporais
+    df_spells['dia_semana_inicio'] = DIAS_SEMANA[dia_semana(numero_dia(df_spells['data_inicio']))]
+    df_spells['dia_semana_fim'] = DIAS_SEMANA[dia_semana(numero_dia(df_spells['data_fim']))]
+    df_spells['mes'] = df_spells['data_inicio'].dt.month
+    df_spells['ano'] = df_spells['data_inicio'].dt.year
+
+    df_spells['categoria_spell'] = pd.cut(df_spells['duracao_dias'], bins=BINS_DURACAO, labels=LABELS_DURACAO)
+
+    # Flags importantes
+    df_spells['short_term'] = df_spells['duracao_dias'] <= LIMITE_SHORT_TERM
+    df_spells['long_term'] = df_spells['duracao_dias'] > LIMITE_LONG_TERM
+    return df_spells
+
+
+def construir_spells(df_faltas):
+    """Devolve (df_ausencias com spell_id, df_spells)"""
+    df_ausencias = marcar_spells(df_faltas)
+    return df_ausencias, agregar_spells(df_ausencias)
+
+
+def combinar_spells(lista_spells, lista_abertos):
+    """
+    Junta spells calculados em conjuntos disjuntos de colaboradores
+
+    O spell_id (local a cada conjunto, a partir de 1) é renumerado pela ordem
+    (colaborador, data de início), a mesma de construir_spells sobre todos os
+    registos. Devolve (df_spells, df_spells_abertos).
+    """
+    deslocamentos = np.cumsum([0] + [len(s) for s in lista_spells[:-1]])
+    df_spells = pd.concat(
+        [s.assign(spell_id=s['spell_id'] + d) for s, d in zip(lista_spells, deslocamentos)], ignore_index=True
+    ).sort_values(['login_colaborador', 'data_inicio'], kind='stable', ignore_index=True)
+    df_abertos = pd.concat(
+        [a.assign(spell_id=a['spell_id'] + d) for a, d in zip(lista_abertos, deslocamentos)], ignore_index=True
+    ).sort_values(['login_colaborador', 'Data'], kind='stable', ignore_index=True)
+
+    novo_id = np.zeros(len(df_spells) + 1, dtype=np.int64)
+    novo_id[df_spells['spell_id'].to_numpy()] = np.arange(1, len(df_spells) + 1)
+    df_spells['spell_id'] = novo_id[df_spells['spell_id'].to_numpy()]
+    df_abertos['spell_id'] = novo_id[df_abertos['spell_id'].to_numpy()]
+    return df_spells, df_abertos
+
+
+def agregar_spells_colaborador(df_spells):
+    """Métricas de spells por colaborador (PASSO 3.3: df_colab_spells)"""
+    df_colab_spells = df_spells.groupby('login_colaborador').agg({
+        'spell_id': 'count',  # Frequency rate (número de spells)
+        'duracao_dias': ['sum', 'mean', 'median', 'std'],
+        'short_term': 'sum',  # Número de spells curtos
+        'long_term': 'sum',   # Número de spells longos
+    }).reset_index()
+
+    df_colab_spells.columns = [
+        'login_colaborador', 'num_spells',
+        'total_dias_ausentes', 'mean_spell_duration', 'median_spell_duration', 'std_spell_duration',
+        'num_short_term_spells', 'num_long_term_spells'
+    ]
+
+    # Adicionar nome e categoria (que já estão em df_spells)
+    return df_colab_spells.merge(
+        df_spells[['login_colaborador', 'nome_colaborador', 'categoria_profissional']].drop_duplicates(),
+        on='login_colaborador'
+    )
+
+
+# ======================================================================
+# ATUALIZAÇÃO INCREMENTAL
+# ======================================================================
+
+# Colunas acrescentadas por marcar_spells (recalculadas a cada atualização)
+COLUNAS_MARCACAO = ['dias_desde_anterior', 'novo_spell', 'spell_id']
+
+PASTA_ESTADO = '.estado_spells'
+ESTADO_SPELLS = 'spells.feather'
+ESTADO_COLAB = 'colab_spells.feather'
+ESTADO_ABERTO = 'spells_abertos.feather'
+ESTADO_DURACOES = 'duracoes_spells.feather'
+
+
+def spells_abertos(df_ausencias):
+    """
+    Registos do último spell de cada colaborador
+
+    É o único spell que novos dias podem estender; todos os anteriores estão
+    fechados e nunca mudam. Este é o estado guardado entre atualizações.
+    """
+    ultimo = df_ausencias.groupby('login_colaborador', observed=True)['spell_id'].transform('max')
+    return df_ausencias[df_ausencias['spell_id'] == ultimo].reset_index(drop=True)
+
+
+def duracoes_colaborador(df_spells):
+    """
+    Histograma das durações por colaborador (login_colaborador, duracao_dias,
+    num_spells), ordenado por colaborador e duração
+
+    Todas as métricas de df_colab_spells (número, soma, média, mediana, desvio
+    padrão, curtos e longos) saem deste histograma, que é atualizado de forma
+    aditiva: é o estado dos totais por colaborador.
+    """
+    df = df_spells.groupby(['login_colaborador', 'duracao_dias'], observed=True, sort=True).size()
+    return df.rename('num_spells').reset_index()
+
+
+def _codigos_login(serie, categorias):
+    """Código de cada login nas categorias do estado (sem converter para texto)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and serie.cat.categories.equals(categorias):
+        return serie.cat.codes.to_numpy().astype(np.int64)
+    return categorias.get_indexer(serie.astype(object)).astype(np.int64)
+
+
+def _mesmas_categorias(serie, tipo):
+    """Mesmas categorias pela mesma ordem (== entre CategoricalDtype ignora a ordem)"""
+    return isinstance(serie.dtype, pd.CategoricalDtype) and serie.dtype == tipo and serie.cat.categories.equals(tipo.categories)
+
+
+def _alinhar_categorias(estado, df_novos):
+    """
+    Põe as colunas categóricas de df_novos nas categorias do estado (lista de
+    DataFrames); valores novos (colaborador novo, mês novo) são acrescentados
+    no fim das categorias de todos, sem mudar os códigos existentes.
+    login_colaborador identifica os colaboradores pelos códigos, por isso
+    passa a categórico se o estado o tiver como texto (logins ordenados,
+    mantendo a ordem do histograma de durações)
+    """
+    df_novos = df_novos.copy()
+    estado = list(estado)
+    for coluna in df_novos.columns:
+        tipos = [df[coluna].dtype for df in estado if coluna in df.columns]
+        tipo = next((t for t in tipos if isinstance(t, pd.CategoricalDtype)), None)
+        if tipo is None and coluna == 'login_colaborador':
+            logins = pd.concat([df[coluna].astype(object) for df in estado if coluna in df.columns])
+            tipo = pd.CategoricalDtype(pd.Index(logins.dropna().unique()).sort_values())
+            estado = [
+                df.assign(**{coluna: pd.Categorical(df[coluna].astype(object), dtype=tipo)})
+                if coluna in df.columns else df
+                for df in estado
+            ]
+        if tipo is None or _mesmas_categorias(df_novos[coluna], tipo):
+            continue
+        valores = pd.Index(pd.unique(df_novos[coluna].dropna().astype(object)))
+        extra = valores[tipo.categories.get_indexer(valores) < 0]
+        categorias = tipo.categories.append(pd.Index(extra, dtype=tipo.categories.dtype)) if len(extra) else tipo.categories
+        novo_tipo = pd.CategoricalDtype(categorias, ordered=tipo.ordered)
+        df_novos[coluna] = pd.Categorical(df_novos[coluna].astype(object), dtype=novo_tipo)
+        for i, df in enumerate(estado):
+            if (coluna in df.columns and isinstance(df[coluna].dtype, pd.CategoricalDtype)
+                    and not _mesmas_categorias(df[coluna], novo_tipo)):
+                estado[i] = df.assign(**{coluna: df[coluna].cat.set_categories(categorias)})
+    return estado, df_novos
+
+
+def _validar_novos(codigo_aberto, dia_aberto, codigo_novos, dia_novos, df_novos, num_logins):
+    """Os novos dias têm de ser posteriores ao último dia conhecido de cada colaborador"""
+    ultimo_dia = np.full(num_logins, np.iinfo(np.int64).min)
+    np.maximum.at(ultimo_dia, codigo_aberto, dia_aberto)
+    atrasados = dia_novos <= ultimo_dia[codigo_novos]
+    if atrasados.any():
+        exemplo = df_novos.iloc[int(np.flatnonzero(atrasados)[0])]
+        raise ValueError(
+            f'{atrasados.sum()} registos novos não são posteriores ao estado guardado '
+            f'(ex.: {exemplo["login_colaborador"]} em {exemplo["Data"]:%Y-%m-%d}); '
+            'recalcular os spells com construir_spells'
+        )
+
+
+def _somar_duracoes(df_duracoes, categorias, codigos, duracoes, pesos):
+    """Soma pesos (+1 spell novo, -1 duração anterior de um spell estendido) ao histograma"""
+    chave_atual = _codigos_login(df_duracoes['login_colaborador'], categorias) << 32 | df_duracoes['duracao_dias'].to_numpy()
+    chaves, inverso = np.unique(np.asarray(codigos, dtype=np.int64) << 32 | np.asarray(duracoes, dtype=np.int64),
+                                return_inverse=True)
+    soma = np.bincount(inverso, weights=pesos, minlength=len(chaves)).astype(np.int64)
+
+    pos = np.searchsorted(chave_atual, chaves)
+    existe = pos < len(chave_atual)
+    existe[existe] = chave_atual[pos[existe]] == chaves[existe]
+    num = df_duracoes['num_spells'].to_numpy().astype(np.int64)
+    num[pos[existe]] += soma[existe]
+    chave = np.insert(chave_atual, pos[~existe], chaves[~existe])
+    num = np.insert(num, pos[~existe], soma[~existe])
+
+    manter = num > 0
+    return pd.DataFrame({
+        'login_colaborador': pd.Categorical.from_codes(chave[manter] >> 32, categories=categorias),
+        'duracao_dias': chave[manter] & 0xFFFFFFFF,
+        'num_spells': num[manter],
+    })
+
+
+def _colab_de_duracoes(df_duracoes, categorias, codigos):
+    """Métricas de df_colab_spells (sem nome/categoria) dos colaboradores em codigos, a partir do histograma"""
+    codigo = _codigos_login(df_duracoes['login_colaborador'], categorias)
+    esquerda = np.searchsorted(codigo, codigos, side='left')
+    direita = np.searchsorted(codigo, codigos, side='right')
+    tamanho = direita - esquerda
+    grupo = np.repeat(np.arange(len(codigos)), tamanho)
+    linhas = np.arange(len(grupo)) - np.repeat(np.cumsum(tamanho) - tamanho, tamanho) + esquerda[grupo]
+
+    d = df_duracoes['duracao_dias'].to_numpy()[linhas].astype(np.int64)
+    c = df_duracoes['num_spells'].to_numpy()[linhas].astype(np.int64)
+
+    def somar(valores):
+        return np.bincount(grupo, weights=valores, minlength=len(codigos)).astype(np.int64)
+
+    n, s1, s2 = somar(c), somar(c * d), somar(c * d * d)
+    # Mediana: posições (n-1)//2 e n//2 na sequência ordenada de durações de cada colaborador
+    acumulado = np.cumsum(c)
+    antes = np.cumsum(n) - n
+    mediana = (d[np.searchsorted(acumulado, antes + (n - 1) // 2, side='right')] +
+               d[np.searchsorted(acumulado, antes + n // 2, side='right')]) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Variância amostral (ddof=1) em aritmética inteira exata
+        desvio = np.where(n > 1, np.sqrt((n * s2 - s1 * s1) / (n * (n - 1.0))), np.nan)
+
+    return pd.DataFrame({
+        'login_colaborador': pd.Categorical.from_codes(codigos, categories=categorias),
+        'num_spells': n,
+        'total_dias_ausentes': s1,
+        'mean_spell_duration': s1 / n,
+        'median_spell_duration': mediana,
+        'std_spell_duration': desvio,
+        'num_short_term_spells': somar(c * (d <= LIMITE_SHORT_TERM)),
+        'num_long_term_spells': somar(c * (d > LIMITE_LONG_TERM)),
+    })
+
+
+def atualizar_spells(df_spells, df_colab_spells, df_aberto, df_novos, df_duracoes=None):
+    """
+    Incorpora novos dias de ausência sem recalcular o histórico
+
+    df_novos tem o formato de df_faltas (um registo por colaborador e dia) e
+    apenas dias posteriores aos já processados. Só os spells abertos dos
+    colaboradores afetados são recalculados (estendidos ou fechados); os
+    spells novos são acrescentados com spell_id a seguir ao maior existente e
+    os spell_id existentes não mudam. df_spells está ordenado por spell_id (como
+    sai de construir_spells e desta função), por isso os spells abertos são
+    substituídos por posição. df_colab_spells é atualizado a partir do
+    histograma de durações (duracoes_colaborador; calculado se None), somando
+    só as durações dos spells novos ou estendidos. Os colaboradores são
+    identificados pelos códigos das categorias de login_colaborador.
+
+    Devolve (df_spells, df_colab_spells, df_aberto, df_duracoes) atualizados.
+    """
+    if df_duracoes is None:
+        df_duracoes = duracoes_colaborador(df_spells)
+    if len(df_novos) == 0:
+        return df_spells, df_colab_spells, df_aberto, df_duracoes
+
+    (df_spells, df_colab_spells, df_aberto, df_duracoes), df_novos = _alinhar_categorias(
+        [df_spells, df_colab_spells, df_aberto, df_duracoes], df_novos
+    )
+    categorias = df_novos['login_colaborador'].cat.categories
+    codigo_aberto = _codigos_login(df_aberto['login_colaborador'], categorias)
+    codigo_novos = _codigos_login(df_novos['login_colaborador'], categorias)
+
+    afetado = np.zeros(len(categorias), dtype=bool)
+    afetado[codigo_novos] = True
+    aberto_afetado = afetado[codigo_aberto]
+    base = df_aberto[aberto_afetado]
+    codigo_base = codigo_aberto[aberto_afetado]
+    _validar_novos(codigo_base, numero_dia(base['Data']), codigo_novos, numero_dia(df_novos['Data']),
+                   df_novos, len(categorias))
+
+    # Spell aberto de cada colaborador afetado (mantém o spell_id original)
+    id_aberto = np.zeros(len(categorias), dtype=np.int64)
+    id_aberto[codigo_base] = base['spell_id'].to_numpy()
+
+    combinado = pd.concat([
+        base.drop(columns=COLUNAS_MARCACAO).assign(_aberto=True),
+        df_novos.assign(_aberto=False),
+    ], ignore_index=True)
+    df_local = marcar_spells(combinado)
+    spells_local = agregar_spells(df_local)
+
+    # spell_id global: o primeiro spell de um colaborador com spell aberto continua-o
+    inicios, _ = limites_spells(df_local['spell_id'].to_numpy())
+    continua = df_local['_aberto'].to_numpy()[inicios]
+    codigo_local = _codigos_login(spells_local['login_colaborador'], categorias)
+    proximo_id = int(df_spells['spell_id'].iloc[-1]) + 1 if len(df_spells) else 1
+
+    novos_ids = np.empty(len(spells_local), dtype=np.int64)
+    novos_ids[continua] = id_aberto[codigo_local[continua]]
+    novos_ids[~continua] = proximo_id + np.arange((~continua).sum())
+
+    mapa_ids = np.empty(len(spells_local) + 1, dtype=np.int64)
+    mapa_ids[spells_local['spell_id'].to_numpy()] = novos_ids
+    spells_local['spell_id'] = novos_ids
+    df_local['spell_id'] = mapa_ids[df_local['spell_id'].to_numpy()]
+
+    # Spells abertos substituídos na sua posição; spells novos acrescentados no fim
+    posicao = np.searchsorted(df_spells['spell_id'].to_numpy(), novos_ids[continua])
+    duracao_anterior = df_spells['duracao_dias'].to_numpy()[posicao]
+    total = len(df_spells)
+    linhas = np.concatenate([np.arange(total), total + np.flatnonzero(~continua)])
+    linhas[posicao] = total + np.flatnonzero(continua)
+    df_spells = pd.concat([df_spells, spells_local], ignore_index=True).take(linhas).reset_index(drop=True)
+
+    # Novo estado: spells abertos dos não afetados + último spell dos afetados
+    df_aberto = pd.concat([
+        df_aberto[~aberto_afetado],
+        spells_abertos(df_local.drop(columns='_aberto')),
+    ], ignore_index=True)
+
+    # Totais por colaborador: +1 para cada duração nova, -1 para a duração anterior dos spells estendidos
+    df_duracoes = _somar_duracoes(
+        df_duracoes, categorias,
+        np.concatenate([codigo_local, codigo_local[continua]]),
+        np.concatenate([spells_local['duracao_dias'].to_numpy(), duracao_anterior]),
+        np.concatenate([np.ones(len(spells_local)), -np.ones(continua.sum())]),
+    )
+    afetados = np.flatnonzero(afetado)
+    colab_afetado = afetado[_codigos_login(df_colab_spells['login_colaborador'], categorias)]
+    identificacao = pd.concat([
+        df_colab_spells.loc[colab_afetado, COLUNAS_PRIMEIRO],
+        spells_local[COLUNAS_PRIMEIRO],
+    ], ignore_index=True).drop_duplicates()
+    df_colab_spells = pd.concat([
+        df_colab_spells[~colab_afetado],
+        _colab_de_duracoes(df_duracoes, categorias, afetados).merge(identificacao, on='login_colaborador'),
+    ], ignore_index=True)
+
+    return df_spells, df_colab_spells, df_aberto, df_duracoes
+
+
+def verificar_atualizacao(df_faltas, dias_novos=5):
+    """
+    Confirma que atualizar_spells dá o mesmo que construir_spells
+
+    O estado é construído com os registos anteriores aos últimos dias_novos
+    dias de df_faltas; esses dias são depois acrescentados um a um. df_spells e
+    df_colab_spells finais têm de ser iguais (a menos da numeração de spell_id
+    e da ordem das linhas) aos de construir_spells sobre todos os registos;
+    caso contrário é levantado AssertionError. Devolve os segundos por
+    atualização diária.
+    """
+    import time
+
+    dias = np.unique(numero_dia(df_faltas['Data']))
+    corte = dias[-dias_novos] if len(dias) > dias_novos else dias[0]
+    dia = numero_dia(df_faltas['Data'])
+
+    df_ausencias, df_spells = construir_spells(df_faltas[dia < corte])
+    estado = (df_spells, agregar_spells_colaborador(df_spells), spells_abertos(df_ausencias), duracoes_colaborador(df_spells))
+    tempos = []
+    for d in dias[dias >= corte]:
+        inicio = time.perf_counter()
+        estado = atualizar_spells(*estado[:3], df_faltas[dia == d], estado[3])
+        tempos.append(time.perf_counter() - inicio)
+
+    _, esperado = construir_spells(df_faltas)
+    ordem = ['login_colaborador', 'data_inicio']
+    pd.testing.assert_frame_equal(
+        estado[0].drop(columns='spell_id').sort_values(ordem, ignore_index=True),
+        esperado.drop(columns='spell_id').sort_values(ordem, ignore_index=True),
+        check_dtype=False, check_categorical=False,
+    )
+    pd.testing.assert_frame_equal(
+        estado[1].sort_values('login_colaborador', ignore_index=True),
+        agregar_spells_colaborador(esperado).sort_values('login_colaborador', ignore_index=True),
+        check_dtype=False, check_categorical=False, rtol=1e-9,
+    )
+    if not np.array_equal(estado[0]['spell_id'].to_numpy(), np.arange(1, len(estado[0]) + 1)):
+        raise AssertionError('df_spells deixou de estar ordenado por spell_id')
+    return float(np.mean(tempos)) if tempos else 0.0
+
+
+def guardar_estado(df_spells, df_colab_spells, df_aberto, df_duracoes=None, pasta=PASTA_ESTADO):
+    """Guarda o estado incremental (Feather) na pasta indicada"""
+    if df_duracoes is None:
+        df_duracoes = duracoes_colaborador(df_spells)
+    os.makedirs(pasta, exist_ok=True)
+    _guardar_feather(df_spells, os.path.join(pasta, ESTADO_SPELLS))
+    _guardar_feather(df_colab_spells, os.path.join(pasta, ESTADO_COLAB))
+    _guardar_feather(df_aberto, os.path.join(pasta, ESTADO_ABERTO))
+    _guardar_feather(df_duracoes, os.path.join(pasta, ESTADO_DURACOES))
+
+
+def carregar_estado(pasta=PASTA_ESTADO):
+    """Lê o estado incremental: (df_spells, df_colab_spells, df_aberto, df_duracoes)"""
+    df_spells, df_colab_spells, df_aberto = (
+        _ler_feather(os.path.join(pasta, nome)) for nome in (ESTADO_SPELLS, ESTADO_COLAB, ESTADO_ABERTO)
+    )
+    caminho_duracoes = os.path.join(pasta, ESTADO_DURACOES)
+    # Estados guardados antes do histograma: recalculado uma vez a partir dos spells
+    df_duracoes = _ler_feather(caminho_duracoes) if os.path.exists(caminho_duracoes) else duracoes_colaborador(df_spells)
+    return df_spells, df_colab_spells, df_aberto, df_duracoes
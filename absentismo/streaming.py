@@ -0,0 +1,197 @@
+"""
+Modo streaming (out-of-core) para históricos longos
+
+O pipeline em memória constrói df_raw, df_temp e df_limpo completos (e cópias),
+o que deixa de caber em memória com vários anos e vários call centres. Aqui:
+
+1. particionar: o CSV é lido em blocos de LINHAS_BLOCO linhas e cada linha vai
+   para a partição hash(login_colaborador) % num_particoes (Parquet em disco).
+   Todos os registos de um colaborador ficam na mesma partição.
+2. processar_particao: cada partição é classificada, limpa, deduplicada e
+   dividida em subconjuntos como no pipeline (PASSOS 1.2 a 2.2); daí saem o
+   cubo de contagens, os spells e os resultados por colaborador. Como
+   incompatibilidades, hierarquias e spells só dependem de (colaborador, dia),
+   o resultado é o mesmo que sobre o dataset completo.
+3. combinar: só os agregados aditivos (cubos somados) e os resultados por
+   colaborador (concatenados, com spell_id renumerado) são juntos no fim.
+
+O pico de memória depende do tamanho das partições, não do histórico. O
+Bradford é calculado no fim a partir dos spells combinados; as análises que
+precisam dos registos completos (cohorts) continuam no pipeline em memória.
+
+    from absentismo.streaming import executar_streaming
+    resultados = executar_streaming('combined_data.csv', num_particoes=64)
+"""
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from absentismo import bradford, carregamento, cubo, hierarquias, limpeza, spells
+from absentismo.paralelo import particao_colaborador
+from absentismo.pipeline import PARAMETROS
+
+NUM_PARTICOES = 16
+LINHAS_BLOCO = 1_000_000
+PASTA_PARTICOES = '.particoes_streaming'
+
+
+# ======================================================================
+# PARTICIONAMENTO
+# ======================================================================
+
+def particionar(caminho_dados=carregamento.FICHEIRO_DADOS, pasta=PASTA_PARTICOES,
+                num_particoes=NUM_PARTICOES, linhas_bloco=LINHAS_BLOCO, verbose=True):
+    """
+    Reparte o CSV por colaborador em num_particoes pastas de Parquet
+
+    Devolve a lista das pastas das partições não vazias.
+    """
+    shutil.rmtree(pasta, ignore_errors=True)
+    inicio = time.time()
+    linhas = 0
+
+    leitor = pd.read_csv(caminho_dados, dtype=carregamento.TIPOS_DADOS,
+                         parse_dates=carregamento.COLUNAS_DATA, chunksize=linhas_bloco)
+    for i, bloco in enumerate(leitor):
+        particao = particao_colaborador(bloco['login_colaborador'], num_particoes)
+        for p in np.unique(particao):
+            pasta_particao = os.path.join(pasta, f'particao_{p:04d}')
+            os.makedirs(pasta_particao, exist_ok=True)
+            bloco[particao == p].to_parquet(os.path.join(pasta_particao, f'bloco_{i:05d}.parquet'), index=False)
+        linhas += len(bloco)
+        if verbose:
+            print(f'  bloco {i + 1}: {linhas:,} registos ({time.time() - inicio:.1f}s)')
+
+    return sorted(os.path.join(pasta, nome) for nome in os.listdir(pasta)) if os.path.isdir(pasta) else []
+
+
+def ler_particao(pasta_particao):
+    """Registos de uma partição com os tipos de carregamento.ler_registos"""
+    df = pd.read_parquet(pasta_particao)
+    for coluna, tipo in carregamento.TIPOS_DADOS.items():
+        df[coluna] = df[coluna].astype(object).astype(tipo)
+    return df
+
+
+# ======================================================================
+# PROCESSAMENTO POR PARTIÇÃO
+# ======================================================================
+
+def colaborador_ano(df_base_absentismo):
+    """
+    Resumo por (colaborador, ano) de df_base_absentismo: ativo (algum registo
+    com 'Activo?' == 'Sim'), DtActivacao, dias_base e dias_falta
+    """
+    df = pd.DataFrame({
+        'login_colaborador': df_base_absentismo['login_colaborador'].astype(object),
+        'ano': df_base_absentismo['Data'].dt.year,
+        'ativo': (df_base_absentismo['Activo?'] == 'Sim').to_numpy(),
+        'DtActivacao': df_base_absentismo['DtActivacao'].astype(object),
+        'falta': df_base_absentismo['Nivel 1'].isin(limpeza.NIVEL1_FALTAS).to_numpy(),
+    })
+    return df.groupby(['login_colaborador', 'ano'], sort=True).agg(
+        ativo=('ativo', 'any'),
+        DtActivacao=('DtActivacao', 'first'),
+        dias_base=('falta', 'size'),
+        dias_falta=('falta', 'sum'),
+    ).reset_index()
+
+
+def processar_particao(df_raw, df_codigos):
+    """
+    PASSOS 1.2 a 3.3 sobre os registos de um conjunto de colaboradores
+
+    Devolve df_incompativeis, df_cubo, df_spells, df_spells_abertos e
+    df_colaborador_ano da partição (spell_id local, a partir de 1).
+    """
+    df_raw, df_codigos = carregamento.alinhar_codigos(df_raw, df_codigos.copy())
+    df_temp = limpeza.classificar(df_raw, df_codigos)
+    del df_raw
+    df_incompativeis, df_limpo = limpeza.limpar(df_temp)
+    del df_temp
+    df_atrasos, df_absentismo = hierarquias.separar_atrasos_absentismo(df_limpo)
+    del df_limpo
+    subconjuntos = limpeza.subconjuntos(df_absentismo, df_atrasos)
+    df_base = subconjuntos['df_base_absentismo']
+
+    df_ausencias, df_spells = spells.construir_spells(subconjuntos['df_faltas'])
+    return {
+        'df_incompativeis': df_incompativeis,
+        'df_cubo': cubo.construir_cubo(df_base, df_atrasos),
+        'df_spells': df_spells,
+        'df_spells_abertos': spells.spells_abertos(df_ausencias),
+        'df_colaborador_ano': colaborador_ano(df_base),
+    }
+
+
+# ======================================================================
+# COMBINAÇÃO
+# ======================================================================
+
+def _ordenar(df, colunas):
+    """Ordena (estável) por colunas; categóricas com categorias diferentes comparam como texto"""
+    return df.sort_values(
+        colunas, kind='stable', ignore_index=True,
+        key=lambda s: s.astype(str) if not pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_datetime64_any_dtype(s) else s,
+    )
+
+
+def combinar(resultados):
+    """Junta os resultados de processar_particao de todas as partições"""
+    df_spells, df_spells_abertos = spells.combinar_spells(
+        [r['df_spells'] for r in resultados], [r['df_spells_abertos'] for r in resultados]
+    )
+    return {
+        'df_incompativeis': _ordenar(pd.concat([r['df_incompativeis'] for r in resultados], ignore_index=True),
+                                     ['login_colaborador', 'Data']),
+        'df_cubo': cubo.combinar_cubos(r['df_cubo'] for r in resultados),
+        'df_spells': df_spells,
+        'df_colab_spells': spells.agregar_spells_colaborador(df_spells),
+        'df_spells_abertos': df_spells_abertos,
+        'df_colaborador_ano': _ordenar(pd.concat([r['df_colaborador_ano'] for r in resultados], ignore_index=True),
+                                       ['login_colaborador', 'ano']),
+    }
+
+
+def executar_streaming(caminho_dados=carregamento.FICHEIRO_DADOS, caminho_codigos=carregamento.FICHEIRO_CODIGOS,
+                       num_particoes=NUM_PARTICOES, linhas_bloco=LINHAS_BLOCO, pasta=PASTA_PARTICOES,
+                       ano_analise=PARAMETROS['ano_analise'], manter_particoes=False, verbose=True):
+    """
+    Particiona, processa partição a partição e combina
+
+    Devolve df_incompativeis, df_cubo, df_spells, df_colab_spells,
+    df_spells_abertos, df_colaborador_ano e, para ano_analise, os artefactos
+    do Bradford (df_colaboradores_ativos, df_spells_disruptivos,
+    df_bradford_disruptivo).
+    """
+    if verbose:
+        print('STREAMING: particionar')
+    pastas = particionar(caminho_dados, pasta, num_particoes, linhas_bloco, verbose)
+    df_codigos = carregamento.ler_codigos(caminho_codigos)
+
+    if verbose:
+        print(f'STREAMING: processar {len(pastas)} partições')
+    resultados = []
+    inicio = time.time()
+    for i, pasta_particao in enumerate(pastas):
+        resultados.append(processar_particao(ler_particao(pasta_particao), df_codigos))
+        if verbose:
+            print(f'  partição {i + 1}/{len(pastas)} ({time.time() - inicio:.1f}s)')
+    if not manter_particoes:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    saidas = combinar(resultados)
+
+    # Bradford a partir dos spells combinados (PASSO 4.X)
+    anos = saidas['df_colaborador_ano']
+    ativos = anos.loc[anos['ativo'] & (anos['ano'] == ano_analise), 'login_colaborador'].unique()
+    df_spells_disruptivos, df_bradford_disruptivo = bradford.bradford_anual(saidas['df_spells'], ativos, ano_analise)
+    saidas.update({
+        'df_colaboradores_ativos': pd.DataFrame({'login_colaborador': pd.Series(ativos, dtype=object)}),
+        'df_spells_disruptivos': df_spells_disruptivos,
+        'df_bradford_disruptivo': df_bradford_disruptivo,
+    })
+    return saidas
@@ -0,0 +1,232 @@
+"""
+Benchmark do pipeline em dados sintéticos a várias escalas
+
+Para cada escala (múltiplo de sintetico.NUM_COLABORADORES; por omissão 1×,
+10× e 100×) os dados são gerados em <pasta>/escala_<N>x (reutilizados se já
+existirem com os mesmos parâmetros) e cada etapa do pipeline corre num
+processo próprio, com as etapas anteriores já em cache. O tempo registado é o
+da própria etapa (sem a leitura das entradas) e o pico de RSS é o do processo
+que a executou, medido pelo próprio processo (resource no Linux e no macOS;
+psutil no Windows). Os resultados são acrescentados a FICHEIRO_RESULTADOS; com
+--referencia são comparados com uma execução anterior e as etapas acima da
+tolerância são assinaladas. A etapa spells_diario é o tempo médio de uma
+carga diária incremental dos spells (spells.verificar_atualizacao), que falha
+se o resultado diferir da reconstrução completa. A partir de
+ESCALA_MIN_PARALELO, paralelo.construir_spells é medido em série (spells_1p) e
+com --processos processos (spells_<N>p, sem o limiar LINHAS_POR_PROCESSO) para
+calibrar esse limiar numa máquina multi-core; falha se os resultados diferirem.
+
+    python benchmark.py --escalas 1 10
+    python benchmark.py --escalas 1 --referencia benchmark_base.csv
+
+A 100× são cerca de 120M registos (CSV de ~8 GB): é preciso espaço em disco e
+memória para o pipeline a essa escala.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from absentismo import paralelo, sintetico, spells
+from absentismo.pipeline import ETAPAS, executar
+
+ESCALAS = [1, 10, 100]
+PASTA_BENCHMARK = 'benchmark_dados'
+FICHEIRO_RESULTADOS = 'benchmark_resultados.csv'
+TOLERANCIA_PCT = 20.0
+ESCALA_MIN_PARALELO = 10
+
+
+def _preparar_dados(pasta, colaboradores, semente):
+    """Gera os dados sintéticos da escala (ou reutiliza os existentes)"""
+    descricao = {'colaboradores': colaboradores, 'semente': semente,
+                 'data_inicio': sintetico.DATA_INICIO, 'data_fim': sintetico.DATA_FIM}
+    caminho_descricao = os.path.join(pasta, 'sintetico.json')
+    if os.path.exists(caminho_descricao):
+        with open(caminho_descricao) as f:
+            anterior = json.load(f)
+        if {k: anterior.get(k) for k in descricao} == descricao:
+            return anterior
+
+    inicio = time.time()
+    info = sintetico.gerar(pasta, colaboradores, semente=semente, verbose=False)
+    descricao.update(info, segundos_geracao=time.time() - inicio)
+    with open(caminho_descricao, 'w') as f:
+        json.dump(descricao, f, indent=2)
+    return descricao
+
+
+def _pico_rss_mb():
+    """Pico de RSS do processo atual em MB (ru_maxrss: KB no Linux, bytes no macOS; Windows: psutil)"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            raise RuntimeError('No Windows a memória é medida com psutil (pip install psutil)') from None
+        return psutil.Process().memory_info().peak_wset / 2**20
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 1024
+
+
+def _medir_etapa(nome, dados, codigos, pasta_artefactos):
+    """Executa uma etapa num subprocesso; devolve (segundos, pico de RSS em MB)"""
+    processo = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--etapa', nome, '--dados', dados,
+         '--codigos', codigos, '--artefactos', pasta_artefactos],
+        stdout=subprocess.PIPE, text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f'Etapa {nome} terminou com código {processo.returncode}')
+    medida = json.loads(processo.stdout.strip().splitlines()[-1])
+    return medida['segundos'], medida['pico_rss_mb']
+
+
+def _executar_etapa(nome, dados, codigos, pasta_artefactos):
+    """Modo subprocesso: executa a etapa (entradas em cache) e escreve o tempo e o pico de RSS em JSON"""
+    tempos = {}
+    executar(ETAPAS[nome]['saidas'], pasta=pasta_artefactos, caminho_dados=dados,
+             caminho_codigos=codigos, verbose=False, tempos=tempos)
+    print(json.dumps({'etapa': nome, **tempos[nome], 'pico_rss_mb': _pico_rss_mb()}))
+
+
+def _medir_spells_paralelo(df_faltas, processos):
+    """Segundos de paralelo.construir_spells em série e com processos processos (mesmo resultado)"""
+    limiar = paralelo.LINHAS_POR_PROCESSO
+    paralelo.LINHAS_POR_PROCESSO = 1  # mede o pool mesmo abaixo do limiar
+    try:
+        segundos = {}
+        resultados = {}
+        for n in (1, processos):
+            inicio = time.perf_counter()
+            resultados[n] = paralelo.construir_spells(df_faltas, n)
+            segundos[n] = time.perf_counter() - inicio
+    finally:
+        paralelo.LINHAS_POR_PROCESSO = limiar
+    for serie, pool in zip(resultados[1], resultados[processos]):
+        pd.testing.assert_frame_equal(serie, pool, check_categorical=False)
+    return segundos[1], segundos[processos]
+
+
+def medir_escala(escala, pasta=PASTA_BENCHMARK, semente=42, verbose=True, processos=None):
+    """Linhas de resultado (uma por etapa) de uma escala"""
+    pasta_escala = os.path.join(pasta, f'escala_{escala}x')
+    colaboradores = sintetico.NUM_COLABORADORES * escala
+    if verbose:
+        print(f'ESCALA {escala}x: {colaboradores:,} colaboradores')
+    info = _preparar_dados(pasta_escala, colaboradores, semente)
+
+    # Artefactos limpos para que todas as etapas sejam executadas
+    pasta_artefactos = os.path.join(pasta_escala, '.artefactos')
+    shutil.rmtree(pasta_artefactos, ignore_errors=True)
+
+    resultados = []
+    for nome in ETAPAS:
+        segundos, pico_rss_mb = _medir_etapa(nome, info['caminho_dados'], info['caminho_codigos'], pasta_artefactos)
+        resultados.append({
+            'escala': escala, 'colaboradores': colaboradores, 'linhas': info['linhas'],
+            'etapa': nome, 'segundos': segundos, 'pico_rss_mb': pico_rss_mb,
+        })
+        if verbose:
+            print(f'  {nome:15s}: {segundos:8.2f}s  {pico_rss_mb:9.0f} MB')
+
+    # Carga diária dos spells: tem de dar o mesmo que a reconstrução (AssertionError se não)
+    df_faltas = executar(['df_faltas'], pasta=pasta_artefactos, caminho_dados=info['caminho_dados'],
+                         caminho_codigos=info['caminho_codigos'], verbose=False)['df_faltas']
+    segundos = spells.verificar_atualizacao(df_faltas)
+    resultados.append({
+        'escala': escala, 'colaboradores': colaboradores, 'linhas': info['linhas'],
+        'etapa': 'spells_diario', 'segundos': segundos, 'pico_rss_mb': float('nan'),
+    })
+    if verbose:
+        print(f'  {"spells_diario":15s}: {segundos:8.2f}s  (igual à reconstrução)')
+
+    # Pool de processos dos spells: calibração de paralelo.LINHAS_POR_PROCESSO
+    if escala >= ESCALA_MIN_PARALELO:
+        processos = max(2, processos or os.cpu_count() or 1)
+        serie, pool = _medir_spells_paralelo(df_faltas, processos)
+        for nome, segundos in [('spells_1p', serie), (f'spells_{processos}p', pool)]:
+            resultados.append({
+                'escala': escala, 'colaboradores': colaboradores, 'linhas': info['linhas'],
+                'etapa': nome, 'segundos': segundos, 'pico_rss_mb': float('nan'),
+            })
+        if verbose:
+            print(f'  {f"spells_{processos}p":15s}: {pool:8.2f}s  (série: {serie:.2f}s, {len(df_faltas):,} faltas, '
+                  f'{os.cpu_count()} cores)')
+    return resultados
+
+
+def analisar(df, referencia=None, tolerancia=TOLERANCIA_PCT):
+    """
+    Acrescenta segundos por milhão de linhas e o fator de escala (tempo relativo
+    à menor escala a dividir pelo aumento de volume: ~1 é linear, muito acima
+    de 1 indica um degrau de escala). Com referencia (DataFrame de uma execução
+    anterior) acrescenta a variação de tempo e de memória e a coluna regressao.
+    """
+    df = df.copy()
+    df['segundos_por_milhao'] = df['segundos'] / (df['linhas'] / 1e6)
+    menor = df.loc[df.groupby('etapa')['escala'].idxmin(), ['etapa', 'segundos', 'linhas']]
+    menor = menor.set_index('etapa')
+    volume = df['linhas'] / df['etapa'].map(menor['linhas'])
+    df['fator_escala'] = df['segundos'] / df['etapa'].map(menor['segundos']).where(lambda s: s > 0) / volume
+
+    if referencia is not None:
+        ref = referencia.drop_duplicates(['escala', 'etapa'], keep='last').set_index(['escala', 'etapa'])
+        chave = pd.MultiIndex.from_frame(df[['escala', 'etapa']])
+        df['variacao_segundos_pct'] = (df['segundos'].values / ref['segundos'].reindex(chave).values - 1) * 100
+        df['variacao_rss_pct'] = (df['pico_rss_mb'].values / ref['pico_rss_mb'].reindex(chave).values - 1) * 100
+        df['regressao'] = (df['variacao_segundos_pct'] > tolerancia) | (df['variacao_rss_pct'] > tolerancia)
+    else:
+        df['variacao_segundos_pct'] = df['variacao_rss_pct'] = float('nan')
+        df['regressao'] = False
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o tempo e o pico de memória de cada etapa do pipeline em dados sintéticos')
+    parser.add_argument('--escalas', nargs='+', type=int, default=ESCALAS,
+                        help=f'múltiplos de {sintetico.NUM_COLABORADORES} colaboradores')
+    parser.add_argument('--pasta', default=PASTA_BENCHMARK, help='pasta dos dados sintéticos e artefactos')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--resultados', default=FICHEIRO_RESULTADOS, help='CSV onde os resultados são acrescentados')
+    parser.add_argument('--referencia', help='CSV de uma execução anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PCT, help='variação (%%) a partir da qual há regressão')
+    parser.add_argument('--processos', type=int, default=None,
+                        help=f'processos da medição spells_<N>p (escalas >= {ESCALA_MIN_PARALELO}x; por omissão, um por core)')
+    # Modo interno (um subprocesso por etapa)
+    parser.add_argument('--etapa', help=argparse.SUPPRESS)
+    parser.add_argument('--dados', help=argparse.SUPPRESS)
+    parser.add_argument('--codigos', help=argparse.SUPPRESS)
+    parser.add_argument('--artefactos', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.etapa:
+        _executar_etapa(args.etapa, args.dados, args.codigos, args.artefactos)
+        return
+
+    data = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    resultados = []
+    for escala in sorted(args.escalas):
+        resultados += medir_escala(escala, args.pasta, args.semente, processos=args.processos)
+    df = pd.DataFrame(resultados).assign(data=data)
+
+    referencia = pd.read_csv(args.referencia) if args.referencia else None
+    df = analisar(df, referencia, args.tolerancia)
+    df.to_csv(args.resultados, mode='a', header=not os.path.exists(args.resultados), index=False)
+
+    print()
+    with pd.option_context('display.width', 160, 'display.max_columns', 20, 'display.float_format', '{:.2f}'.format):
+        print(df.drop(columns=['data', 'colaboradores']).to_string(index=False))
+    if df['regressao'].any():
+        print(f"\nRegressões (> {args.tolerancia:.0f}%): {', '.join(df.loc[df['regressao'], 'etapa'] + ' @' + df.loc[df['regressao'], 'escala'].astype(str) + 'x')}")
+    print(f'\nResultados acrescentados a {args.resultados}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,82 @@
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import nsdecls, qn
+from docx.oxml import OxmlElement, parse_xml
+
+from absentismo.carregamento import FICHEIRO_CODIGOS, FICHEIRO_DADOS
+from absentismo.figuras import FORMATOS_DOCX, PASTA_FIGURAS, gerar_figuras
+from absentismo.metricas import (
+    ARTEFACTOS_METRICAS, FICHEIRO_METRICAS, calcular_metricas, carregar_metricas,
+    filtrar_segmento, gerar_metricas, segmentos_principais
+)
+from absentismo.pipeline import executar
+
+FICHEIRO_RELATORIO = 'Relatorio_Absentismo_Direcao_Executiva.docx'
+
+# Modo lote (um relatório por segmento)
+PASTA_RELATORIOS = 'relatorios'
+FICHEIRO_MANIFESTO = 'manifesto.json'
+
+# Estilos de parágrafo das células das tabelas
+ESTILO_TABELA = 'Tabela Texto'
+ESTILO_TABELA_CABECALHO = 'Tabela Cabeçalho'
+
+# Figuras (absentismo.figuras): largura no documento (página de 8,5" com margens de 1")
+LARGURA_FIGURA = Inches(6.5)
+
+MESES_PT = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
+]
+# Ação recomendada por nível de risco Bradford (pela ordem de bradford.NIVEIS_RISCO)
+ACOES_BRADFORD = ['Monitorização normal', 'Prestar atenção', 'Conversa informal', 'Reunião formal', 'Aviso formal', 'Ação disciplinar']
+
+DIAS_PT = {
+    'Monday': 'Segunda-feira', 'Tuesday': 'Terça-feira', 'Wednesday': 'Quarta-feira',
+    'Thursday': 'Quinta-feira', 'Friday': 'Sexta-feira', 'Saturday': 'Sábado', 'Sunday': 'Domingo'
+}
+
+# ============================================================================
+# FORMATAÇÃO (números em formato português: 24.511 | 3,30%)
+# ============================================================================
+def fmt_int(n):
+    """Inteiro com separador de milhares"""
+    return f'{n:,.0f}'.replace(',', '.')
+
+def fmt_num(x, casas=1):
+    """Decimal com vírgula e separador de milhares"""
+    return f'{x:,.{casas}f}'.replace(',', ' ').replace('.', ',').replace(' ', '.')
+
+def fmt_pct(x, casas=1):
+    return fmt_num(x, casas) + '%'
+
+def fmt_var(x, casas=1):
+    """Variação percentual com sinal"""
+    return ('+' if x > 0 else '') + fmt_pct(x, casas)
+
+def fmt_mes(data_iso):
+    """'2025-06-30' -> 'Junho 2025'"""
+    ano, mes = data_iso.split('-')[:2]
+    return f'{MESES_PT[int(mes) - 1]} {ano}'
+
+def faixas_bradford(limites):
+    """[50, 100, ...] -> ['< 50', '50-100', ..., '> 600'] (uma faixa por nível de risco)"""
+    return [f'< {limites[0]}'] + [f'{inf}-{sup}' for inf, sup in zip(limites[:-1], limites[1:])] + [f'> {limites[-1]}']
+
+def periodo_comparacao(ano, mes_max):
+    """'2024 (Jan-Jun)'"""
+    return f'{ano} (Jan-{MESES_PT[mes_max - 1][:3]})'
 
 def add_heading_custom(doc, text, level=1):
     """Adiciona título personalizado"""
@@ -23,1137 +97,1421 @@ def add_paragraph_formatted(doc, text, bold=False, italic=False, size=11):
     p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
     return p
 
+def _estilo_tabela(doc, nome, bold=False):
+    """Estilo de parágrafo das células (criado uma vez por documento); devolve o style_id"""
+    try:
+        return doc.styles[nome].style_id
+    except KeyError:
+        estilo = doc.styles.add_style(nome, WD_STYLE_TYPE.PARAGRAPH)
+        estilo.base_style = doc.styles['Normal']
+        estilo.font.size = Pt(10)
+        estilo.font.bold = bold
+        return estilo.style_id
+
+def _linhas_xml(linhas, estilo_id, larguras):
+    """XML (w:tr) de todas as linhas, com o texto escapado"""
+    partes = []
+    for linha in linhas:
+        partes.append('<w:tr>')
+        for largura, valor in zip(larguras, linha):
+            partes.append(
+                f'<w:tc><w:tcPr><w:tcW w:w="{largura}" w:type="dxa"/></w:tcPr>'
+                f'<w:p><w:pPr><w:pStyle w:val="{estilo_id}"/></w:pPr>'
+                f'<w:r><w:t xml:space="preserve">{escape(str(valor))}</w:t></w:r></w:p></w:tc>'
+            )
+        partes.append('</w:tr>')
+    return ''.join(partes)
+
 def add_table_styled(doc, data, headers):
-    """Adiciona tabela estilizada"""
-    table = doc.add_table(rows=1, cols=len(headers))
+    """
+    Adiciona tabela estilizada
+
+    O XML de todas as linhas é gerado de uma vez e anexado à tabela; o
+    tamanho de letra e o negrito do cabeçalho vêm dos estilos de parágrafo
+    ESTILO_TABELA/ESTILO_TABELA_CABECALHO, não de cada run.
+    """
+    table = doc.add_table(rows=0, cols=len(headers))
     table.style = 'Light Grid Accent 1'
-    
-    # Cabeçalhos
-    header_cells = table.rows[0].cells
-    for i, header in enumerate(headers):
-        header_cells[i].text = header
-        for paragraph in header_cells[i].paragraphs:
-            for run in paragraph.runs:
-                run.font.bold = True
-                run.font.size = Pt(10)
-    
-    # Dados
-    for row_data in data:
-        row_cells = table.add_row().cells
-        for i, value in enumerate(row_data):
-            row_cells[i].text = str(value)
-            for paragraph in row_cells[i].paragraphs:
-                for run in paragraph.runs:
-                    run.font.size = Pt(10)
-    
+    larguras = [col.w for col in table._tbl.tblGrid.gridCol_lst]
+
+    xml = (
+        _linhas_xml([headers], _estilo_tabela(doc, ESTILO_TABELA_CABECALHO, bold=True), larguras) +
+        _linhas_xml(data, _estilo_tabela(doc, ESTILO_TABELA), larguras)
+    )
+    tbl = table._tbl
+    for tr in parse_xml(f'<w:tbl {nsdecls("w")}>{xml}</w:tbl>'):
+        tbl.append(tr)
+
     return table
 
-# Criar documento
-doc = Document()
+def add_figura(doc, m, nome, legenda, marcador=True):
+    """
+    Insere a figura nome (de m['figuras'], gerada por absentismo.figuras) com
+    legenda; sem a figura, ou se não for um formato que o DOCX embute (SVG),
+    escreve o marcador '[Gráfico: legenda]' (ou nada com marcador=False)
+    """
+    caminho = m.get('figuras', {}).get(nome)
+    embutivel = caminho and os.path.splitext(caminho)[1].lstrip('.').lower() in FORMATOS_DOCX
+    if not embutivel or not os.path.exists(caminho):
+        if marcador:
+            add_paragraph_formatted(doc, f'[Gráfico: {legenda}]', italic=True)
+        return None
+    doc.add_picture(caminho, width=LARGURA_FIGURA)
+    doc.paragraphs[-1].alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p = add_paragraph_formatted(doc, f'Figura: {legenda}', italic=True, size=9)
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    return p
 
-# Configurar margens
-sections = doc.sections
-for section in sections:
-    section.top_margin = Inches(1)
-    section.bottom_margin = Inches(1)
-    section.left_margin = Inches(1)
-    section.right_margin = Inches(1)
 
 # ============================================================================
 # CAPA
 # ============================================================================
-doc.add_paragraph()
-doc.add_paragraph()
-doc.add_paragraph()
-
-title = doc.add_paragraph()
-title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = title.add_run('ANÁLISE DE ABSENTISMO')
-run.font.size = Pt(28)
-run.font.bold = True
-run.font.color.rgb = RGBColor(0, 51, 102)
-
-subtitle = doc.add_paragraph()
-subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = subtitle.add_run('Call Center')
-run.font.size = Pt(20)
-run.font.color.rgb = RGBColor(100, 100, 100)
-
-doc.add_paragraph()
-doc.add_paragraph()
-
-subtitle2 = doc.add_paragraph()
-subtitle2.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = subtitle2.add_run('Relatório Executivo para a Direção')
-run.font.size = Pt(16)
-run.italic = True
-
-doc.add_paragraph()
-doc.add_paragraph()
-doc.add_paragraph()
-
-info = doc.add_paragraph()
-info.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = info.add_run('Período de Análise: Janeiro 2024 – Junho 2025\n')
-run.font.size = Pt(12)
-run = info.add_run('3.135 Colaboradores | 1,3M Registos')
-run.font.size = Pt(12)
-
-doc.add_paragraph()
-doc.add_paragraph()
-
-date = doc.add_paragraph()
-date.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = date.add_run('Novembro 2025')
-run.font.size = Pt(12)
-run.font.color.rgb = RGBColor(100, 100, 100)
-
-doc.add_page_break()
+def _capa(doc, m):
+    a = m['ambito']
+    doc.add_paragraph()
+    doc.add_paragraph()
+    doc.add_paragraph()
+
+    title = doc.add_paragraph()
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = title.add_run('ANÁLISE DE ABSENTISMO')
+    run.font.size = Pt(28)
+    run.font.bold = True
+    run.font.color.rgb = RGBColor(0, 51, 102)
+
+    subtitle = doc.add_paragraph()
+    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = subtitle.add_run('Call Center')
+    run.font.size = Pt(20)
+    run.font.color.rgb = RGBColor(100, 100, 100)
+
+    if m.get('segmento'):
+        segmento = doc.add_paragraph()
+        segmento.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = segmento.add_run(m['segmento'][1])
+        run.font.size = Pt(16)
+        run.font.color.rgb = RGBColor(0, 51, 102)
+
+    doc.add_paragraph()
+    doc.add_paragraph()
+
+    subtitle2 = doc.add_paragraph()
+    subtitle2.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = subtitle2.add_run('Relatório Executivo para a Direção')
+    run.font.size = Pt(16)
+    run.italic = True
+
+    doc.add_paragraph()
+    doc.add_paragraph()
+    doc.add_paragraph()
+
+    info = doc.add_paragraph()
+    info.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = info.add_run(f"Período de Análise: {fmt_mes(a['data_inicio'])} – {fmt_mes(a['data_fim'])}\n")
+    run.font.size = Pt(12)
+    run = info.add_run(f"{fmt_int(a['num_colaboradores'])} Colaboradores | {fmt_num(a['num_registos'] / 1e6)}M Registos")
+    run.font.size = Pt(12)
+
+    doc.add_paragraph()
+    doc.add_paragraph()
+
+    date = doc.add_paragraph()
+    date.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = date.add_run(fmt_mes(m['data_geracao']))
+    run.font.size = Pt(12)
+    run.font.color.rgb = RGBColor(100, 100, 100)
+
+    doc.add_page_break()
+
 
 # ============================================================================
 # ÍNDICE
 # ============================================================================
-add_heading_custom(doc, 'ÍNDICE', level=1)
-doc.add_paragraph()
-
-sections_list = [
-    '1. SUMÁRIO EXECUTIVO',
-    '2. CONTEXTO E METODOLOGIA',
-    '3. SITUAÇÃO ATUAL: INDICADORES-CHAVE',
-    '4. ANÁLISE DE PADRÕES DE AUSÊNCIA',
-    '5. IDENTIFICAÇÃO DE RISCOS OPERACIONAIS',
-    '6. ANÁLISE COMPORTAMENTAL',
-    '7. ANÁLISE TEMPORAL E TENDÊNCIAS',
-    '8. SEGMENTAÇÃO E PRIORIZAÇÃO',
-    '9. CONCLUSÕES E RECOMENDAÇÕES'
-]
+def _indice(doc, m):
+    add_heading_custom(doc, 'ÍNDICE', level=1)
+    doc.add_paragraph()
+
+    sections_list = [
+        '1. SUMÁRIO EXECUTIVO',
+        '2. CONTEXTO E METODOLOGIA',
+        '3. SITUAÇÃO ATUAL: INDICADORES-CHAVE',
+        '4. ANÁLISE DE PADRÕES DE AUSÊNCIA',
+        '5. IDENTIFICAÇÃO DE RISCOS OPERACIONAIS',
+        '6. ANÁLISE COMPORTAMENTAL',
+        '7. ANÁLISE TEMPORAL E TENDÊNCIAS',
+        '8. SEGMENTAÇÃO E PRIORIZAÇÃO',
+        '9. CONCLUSÕES E RECOMENDAÇÕES'
+    ]
+
+    for item in sections_list:
+        p = doc.add_paragraph(item, style='List Number')
+        p.paragraph_format.left_indent = Inches(0.25)
 
-for item in sections_list:
-    p = doc.add_paragraph(item, style='List Number')
-    p.paragraph_format.left_indent = Inches(0.25)
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 1. SUMÁRIO EXECUTIVO
 # ============================================================================
-add_heading_custom(doc, '1. SUMÁRIO EXECUTIVO', level=1)
-doc.add_paragraph()
-
-add_paragraph_formatted(doc, 
-    'Este relatório apresenta uma análise abrangente do absentismo no Call Center, '
-    'baseada em 18 meses de dados operacionais (janeiro de 2024 a junho de 2025), '
-    'abrangendo 3.135 colaboradores e 1,3 milhões de registos.')
-
-doc.add_paragraph()
+def _sumario_executivo(doc, m):
+    a, k, c, b = m['ambito'], m['kpis'], m['comparacao'], m['bradford']
+    primeiro, ultimo = c['anos'][0], c['anos'][-1]
+    top_pareto, pct_pareto = m['operacoes']['pareto'][-1]
+    add_heading_custom(doc, '1. SUMÁRIO EXECUTIVO', level=1)
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc, 
+        'Este relatório apresenta uma análise abrangente do absentismo no Call Center, '
+        f"baseada em {a['num_meses']} meses de dados operacionais "
+        f"({fmt_mes(a['data_inicio']).lower().replace(' ', ' de ')} a {fmt_mes(a['data_fim']).lower().replace(' ', ' de ')}), "
+        f"abrangendo {fmt_int(a['num_colaboradores'])} colaboradores e {fmt_int(a['num_registos'])} registos.")
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'Principais Conclusões', level=2)
+
+    melhoria = c['variacao_taxa'] < 0
+    periodo = f"jan-{MESES_PT[c['mes_max'] - 1][:3].lower()}"
+    conclusions = [
+        ('Taxa de Absentismo Global:', f"{fmt_pct(k['taxa_absentismo'], 2)}, com tendência de {'melhoria' if melhoria else 'agravamento'} entre {primeiro['ano']} e {ultimo['ano']}."),
+        ('Redução Ano-a-Ano:' if melhoria else 'Aumento Ano-a-Ano:',
+         f"{'Diminuição' if melhoria else 'Aumento'} de {fmt_pct(abs(c['variacao_taxa']))} na taxa de absentismo "
+         f"(de {fmt_pct(primeiro['taxa_absentismo'], 2)} em {periodo} {primeiro['ano']} para {fmt_pct(ultimo['taxa_absentismo'], 2)} em {periodo} {ultimo['ano']})."),
+        ('Concentração do Problema:', f'{top_pareto} operações representam {fmt_pct(pct_pareto, 0)} do absentismo total, permitindo intervenções focalizadas.'),
+        ('Padrões Disruptivos:', f"{fmt_pct(m['spells']['short_term_pct'])} dos episódios de ausência são de curta duração (até {m['spells']['limite_short_term']} dias), indicando padrões comportamentais."),
+        ('População em Risco:', f"{fmt_int(b['num_colaboradores'])} colaboradores ativos ({fmt_pct(b['pct_base_ativa'], 0)} da base ativa em {m['ano_analise']}) apresentam episódios curtos recorrentes."),
+        ('Casos Críticos:', f"{fmt_int(b['acima_200_num'])} colaboradores ({fmt_pct(b['acima_200_pct'])}) encontram-se em risco alto/severo/crítico, requerendo intervenção imediata.")
+    ]
+
+    for label, text in conclusions:
+        p = doc.add_paragraph()
+        run = p.add_run(label + ' ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(text)
+        run.font.size = Pt(11)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'Impacto Operacional', level=2)
+
+    add_paragraph_formatted(doc,
+        f"O absentismo representa {fmt_int(k['dias_perdidos'])} dias de trabalho perdidos no período analisado, "
+        f"equivalente a uma média de {fmt_num(k['lost_time_rate'])} dias por colaborador. A taxa de atrasos situa-se "
+        f"em {fmt_pct(k['taxa_atrasos'], 2)}, afetando {fmt_pct(k['pct_colaboradores_com_atraso'], 0)} dos colaboradores.")
+
+    doc.add_page_break()
 
-add_heading_custom(doc, 'Principais Conclusões', level=2)
-
-conclusions = [
-    ('Taxa de Absentismo Global:', '3,30%, com tendência de melhoria significativa entre 2024 e 2025.'),
-    ('Redução Ano-a-Ano:', 'Diminuição de 36,5% na taxa de absentismo (de 3,73% em jan-jun 2024 para 2,37% em jan-jun 2025).'),
-    ('Concentração do Problema:', '15 operações representam 92% do absentismo total, permitindo intervenções focalizadas.'),
-    ('Padrões Disruptivos:', '74,5% dos episódios de ausência são de curta duração (até 3 dias), indicando padrões comportamentais.'),
-    ('População em Risco:', '493 colaboradores ativos (42% da base ativa em 2025) apresentam episódios curtos recorrentes.'),
-    ('Casos Críticos:', '42 colaboradores (8,5%) encontram-se em risco alto/severo/crítico, requerendo intervenção imediata.')
-]
-
-for label, text in conclusions:
-    p = doc.add_paragraph()
-    run = p.add_run(label + ' ')
-    run.bold = True
-    run.font.size = Pt(11)
-    run = p.add_run(text)
-    run.font.size = Pt(11)
-
-doc.add_paragraph()
-
-add_heading_custom(doc, 'Impacto Operacional', level=2)
-
-add_paragraph_formatted(doc,
-    'O absentismo representa 24.511 dias de trabalho perdidos no período analisado, '
-    'equivalente a uma média de 7,8 dias por colaborador. A taxa de atrasos situa-se '
-    'em 5,31%, afetando 72% dos colaboradores.')
-
-doc.add_page_break()
 
 # ============================================================================
 # 2. CONTEXTO E METODOLOGIA
 # ============================================================================
-add_heading_custom(doc, '2. CONTEXTO E METODOLOGIA', level=1)
-doc.add_paragraph()
+def _contexto_metodologia(doc, m):
+    a = m['ambito']
+    add_heading_custom(doc, '2. CONTEXTO E METODOLOGIA', level=1)
+    doc.add_paragraph()
 
-add_heading_custom(doc, '2.1 Âmbito da Análise', level=2)
+    add_heading_custom(doc, '2.1 Âmbito da Análise', level=2)
 
-add_paragraph_formatted(doc,
-    'A análise foi conduzida sobre um conjunto de dados operacionais do Call Center, '
-    'estruturado da seguinte forma:')
+    add_paragraph_formatted(doc,
+        'A análise foi conduzida sobre um conjunto de dados operacionais do Call Center, '
+        'estruturado da seguinte forma:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-data = [
-    ['Período', 'Janeiro 2024 – Junho 2025 (18 meses)'],
-    ['Colaboradores', '3.135 colaboradores únicos'],
-    ['Registos', '1.325.097 registos de presença/ausência'],
-    ['Dias-colaborador', '761.244 dias úteis analisados']
-]
-add_table_styled(doc, data, ['Dimensão', 'Valor'])
+    data = [
+        ['Período', f"{fmt_mes(a['data_inicio'])} – {fmt_mes(a['data_fim'])} ({a['num_meses']} meses)"],
+        ['Colaboradores', f"{fmt_int(a['num_colaboradores'])} colaboradores únicos"],
+        ['Registos', f"{fmt_int(a['num_registos'])} registos de presença/ausência"],
+        ['Dias-colaborador', f"{fmt_int(a['dias_colaborador'])} dias úteis analisados"]
+    ]
+    add_table_styled(doc, data, ['Dimensão', 'Valor'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '2.2 Abordagem Metodológica', level=2)
+    add_heading_custom(doc, '2.2 Abordagem Metodológica', level=2)
 
-add_paragraph_formatted(doc,
-    'A metodologia aplicada seguiu padrões internacionais de análise de absentismo, '
-    'com foco em métricas acionáveis:')
+    add_paragraph_formatted(doc,
+        'A metodologia aplicada seguiu padrões internacionais de análise de absentismo, '
+        'com foco em métricas acionáveis:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-methods = [
-    'Limpeza e normalização de dados, incluindo resolução de 48 incompatibilidades identificadas.',
-    'Separação de dados em duas hierarquias independentes (absentismo e atrasos) para evitar dupla contagem.',
-    'Cálculo de taxas normalizadas ajustadas pela base de trabalho efetivo em cada período.',
-    'Análise de episódios de ausência (spells) para distinguir padrões de frequência vs. duração.',
-    'Aplicação do Bradford Factor para identificar ausências disruptivas de curta duração.',
-    'Segmentação por operação, categoria profissional e senioridade.',
-    'Análise estatística de controlo (U-Charts) para deteção de variações anormais.'
-]
+    methods = [
+        f"Limpeza e normalização de dados, incluindo resolução de {fmt_int(a['num_incompatibilidades'])} incompatibilidades identificadas.",
+        'Separação de dados em duas hierarquias independentes (absentismo e atrasos) para evitar dupla contagem.',
+        'Cálculo de taxas normalizadas ajustadas pela base de trabalho efetivo em cada período.',
+        'Análise de episódios de ausência (spells) para distinguir padrões de frequência vs. duração.',
+        'Aplicação do Bradford Factor para identificar ausências disruptivas de curta duração.',
+        'Segmentação por operação, categoria profissional e senioridade.',
+        'Análise estatística de controlo (U-Charts) para deteção de variações anormais.'
+    ]
 
-for method in methods:
-    p = doc.add_paragraph(method, style='List Bullet')
-    p.paragraph_format.left_indent = Inches(0.25)
+    for method in methods:
+        p = doc.add_paragraph(method, style='List Bullet')
+        p.paragraph_format.left_indent = Inches(0.25)
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '2.3 Definições-Chave', level=2)
+    add_heading_custom(doc, '2.3 Definições-Chave', level=2)
 
-add_paragraph_formatted(doc,
-    'Para garantir clareza interpretativa, as seguintes definições foram aplicadas:')
+    add_paragraph_formatted(doc,
+        'Para garantir clareza interpretativa, as seguintes definições foram aplicadas:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-definitions = [
-    ('Taxa de Absentismo:', 'Percentagem de dias de falta (justificada + injustificada) sobre o total de dias úteis esperados (trabalho pago + faltas). Exclui férias, licenças e formações planeadas.'),
-    ('Spell (Episódio):', 'Sequência contínua de dias de ausência. Um colaborador com 3 dias consecutivos de falta tem 1 spell; se faltar 3 dias separados, tem 3 spells.'),
-    ('Short-term Spell:', 'Episódio de ausência até 3 dias. Estatisticamente associado a padrões comportamentais disruptivos.'),
-    ('Bradford Factor:', 'Métrica que penaliza a frequência de ausências: Bradford = S² × D, onde S é o número de episódios e D o total de dias ausentes.')
-]
+    definitions = [
+        ('Taxa de Absentismo:', 'Percentagem de dias de falta (justificada + injustificada) sobre o total de dias úteis esperados (trabalho pago + faltas). Exclui férias, licenças e formações planeadas.'),
+        ('Spell (Episódio):', 'Sequência contínua de dias de ausência. Um colaborador com 3 dias consecutivos de falta tem 1 spell; se faltar 3 dias separados, tem 3 spells.'),
+        ('Short-term Spell:', f"Episódio de ausência até {m['spells']['limite_short_term']} dias. Estatisticamente associado a padrões comportamentais disruptivos."),
+        ('Bradford Factor:', 'Métrica que penaliza a frequência de ausências: Bradford = S² × D, onde S é o número de episódios e D o total de dias ausentes.')
+    ]
 
-for term, definition in definitions:
-    p = doc.add_paragraph()
-    run = p.add_run(term + ' ')
-    run.bold = True
-    run.font.size = Pt(11)
-    run = p.add_run(definition)
-    run.font.size = Pt(11)
+    for term, definition in definitions:
+        p = doc.add_paragraph()
+        run = p.add_run(term + ' ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(definition)
+        run.font.size = Pt(11)
+
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 3. SITUAÇÃO ATUAL: INDICADORES-CHAVE
 # ============================================================================
-add_heading_custom(doc, '3. SITUAÇÃO ATUAL: INDICADORES-CHAVE', level=1)
-doc.add_paragraph()
+def _indicadores_chave(doc, m):
+    k, d, p = m['kpis'], m['dia_semana'], m['padroes']
+    pct_medicas = p['dias_ausencia_medica'] / k['dias_perdidos'] * 100 if k['dias_perdidos'] else 0
+    add_heading_custom(doc, '3. SITUAÇÃO ATUAL: INDICADORES-CHAVE', level=1)
+    doc.add_paragraph()
 
-add_heading_custom(doc, '3.1 Visão Global', level=2)
+    add_heading_custom(doc, '3.1 Visão Global', level=2)
 
-add_paragraph_formatted(doc,
-    'A situação atual do absentismo no Call Center apresenta-se da seguinte forma:')
+    add_paragraph_formatted(doc,
+        'A situação atual do absentismo no Call Center apresenta-se da seguinte forma:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-kpis = [
-    ['Taxa de Absentismo', '3,30%'],
-    ['Taxa de Atrasos', '5,31%'],
-    ['Lost Time Rate', '7,8 dias/colaborador'],
-    ['Frequency Rate', '2,43 episódios/colaborador'],
-    ['Duração Média de Episódio', '3,2 dias'],
-    ['Colaboradores sem Ausências', '36,2%']
-]
-add_table_styled(doc, kpis, ['Indicador', 'Valor'])
+    kpis = [
+        ['Taxa de Absentismo', fmt_pct(k['taxa_absentismo'], 2)],
+        ['Taxa de Atrasos', fmt_pct(k['taxa_atrasos'], 2)],
+        ['Lost Time Rate', f"{fmt_num(k['lost_time_rate'])} dias/colaborador"],
+        ['Frequency Rate', f"{fmt_num(k['frequency_rate'], 2)} episódios/colaborador"],
+        ['Duração Média de Episódio', f"{fmt_num(k['duracao_media_spell'])} dias"],
+        ['Colaboradores sem Ausências', fmt_pct(k['pct_sem_ausencias'])]
+    ]
+    add_table_styled(doc, kpis, ['Indicador', 'Valor'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'A taxa de absentismo de 3,30% situa-se dentro de parâmetros aceitáveis para operações '
-    'de Call Center (benchmark típico: 3-5%), mas apresenta oportunidades de melhoria, '
-    'particularmente considerando a tendência positiva já observada.')
+    if k['taxa_absentismo'] <= 5:
+        add_paragraph_formatted(doc,
+            f"A taxa de absentismo de {fmt_pct(k['taxa_absentismo'], 2)} situa-se dentro de parâmetros aceitáveis para operações "
+            'de Call Center (benchmark típico: 3-5%), mas apresenta oportunidades de melhoria.')
+    else:
+        add_paragraph_formatted(doc,
+            f"A taxa de absentismo de {fmt_pct(k['taxa_absentismo'], 2)} situa-se acima do benchmark típico para operações "
+            'de Call Center (3-5%), pelo que a redução do absentismo deve ser tratada como prioridade.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '3.2 Distribuição por Tipo de Ausência', level=2)
+    add_heading_custom(doc, '3.2 Distribuição por Tipo de Ausência', level=2)
 
-add_paragraph_formatted(doc,
-    'As ausências distribuem-se da seguinte forma:')
+    add_paragraph_formatted(doc,
+        'As ausências distribuem-se da seguinte forma:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-absences = [
-    ['Ausência Médica', '16.102 dias', '65,7%'],
-    ['Falta Injustificada', '5.576 dias', '22,8%'],
-    ['Assistência Familiar', '1.102 dias', '4,5%'],
-    ['Óbito', '1.027 dias', '4,2%'],
-    ['Casamento', '407 dias', '1,7%'],
-    ['Outras', '297 dias', '1,2%']
-]
-add_table_styled(doc, absences, ['Tipo', 'Volume', '% Total'])
+    absences = [[tipo, f'{fmt_int(dias)} dias', fmt_pct(pct)] for tipo, dias, pct in m['tipos_ausencia']]
+    add_table_styled(doc, absences, ['Tipo', 'Volume', '% Total'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'As ausências médicas representam dois terços do absentismo total. No entanto, '
-    'é relevante notar que 65,7% destas ausências médicas são de curta duração (até 3 dias), '
-    'o que pode indicar situações de menor gravidade ou, em alguns casos, utilização '
-    'inadequada do mecanismo.')
+    add_paragraph_formatted(doc,
+        f"As ausências médicas representam {fmt_pct(pct_medicas)} do absentismo total. No entanto, "
+        f"é relevante notar que {fmt_pct(p['medicas_short_pct'])} dos episódios de ausência médica são de curta duração (até {m['spells']['limite_short_term']} dias), "
+        'o que pode indicar situações de menor gravidade ou, em alguns casos, utilização '
+        'inadequada do mecanismo.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '3.3 Variação por Dia da Semana', level=2)
+    add_heading_custom(doc, '3.3 Variação por Dia da Semana', level=2)
 
-add_paragraph_formatted(doc,
-    'A taxa de absentismo apresenta variação significativa ao longo da semana:')
+    add_paragraph_formatted(doc,
+        'A taxa de absentismo apresenta variação significativa ao longo da semana:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-weekdays = [
-    ['Segunda-feira', '2,83%'],
-    ['Terça-feira', '3,03%'],
-    ['Quarta-feira', '3,09%'],
-    ['Quinta-feira', '3,07%'],
-    ['Sexta-feira', '3,14%'],
-    ['Sábado', '4,77%'],
-    ['Domingo', '4,29%']
-]
-add_table_styled(doc, weekdays, ['Dia da Semana', 'Taxa de Absentismo'])
+    weekdays = [[DIAS_PT[dia], fmt_pct(taxa, 2)] for dia, taxa in d['taxas']]
+    add_table_styled(doc, weekdays, ['Dia da Semana', 'Taxa de Absentismo'])
+
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if d['acrescimo_fim_semana_min'] > 0:
+        add_paragraph_formatted(doc,
+            'Observa-se um aumento da taxa de absentismo ao fim de semana '
+            f"(sábados e domingos apresentam taxas {fmt_num(d['acrescimo_fim_semana_min'], 0)}-{fmt_pct(d['acrescimo_fim_semana_max'], 0)} superiores aos dias úteis). "
+            'Este padrão é comum em operações de Call Center, relacionando-se com menor '
+            'apetência para trabalho em horários não convencionais e possíveis desafios '
+            'de gestão de turnos.')
+    else:
+        add_paragraph_formatted(doc,
+            'Não se observa aumento da taxa de absentismo ao fim de semana '
+            f"(sábados e domingos: {fmt_var(d['acrescimo_fim_semana_min'], 0)} a {fmt_var(d['acrescimo_fim_semana_max'], 0)} "
+            'face à média dos dias úteis).')
 
-add_paragraph_formatted(doc,
-    'Observa-se um aumento substancial da taxa de absentismo ao fim de semana '
-    '(sábados e domingos apresentam taxas 50-70% superiores aos dias úteis). '
-    'Este padrão é comum em operações de Call Center, relacionando-se com menor '
-    'apetência para trabalho em horários não convencionais e possíveis desafios '
-    'de gestão de turnos.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_figura(doc, m, 'dia_semana', 'Taxa de Absentismo por Dia da Semana')
 
-add_paragraph_formatted(doc, '[Gráfico: Taxa de Absentismo por Dia da Semana]', italic=True)
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 4. ANÁLISE DE PADRÕES DE AUSÊNCIA
 # ============================================================================
-add_heading_custom(doc, '4. ANÁLISE DE PADRÕES DE AUSÊNCIA', level=1)
-doc.add_paragraph()
+def _padroes_ausencia(doc, m):
+    sp = m['spells']
+    add_heading_custom(doc, '4. ANÁLISE DE PADRÕES DE AUSÊNCIA', level=1)
+    doc.add_paragraph()
 
-add_heading_custom(doc, '4.1 Episódios de Ausência: Frequência vs. Duração', level=2)
+    add_heading_custom(doc, '4.1 Episódios de Ausência: Frequência vs. Duração', level=2)
 
-add_paragraph_formatted(doc,
-    'Foram identificados 7.600 episódios (spells) de ausência no período analisado. '
-    'A distribuição por duração revela padrões importantes:')
+    add_paragraph_formatted(doc,
+        f"Foram identificados {fmt_int(sp['total'])} episódios (spells) de ausência no período analisado. "
+        'A distribuição por duração revela padrões importantes:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-spells_dist = [
-    ['1 dia', '2.953 episódios', '38,9%'],
-    ['2-3 dias', '2.706 episódios', '35,6%'],
-    ['4-7 dias', '1.661 episódios', '21,9%'],
-    ['8-14 dias', '156 episódios', '2,1%'],
-    ['Mais de 14 dias', '124 episódios', '1,6%']
-]
-add_table_styled(doc, spells_dist, ['Duração', 'Volume', '% do Total'])
+    spells_dist = [
+        [faixa.replace('>14 dias', 'Mais de 14 dias'), f'{fmt_int(n)} episódios', fmt_pct(pct)]
+        for faixa, n, pct in sp['distribuicao']
+    ]
+    add_table_styled(doc, spells_dist, ['Duração', 'Volume', '% do Total'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Este padrão é particularmente relevante: 74,5% dos episódios são de curta duração '
-    '(até 3 dias), o que sugere que o problema principal não é a severidade médica, '
-    'mas sim a frequência de ausências pontuais.')
+    add_paragraph_formatted(doc,
+        f"Este padrão é particularmente relevante: {fmt_pct(sp['short_term_pct'])} dos episódios são de curta duração "
+        f"(até {sp['limite_short_term']} dias), o que sugere que o problema principal não é a severidade médica, "
+        'mas sim a frequência de ausências pontuais.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc, '[Gráfico: Distribuição de Episódios por Duração]', italic=True)
+    add_figura(doc, m, 'duracao_spells', 'Distribuição de Episódios por Duração')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '4.2 Diferença de Impacto Operacional', level=2)
+    add_heading_custom(doc, '4.2 Diferença de Impacto Operacional', level=2)
 
-add_paragraph_formatted(doc,
-    'Embora os episódios curtos sejam maioria em número, a análise de impacto '
-    'total (dias perdidos) revela um equilíbrio:')
+    add_paragraph_formatted(doc,
+        'Embora os episódios curtos sejam maioria em número, a análise de impacto '
+        'total (dias perdidos) revela um equilíbrio:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-impact = [
-    ['Episódios Short-term (≤3 dias)', '5.659 episódios', '9.400 dias perdidos'],
-    ['Episódios Long-term (>14 dias)', '124 episódios', '4.850 dias perdidos']
-]
-add_table_styled(doc, impact, ['Categoria', 'Número', 'Dias Perdidos'])
+    impact = [
+        [f"Episódios Short-term (≤{sp['limite_short_term']} dias)", f"{fmt_int(sp['short_term_num'])} episódios", f"{fmt_int(sp['short_term_dias'])} dias perdidos"],
+        [f"Episódios Long-term (>{sp['limite_long_term']} dias)", f"{fmt_int(sp['long_term_num'])} episódios", f"{fmt_int(sp['long_term_dias'])} dias perdidos"]
+    ]
+    add_table_styled(doc, impact, ['Categoria', 'Número', 'Dias Perdidos'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Conclusão: Apesar de representarem apenas 1,6% dos episódios, as ausências longas '
-    '(superiores a 14 dias) consomem cerca de 20% do total de dias perdidos. '
-    'Estes casos, tipicamente associados a doenças graves ou recuperações prolongadas, '
-    'requerem abordagem diferenciada, com foco em acompanhamento de saúde ocupacional.')
+    add_paragraph_formatted(doc,
+        f"Conclusão: Apesar de representarem apenas {fmt_pct(sp['long_term_pct'])} dos episódios, as ausências longas "
+        f"(superiores a {sp['limite_long_term']} dias) consomem {fmt_pct(sp['long_term_pct_dias'], 0)} do total de dias perdidos. "
+        'Estes casos, tipicamente associados a doenças graves ou recuperações prolongadas, '
+        'requerem abordagem diferenciada, com foco em acompanhamento de saúde ocupacional.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '4.3 Sazonalidade e Padrões Temporais', level=2)
+    add_heading_custom(doc, '4.3 Sazonalidade e Padrões Temporais', level=2)
 
-add_paragraph_formatted(doc,
-    'A análise temporal revela padrões sazonais consistentes:')
+    add_paragraph_formatted(doc,
+        'A análise temporal revela padrões sazonais consistentes:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-p = doc.add_paragraph()
-run = p.add_run('Padrão de início de mês: ')
-run.bold = True
-run = p.add_run('Taxa de início de episódios nos primeiros 3 dias do mês é 15% superior à média, '
-                'possivelmente relacionado com ciclos de pagamento e gestão de finanças pessoais.')
+    p = doc.add_paragraph()
+    run = p.add_run('Padrão de início de mês: ')
+    run.bold = True
+    run = p.add_run(f"Taxa de início de episódios nos primeiros 3 dias do mês é {fmt_pct(abs(sp['acrescimo_inicio_mes']), 0)} "
+                    f"{'superior' if sp['acrescimo_inicio_mes'] > 0 else 'inferior'} à média dos restantes períodos do mês.")
 
-p = doc.add_paragraph()
-run = p.add_run('Padrão de fim de mês: ')
-run.bold = True
-run = p.add_run('Taxa de início nos últimos dias do mês (28-31) é 12% superior à média.')
+    p = doc.add_paragraph()
+    run = p.add_run('Padrão de fim de mês: ')
+    run.bold = True
+    run = p.add_run(f"Taxa de início nos últimos dias do mês (28-31) é {fmt_pct(abs(sp['acrescimo_fim_mes']), 0)} "
+                    f"{'superior' if sp['acrescimo_fim_mes'] > 0 else 'inferior'} à média.")
 
-p = doc.add_paragraph()
-run = p.add_run('Segunda-feira: ')
-run.bold = True
-run = p.add_run('22% dos episódios short-term iniciam à segunda-feira (esperado: 20% numa '
-                'distribuição uniforme).')
+    p = doc.add_paragraph()
+    run = p.add_run('Segunda-feira: ')
+    run.bold = True
+    run = p.add_run(f"{fmt_pct(sp['pct_short_term_segunda'], 0)} dos episódios short-term iniciam à segunda-feira (esperado: 20% numa "
+                    'distribuição uniforme).')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc, '[Gráfico: Taxa de Início de Episódios por Período do Mês]', italic=True)
+    add_figura(doc, m, 'periodo_mes', 'Taxa de Início de Episódios por Período do Mês')
+
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 5. IDENTIFICAÇÃO DE RISCOS OPERACIONAIS
 # ============================================================================
-add_heading_custom(doc, '5. IDENTIFICAÇÃO DE RISCOS OPERACIONAIS', level=1)
-doc.add_paragraph()
+def _riscos_operacionais(doc, m):
+    b, seg = m['bradford'], m['segmentos']
+    faixas = faixas_bradford(b['limites'])
+    add_heading_custom(doc, '5. IDENTIFICAÇÃO DE RISCOS OPERACIONAIS', level=1)
+    doc.add_paragraph()
 
-add_heading_custom(doc, '5.1 Bradford Factor: Deteção de Padrões Disruptivos', level=2)
+    add_heading_custom(doc, '5.1 Bradford Factor: Deteção de Padrões Disruptivos', level=2)
 
-add_paragraph_formatted(doc,
-    'O Bradford Factor é uma métrica internacional utilizada para identificar ausências '
-    'de alta disrupção operacional. A fórmula penaliza a frequência de episódios: '
-    'um colaborador com 10 episódios de 1 dia (Bradford = 1.000) é considerado 100 vezes '
-    'mais disruptivo que um colaborador com 1 episódio de 10 dias (Bradford = 10).')
+    add_paragraph_formatted(doc,
+        'O Bradford Factor é uma métrica internacional utilizada para identificar ausências '
+        'de alta disrupção operacional. A fórmula penaliza a frequência de episódios: '
+        'um colaborador com 10 episódios de 1 dia (Bradford = 1.000) é considerado 100 vezes '
+        'mais disruptivo que um colaborador com 1 episódio de 10 dias (Bradford = 10).')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'A análise foi aplicada exclusivamente a colaboradores ativos em 2025, '
-    'considerando apenas episódios short-term (até 3 dias), gerando o "Bradford Disruptivo":')
+    add_paragraph_formatted(doc,
+        f"A análise foi aplicada exclusivamente a colaboradores ativos em {m['ano_analise']}, "
+        f"considerando apenas episódios short-term (até {m['spells']['limite_short_term']} dias), gerando o \"Bradford Disruptivo\":")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-bradford = [
-    ['Aceitável (< 50)', '383 colaboradores', '77,7%'],
-    ['Monitorizar (50-100)', '41 colaboradores', '8,3%'],
-    ['Atenção (100-200)', '27 colaboradores', '5,5%'],
-    ['Alto Risco (200-400)', '19 colaboradores', '3,9%'],
-    ['Risco Severo (400-600)', '10 colaboradores', '2,0%'],
-    ['Risco Crítico (> 600)', '13 colaboradores', '2,6%']
-]
-add_table_styled(doc, bradford, ['Nível de Risco', 'Volume', '% do Total'])
+    bradford = [
+        [f'{nivel} ({faixa})', f'{fmt_int(n)} colaboradores', fmt_pct(pct)]
+        for (nivel, n, pct), faixa in zip(b['niveis'], faixas)
+    ]
+    add_table_styled(doc, bradford, ['Nível de Risco', 'Volume', '% do Total'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Análise: 493 colaboradores ativos (41,6% da base ativa em 2025) apresentam episódios '
-    'short-term recorrentes. Destes, 69 colaboradores (14%) encontram-se acima do limiar '
-    'de 100 pontos, indicando necessidade de intervenção. Os 42 colaboradores em risco '
-    'alto/severo/crítico (8,5%) devem ser priorizados para ação imediata.')
+    add_paragraph_formatted(doc,
+        f"Análise: {fmt_int(b['num_colaboradores'])} colaboradores ativos ({fmt_pct(b['pct_base_ativa'])} da base ativa em {m['ano_analise']}) apresentam episódios "
+        f"short-term recorrentes. Destes, {fmt_int(b['acima_100_num'])} colaboradores ({fmt_pct(b['acima_100_pct'], 0)}) encontram-se acima do limiar "
+        f"de 100 pontos, indicando necessidade de intervenção. Os {fmt_int(b['acima_200_num'])} colaboradores em risco "
+        f"alto/severo/crítico ({fmt_pct(b['acima_200_pct'])}) devem ser priorizados para ação imediata.")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc, '[Gráfico: Distribuição por Nível de Risco Bradford]', italic=True)
+    add_figura(doc, m, 'bradford', 'Distribuição por Nível de Risco Bradford')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '5.2 Segmentação por Operação', level=2)
+    add_heading_custom(doc, '5.2 Segmentação por Operação', level=2)
 
-add_paragraph_formatted(doc,
-    'Algumas operações apresentam níveis de Bradford Disruptivo significativamente '
-    'superiores à média (entre operações com mínimo de 20 colaboradores):')
+    add_paragraph_formatted(doc,
+        'Algumas operações apresentam níveis de Bradford Disruptivo significativamente '
+        f"superiores à média (entre operações com mínimo de {seg['min_colaboradores']} colaboradores):")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-ops_bradford = [
-    ['UNITEL NET CASA 5G (Outsourcing)', '200,2', '45 colaboradores'],
-    ['Unitel Alpha', '97,2', '114 colaboradores'],
-    ['Unitel Money - Brigadistas (Outsourcing)', '96,9', '77 colaboradores'],
-    ['TAAG', '70,9', '44 colaboradores']
-]
-add_table_styled(doc, ops_bradford, ['Operação', 'Bradford Médio', 'N Colaboradores'])
+    ops_bradford = [[op, fmt_num(media), f'{n} colaboradores'] for op, media, n in seg['operacoes'][:4]]
+    add_table_styled(doc, ops_bradford, ['Operação', 'Bradford Médio', 'N Colaboradores'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Destaque: A operação UNITEL NET CASA 5G (Outsourcing) encontra-se em situação crítica, '
-    'com Bradford médio de 200,2, o dobro do limiar de atenção e o triplo da média geral.')
+    if seg['operacoes']:
+        op, media, _ = seg['operacoes'][0]
+        add_paragraph_formatted(doc,
+            f'Destaque: A operação {op} apresenta o Bradford médio mais elevado ({fmt_num(media)}), '
+            f"{fmt_num(media / 100)} vezes o limiar de atenção e {fmt_num(media / b['media'] if b['media'] else 0)} vezes "
+            f"a média geral ({fmt_num(b['media'])}).")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '5.3 Segmentação por Categoria Profissional', level=2)
+    add_heading_custom(doc, '5.3 Segmentação por Categoria Profissional', level=2)
 
-add_paragraph_formatted(doc,
-    'A análise por função revela disparidades significativas:')
+    add_paragraph_formatted(doc,
+        'A análise por função revela disparidades significativas:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-cats_bradford = [
-    ['Comercial', '144,8', '79 colaboradores'],
-    ['Brigadista', '93,6', '81 colaboradores'],
-    ['Assistente de Contact Center', '50,7', '321 colaboradores']
-]
-add_table_styled(doc, cats_bradford, ['Categoria', 'Bradford Médio', 'N Colaboradores'])
+    cats_bradford = [[cat, fmt_num(media), f'{n} colaboradores'] for cat, media, n in seg['categorias'][:3]]
+    add_table_styled(doc, cats_bradford, ['Categoria', 'Bradford Médio', 'N Colaboradores'])
+
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if seg['categorias'] and seg['categorias'][0][0] != seg['categoria_maior']:
+        cat, media, _ = seg['categorias'][0]
+        razao = media / seg['categoria_maior_bradford'] if seg['categoria_maior_bradford'] else 0
+        add_paragraph_formatted(doc,
+            f'Observação: A função de {cat} apresenta Bradford médio {fmt_num(razao)} vezes superior ao da '
+            f"categoria mais numerosa ({seg['categoria_maior']}). "
+            'Esta categoria merece atenção específica.')
+    elif seg['categorias']:
+        cat, media, _ = seg['categorias'][0]
+        add_paragraph_formatted(doc,
+            f'Observação: A função de {cat}, a mais numerosa, apresenta também o Bradford médio '
+            f'mais elevado ({fmt_num(media)}). Esta categoria merece atenção específica.')
 
-add_paragraph_formatted(doc,
-    'Observação: A função de Comercial apresenta Bradford médio 3 vezes superior à dos '
-    'Assistentes de Contact Center, apesar de representar um grupo menor. '
-    'Esta categoria merece atenção específica.')
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 6. ANÁLISE COMPORTAMENTAL
 # ============================================================================
-add_heading_custom(doc, '6. ANÁLISE COMPORTAMENTAL', level=1)
-doc.add_paragraph()
+def _analise_comportamental(doc, m):
+    pad = m['padroes']
+    add_heading_custom(doc, '6. ANÁLISE COMPORTAMENTAL', level=1)
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Para além da análise quantitativa, foram aplicadas técnicas de deteção de padrões '
-    'comportamentais suspeitos, com base em anomalias estatísticas.')
+    add_paragraph_formatted(doc,
+        'Para além da análise quantitativa, foram aplicadas técnicas de deteção de padrões '
+        'comportamentais suspeitos, com base em anomalias estatísticas.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '6.1 Padrão Segunda-Feira/Sexta-Feira', level=2)
+    add_heading_custom(doc, '6.1 Padrão Segunda-Feira/Sexta-Feira', level=2)
 
-add_paragraph_formatted(doc,
-    'Análise estatística identifica concentração anormal de episódios nas extremidades '
-    'da semana:')
+    add_paragraph_formatted(doc,
+        'Análise estatística identifica concentração anormal de episódios nas extremidades '
+        'da semana:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-p = doc.add_paragraph()
-run = p.add_run('Baseline esperado: ')
-run.bold = True
-run = p.add_run('20% dos episódios deveriam iniciar em cada dia útil (distribuição uniforme).')
+    p = doc.add_paragraph()
+    run = p.add_run('Baseline esperado: ')
+    run.bold = True
+    run = p.add_run('20% dos episódios deveriam iniciar em cada dia útil (distribuição uniforme).')
+
+    p = doc.add_paragraph()
+    run = p.add_run('Observado: ')
+    run.bold = True
+    run = p.add_run(f"{fmt_pct(m['spells']['pct_short_term_segunda'], 0)} dos episódios short-term iniciam à segunda-feira.")
 
-p = doc.add_paragraph()
-run = p.add_run('Observado: ')
-run.bold = True
-run = p.add_run('22% dos episódios short-term iniciam à segunda-feira.')
+    p = doc.add_paragraph()
+    run = p.add_run('Colaboradores flagged: ')
+    run.bold = True
+    run = p.add_run(f"Identificados {fmt_int(pad['colaboradores_seg_sex'])} colaboradores com mais de 50% dos episódios iniciando "
+                    'à segunda ou terminando à sexta (mínimo 5 episódios para significância estatística).')
 
-p = doc.add_paragraph()
-run = p.add_run('Colaboradores flagged: ')
-run.bold = True
-run = p.add_run('Identificados colaboradores com mais de 50% dos episódios iniciando '
-                'à segunda ou terminando à sexta (mínimo 5 episódios para significância estatística).')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'Este padrão pode indicar extensão não autorizada de fins de semana. '
+        'Recomenda-se análise individual dos casos flagged.')
 
-add_paragraph_formatted(doc,
-    'Este padrão pode indicar extensão não autorizada de fins de semana. '
-    'Recomenda-se análise individual dos casos flagged.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '6.2 Padrão de Ponte (Adjacente a Feriados)', level=2)
 
-add_heading_custom(doc, '6.2 Padrão de Ponte (Adjacente a Feriados)', level=2)
+    add_paragraph_formatted(doc,
+        f"A análise de {pad['num_feriados']} feriados nacionais no período revelou:")
 
-add_paragraph_formatted(doc,
-    'A análise de 23 feriados nacionais no período revelou:')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    p = doc.add_paragraph()
+    run = p.add_run(f"{fmt_pct(pad['pct_short_term_feriado'])} ")
+    run.bold = True
+    run = p.add_run('dos episódios short-term iniciam adjacentes a feriados (±1 dia).')
 
-p = doc.add_paragraph()
-run = p.add_run('14,7% ')
-run.bold = True
-run = p.add_run('dos episódios short-term iniciam adjacentes a feriados (±1 dia).')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if pad['colaboradores_ponte'] == 0:
+        add_paragraph_formatted(doc,
+            'Não foram identificados '
+            'colaboradores individuais com padrão consistente de "fazer ponte" (critério: >40% '
+            'dos episódios adjacentes a feriados).')
+    else:
+        add_paragraph_formatted(doc,
+            f"Foram identificados {fmt_int(pad['colaboradores_ponte'])} colaboradores com padrão consistente de "
+            '"fazer ponte" (critério: >40% dos episódios adjacentes a feriados), a analisar individualmente.')
 
-add_paragraph_formatted(doc,
-    'Esta taxa está ligeiramente acima do esperado, mas não foram identificados '
-    'colaboradores individuais com padrão consistente de "fazer ponte" (critério: >40% '
-    'dos episódios adjacentes a feriados).')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '6.3 Baixas Médicas de Curta Duração', level=2)
 
-add_heading_custom(doc, '6.3 Baixas Médicas de Curta Duração', level=2)
+    add_paragraph_formatted(doc,
+        f"Dos {fmt_int(pad['dias_ausencia_medica'])} dias de ausência médica registados, uma proporção substancial é de curta duração:")
 
-add_paragraph_formatted(doc,
-    'Das 16.102 ausências médicas registadas, uma proporção substancial é de curta duração:')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    p = doc.add_paragraph()
+    run = p.add_run(f"Baixas médicas ≤ {m['spells']['limite_short_term']} dias: ")
+    run.bold = True
+    run = p.add_run(f"{fmt_int(pad['medicas_short_num'])} episódios ({fmt_pct(pad['medicas_short_pct'])} dos episódios de ausência médica).")
 
-p = doc.add_paragraph()
-run = p.add_run('Baixas médicas ≤ 3 dias: ')
-run.bold = True
-run = p.add_run('10.580 episódios (65,7% das ausências médicas).')
+    p = doc.add_paragraph()
+    run = p.add_run('Concentração em segundas-feiras: ')
+    run.bold = True
+    run = p.add_run(f"{fmt_pct(pad['medicas_short_pct_segunda'])} das baixas médicas curtas iniciam à segunda.")
 
-p = doc.add_paragraph()
-run = p.add_run('Concentração em segundas-feiras: ')
-run.bold = True
-run = p.add_run('23,5% das baixas médicas curtas iniciam à segunda.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'Embora baixas médicas curtas sejam legítimas na maioria dos casos (gripe, '
+        'mal-estar pontual), a concentração ligeiramente acima do esperado em segundas-feiras '
+        'sugere que uma pequena fração pode representar utilização inadequada. '
+        f"Foram identificados {fmt_int(pad['colaboradores_medica'])} colaboradores com padrão recorrente (≥3 baixas médicas curtas, "
+        '>60% em segundas) para eventual acompanhamento.')
 
-add_paragraph_formatted(doc,
-    'Embora baixas médicas curtas sejam legítimas na maioria dos casos (gripe, '
-    'mal-estar pontual), a concentração ligeiramente acima do esperado em segundas-feiras '
-    'sugere que uma pequena fração pode representar utilização inadequada. '
-    'Foram identificados colaboradores com padrão recorrente (≥3 baixas médicas curtas, '
-    '>60% em segundas) para eventual acompanhamento.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '6.4 Síntese: Colaboradores com Múltiplos Flags', level=2)
 
-add_heading_custom(doc, '6.4 Síntese: Colaboradores com Múltiplos Flags', level=2)
+    add_paragraph_formatted(doc,
+        'A combinação de múltiplos indicadores comportamentais permite priorização:')
 
-add_paragraph_formatted(doc,
-    'A combinação de múltiplos indicadores comportamentais permite priorização:')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    interpretacao = [
+        ('Sem flags suspeitos', 'Sem indícios'),
+        ('1 flag', 'Atenção ligeira'),
+        ('2 flags', 'Alta suspeita - revisão recomendada'),
+        ('3 flags', 'Muito suspeito - investigação prioritária')
+    ]
+    flags = [
+        [nivel, f'{fmt_int(n)} colaboradores', texto]
+        for (nivel, texto), (_, n) in zip(interpretacao, pad['num_flags'])
+    ]
+    add_table_styled(doc, flags, ['Número de Flags', 'Volume', 'Interpretação'])
 
-flags = [
-    ['Sem flags suspeitos', 'Maioria dos colaboradores'],
-    ['1 flag', 'Atenção ligeira'],
-    ['2 flags', 'Alta suspeita - revisão recomendada'],
-    ['3 flags', 'Muito suspeito - investigação prioritária']
-]
-add_table_styled(doc, flags, ['Número de Flags', 'Interpretação'])
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'Nota metodológica: Estes indicadores não constituem prova de má conduta, '
+        'mas sim ferramentas estatísticas de triagem. Qualquer ação individual deve ser '
+        'precedida de análise contextual e conversa com o colaborador e sua chefia direta.')
 
-add_paragraph_formatted(doc,
-    'Nota metodológica: Estes indicadores não constituem prova de má conduta, '
-    'mas sim ferramentas estatísticas de triagem. Qualquer ação individual deve ser '
-    'precedida de análise contextual e conversa com o colaborador e sua chefia direta.')
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 7. ANÁLISE TEMPORAL E TENDÊNCIAS
 # ============================================================================
-add_heading_custom(doc, '7. ANÁLISE TEMPORAL E TENDÊNCIAS', level=1)
-doc.add_paragraph()
+def _analise_temporal(doc, m):
+    c = m['comparacao']
+    primeiro, ultimo = c['anos'][0], c['anos'][-1]
+    meses = f"{MESES_PT[0].lower()} a {MESES_PT[c['mes_max'] - 1].lower()}"
+    add_heading_custom(doc, '7. ANÁLISE TEMPORAL E TENDÊNCIAS', level=1)
+    doc.add_paragraph()
 
-add_heading_custom(doc, '7.1 Comparação Ano-a-Ano: 2024 vs. 2025', level=2)
+    add_heading_custom(doc, f"7.1 Comparação Ano-a-Ano: {primeiro['ano']} vs. {ultimo['ano']}", level=2)
 
-add_paragraph_formatted(doc,
-    'Para garantir comparabilidade, foram analisados apenas os primeiros seis meses '
-    'de cada ano (janeiro a junho):')
+    add_paragraph_formatted(doc,
+        f"Para garantir comparabilidade, foram analisados apenas os primeiros {c['mes_max']} meses "
+        f'de cada ano ({meses}):')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-comparison = [
-    ['2024 (Jan-Jun)', '3,73%', '8.934 dias', '2.610 episódios'],
-    ['2025 (Jan-Jun)', '2,37%', '6.026 dias', '2.185 episódios'],
-    ['Variação', '-36,5%', '-32,5%', '-16,3%']
-]
-add_table_styled(doc, comparison, ['Período', 'Taxa Absentismo', 'Dias Perdidos', 'N Episódios'])
+    comparison = [
+        [periodo_comparacao(a['ano'], c['mes_max']), fmt_pct(a['taxa_absentismo'], 2),
+         f"{fmt_int(a['faltas'])} dias", f"{fmt_int(a['num_spells'])} episódios"]
+        for a in c['anos']
+    ]
+    comparison.append(['Variação', fmt_var(c['variacao_taxa']), fmt_var(c['variacao_faltas']), fmt_var(c['variacao_spells'])])
+    add_table_styled(doc, comparison, ['Período', 'Taxa Absentismo', 'Dias Perdidos', 'N Episódios'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Conclusão principal: Regista-se uma melhoria substancial e consistente em todos '
-    'os indicadores de absentismo entre 2024 e 2025. A redução de 36,5% na taxa de '
-    'absentismo é particularmente significativa e sugere que medidas implementadas '
-    'ao longo de 2024 (se aplicável) estão a produzir resultados positivos.')
+    if c['variacao_taxa'] < 0:
+        add_paragraph_formatted(doc,
+            'Conclusão principal: Regista-se uma melhoria na taxa de absentismo '
+            f"entre {primeiro['ano']} e {ultimo['ano']}. A redução de {fmt_pct(abs(c['variacao_taxa']))} na taxa de "
+            'absentismo sugere que medidas implementadas '
+            f"ao longo de {primeiro['ano']} (se aplicável) estão a produzir resultados positivos.")
+    else:
+        add_paragraph_formatted(doc,
+            'Conclusão principal: Regista-se um agravamento da taxa de absentismo '
+            f"entre {primeiro['ano']} e {ultimo['ano']} ({fmt_var(c['variacao_taxa'])}), "
+            'que justifica a análise das causas nas operações com maior contribuição.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc, '[Gráfico: Evolução Mensal da Taxa de Absentismo - 2024 vs 2025]', italic=True)
+    add_figura(doc, m, 'tendencia_mensal', f"Evolução Mensal da Taxa de Absentismo - {primeiro['ano']} vs {ultimo['ano']}")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '7.2 Tendência Intra-Ano', level=2)
+    add_heading_custom(doc, '7.2 Tendência Intra-Ano', level=2)
 
-add_paragraph_formatted(doc,
-    'A análise mês a mês revela consistência na melhoria:')
+    consistente = c['num_meses'] > 0 and c['meses_inferiores'] == c['num_meses']
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'A análise mês a mês revela consistência na melhoria:' if consistente else
+        'A análise mês a mês revela o seguinte:')
 
-p = doc.add_paragraph()
-run = p.add_run('Todos os meses de 2025 ')
-run = p.add_run('apresentam taxas inferiores aos meses equivalentes de 2024.')
-run.font.size = Pt(11)
+    doc.add_paragraph()
 
-p = doc.add_paragraph()
-run = p.add_run('Maior redução observada: ')
-run.bold = True
-run = p.add_run('Março (de 4,1% em 2024 para 2,3% em 2025).')
-run.font.size = Pt(11)
+    p = doc.add_paragraph()
+    run = p.add_run(f"Todos os meses de {ultimo['ano']} " if consistente else
+                    f"{c['meses_inferiores']} de {c['num_meses']} meses de {ultimo['ano']} ")
+    run = p.add_run(f"apresentam taxas inferiores aos meses equivalentes de {primeiro['ano']}.")
+    run.font.size = Pt(11)
 
-doc.add_paragraph()
+    if c['maior_reducao_mes'] is not None:
+        mes, taxa_antes, taxa_depois = c['maior_reducao_mes']
+        p = doc.add_paragraph()
+        run = p.add_run('Maior redução observada: ')
+        run.bold = True
+        run = p.add_run(f"{MESES_PT[mes - 1]} (de {fmt_pct(taxa_antes)} em {primeiro['ano']} para {fmt_pct(taxa_depois)} em {ultimo['ano']}).")
+        run.font.size = Pt(11)
 
-add_paragraph_formatted(doc,
-    'Esta consistência reforça a hipótese de que a melhoria não resulta de fatores '
-    'sazonais ou pontuais, mas sim de mudança estrutural.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if consistente:
+        add_paragraph_formatted(doc,
+            'Esta consistência reforça a hipótese de que a melhoria não resulta de fatores '
+            'sazonais ou pontuais, mas sim de mudança estrutural.')
 
-add_heading_custom(doc, '7.3 Duração de Episódios: Evolução', level=2)
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Para além da frequência, também a duração média dos episódios diminuiu:')
+    add_heading_custom(doc, '7.3 Duração de Episódios: Evolução', level=2)
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'Para além da frequência, também a duração média dos episódios '
+        f"{'diminuiu' if c['variacao_duracao'] < 0 else 'aumentou'}:")
 
-duration = [
-    ['2024 (Jan-Jun)', '3,7 dias'],
-    ['2025 (Jan-Jun)', '2,7 dias'],
-    ['Redução', '27%']
-]
-add_table_styled(doc, duration, ['Período', 'Duração Média'])
+    doc.add_paragraph()
+
+    duration = [
+        [periodo_comparacao(a['ano'], c['mes_max']), f"{fmt_num(a['duracao_media'])} dias"]
+        for a in c['anos']
+    ]
+    duration.append(['Variação', fmt_var(c['variacao_duracao'], 0)])
+    add_table_styled(doc, duration, ['Período', 'Duração Média'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc,
-    'Interpretação: Os colaboradores não apenas faltam menos vezes, mas quando faltam, '
-    'os episódios são mais curtos. Esta dupla melhoria (frequência + duração) é indicador '
-    'robusto de progresso.')
+    if c['variacao_spells'] < 0 and c['variacao_duracao'] < 0:
+        add_paragraph_formatted(doc,
+            'Interpretação: Os colaboradores não apenas faltam menos vezes, mas quando faltam, '
+            'os episódios são mais curtos. Esta dupla melhoria (frequência + duração) é indicador '
+            'robusto de progresso.')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '7.4 Análise de Controlo Estatístico (U-Chart)', level=2)
+    add_heading_custom(doc, '7.4 Análise de Controlo Estatístico (U-Chart)', level=2)
 
-add_paragraph_formatted(doc,
-    'Para monitorizar estabilidade do processo, foi aplicado U-Chart (control chart para '
-    'dados de contagem) às semanas de 2025:')
+    add_paragraph_formatted(doc,
+        'Para monitorizar estabilidade do processo, foi aplicado U-Chart (control chart para '
+        f"dados de contagem) às semanas de {m['ano_analise']}:")
 
-doc.add_paragraph()
+    doc.add_paragraph()
+
+    p = doc.add_paragraph()
+    run = p.add_run('Semanas fora de controlo estatístico: ')
+    run.bold = True
+    run = p.add_run('Identificadas semanas com variação anormal (acima do limite superior '
+                    'ou abaixo do limite inferior), requerendo investigação de causas especiais.')
 
-p = doc.add_paragraph()
-run = p.add_run('Semanas fora de controlo estatístico: ')
-run.bold = True
-run = p.add_run('Identificadas semanas com variação anormal (acima do limite superior '
-                'ou abaixo do limite inferior), requerendo investigação de causas especiais.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_paragraph_formatted(doc,
+        'Recomendação: Quando uma semana excede os limites de controlo, deve ser realizada '
+        'análise de root cause (exemplo: surto de gripe, evento específico na operação, '
+        'problema de transporte coletivo).')
 
-add_paragraph_formatted(doc,
-    'Recomendação: Quando uma semana excede os limites de controlo, deve ser realizada '
-    'análise de root cause (exemplo: surto de gripe, evento específico na operação, '
-    'problema de transporte coletivo).')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_figura(doc, m, 'u_chart', f"U-Chart - Taxa Semanal de Faltas em {m['ano_analise']}")
 
-add_paragraph_formatted(doc, '[Gráfico: U-Chart - Taxa Semanal de Faltas em 2025]', italic=True)
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # 8. SEGMENTAÇÃO E PRIORIZAÇÃO
 # ============================================================================
-add_heading_custom(doc, '8. SEGMENTAÇÃO E PRIORIZAÇÃO', level=1)
-doc.add_paragraph()
-
-add_heading_custom(doc, '8.1 Princípio de Pareto: Concentração do Problema', level=2)
-
-add_paragraph_formatted(doc,
-    'A análise de contribuição revela concentração significativa do absentismo em '
-    'poucos segmentos:')
-
-doc.add_paragraph()
-
-pareto_ops = [
-    ['Top 5 operações', '76% do absentismo total'],
-    ['Top 10 operações', '88% do absentismo total'],
-    ['Top 15 operações', '92% do absentismo total']
-]
-add_table_styled(doc, pareto_ops, ['Segmento', 'Contribuição Acumulada'])
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Implicação estratégica: Focar esforços de melhoria em 15 operações permite '
-    'impactar 92% do problema. Esta concentração facilita intervenções dirigidas '
-    'e medição de eficácia.')
-
-doc.add_paragraph()
-
-add_heading_custom(doc, '8.2 Matriz Taxa vs. Contribuição', level=2)
-
-add_paragraph_formatted(doc,
-    'Para priorização eficaz, é útil distinguir duas dimensões:')
-
-doc.add_paragraph()
-
-p = doc.add_paragraph()
-run = p.add_run('Taxa de absentismo: ')
-run.bold = True
-run = p.add_run('Percentagem de ausências no segmento (indicador de severidade do problema).')
-run.font.size = Pt(11)
-
-p = doc.add_paragraph()
-run = p.add_run('Contribuição absoluta: ')
-run.bold = True
-run = p.add_run('Número de dias perdidos (indicador de impacto no negócio).')
-run.font.size = Pt(11)
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Operações prioritárias são aquelas que combinam taxa elevada E contribuição elevada:')
+def _segmentacao(doc, m):
+    ops = m['operacoes']
+    top_pareto, pct_pareto = ops['pareto'][-1]
+    add_heading_custom(doc, '8. SEGMENTAÇÃO E PRIORIZAÇÃO', level=1)
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '8.1 Princípio de Pareto: Concentração do Problema', level=2)
 
-priority_ops = [
-    ['Unitel Alpha', '4,81%', '8.716 dias (35,6% do total)'],
-    ['Unitel Money - Brigadistas', '4,59%', '1.706 dias (7,0%)'],
-    ['ZAP Fibra - BO/SWAT', '10,09%', '307 dias (1,3%)']
-]
-add_table_styled(doc, priority_ops, ['Operação', 'Taxa', 'Contribuição'])
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Destaque: Unitel Alpha combina taxa acima da média com volume absoluto dominante, '
-    'representando sozinha mais de um terço do absentismo total da empresa.')
+    add_paragraph_formatted(doc,
+        'A análise de contribuição revela concentração significativa do absentismo em '
+        'poucos segmentos:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_paragraph_formatted(doc, '[Gráfico: Matriz Taxa vs Contribuição - Operações]', italic=True)
+    pareto_ops = [[f'Top {n} operações', f'{fmt_pct(pct, 0)} do absentismo total'] for n, pct in ops['pareto']]
+    add_table_styled(doc, pareto_ops, ['Segmento', 'Contribuição Acumulada'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '8.3 Clustering: Perfis de Comportamento', level=2)
+    add_paragraph_formatted(doc,
+        f'Implicação estratégica: Focar esforços de melhoria em {top_pareto} operações permite '
+        f'impactar {fmt_pct(pct_pareto, 0)} do problema. Esta concentração facilita intervenções dirigidas '
+        'e medição de eficácia.')
 
-add_paragraph_formatted(doc,
-    'Aplicando técnicas de clustering (K-Means) aos colaboradores com episódios short-term, '
-    'foram identificados 3 perfis distintos:')
-
-doc.add_paragraph()
-
-clusters = [
-    ['Cluster 1: Baixo Risco', '~350 colaboradores', 'Bradford < 50, poucos episódios'],
-    ['Cluster 2: Risco Moderado', '~70 colaboradores', 'Bradford 50-150, frequência média'],
-    ['Cluster 3: Alto Risco', '~70 colaboradores', 'Bradford > 150, padrão disruptivo']
-]
-add_table_styled(doc, clusters, ['Perfil', 'Volume', 'Características'])
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '8.2 Matriz Taxa vs. Contribuição', level=2)
 
-add_paragraph_formatted(doc,
-    'Esta segmentação permite estratégias diferenciadas: o Cluster 3 requer intervenção '
-    'individual e acompanhamento próximo; o Cluster 2 beneficia de ações de sensibilização; '
-    'o Cluster 1 necessita apenas monitorização de rotina.')
+    add_paragraph_formatted(doc,
+        'Para priorização eficaz, é útil distinguir duas dimensões:')
 
-doc.add_paragraph()
-
-add_heading_custom(doc, '8.4 Análise por Senioridade (Cohorts)', level=2)
-
-add_paragraph_formatted(doc,
-    'A segmentação por tempo de casa revela diferenças importantes:')
-
-doc.add_paragraph()
-
-cohorts = [
-    ['< 1 ano', '2,95%'],
-    ['1-2 anos', '2,48%'],
-    ['2-3 anos', '2,31%'],
-    ['3-5 anos', '2,18%'],
-    ['> 5 anos', '2,85%']
-]
-add_table_styled(doc, cohorts, ['Senioridade', 'Taxa de Absentismo'])
+    doc.add_paragraph()
 
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Observações: Colaboradores muito novos (<1 ano) e muito antigos (>5 anos) apresentam '
-    'taxas ligeiramente superiores. Para novos colaboradores, pode relacionar-se com período '
-    'de adaptação; para veteranos, possível burnout ou questões de saúde acumuladas. '
-    'A faixa 3-5 anos apresenta o melhor desempenho.')
-
-doc.add_page_break()
-
-# ============================================================================
-# 9. CONCLUSÕES E RECOMENDAÇÕES
-# ============================================================================
-add_heading_custom(doc, '9. CONCLUSÕES E RECOMENDAÇÕES', level=1)
-doc.add_paragraph()
-
-add_heading_custom(doc, '9.1 Síntese de Conclusões', level=2)
-
-conclusions_final = [
-    ('Tendência positiva:', 'A taxa de absentismo reduziu 36,5% entre 2024 e 2025, sinalizando eficácia de eventuais medidas já implementadas.'),
-    ('Problema concentrado:', '15 operações representam 92% do absentismo, permitindo intervenções focalizadas com alto retorno.'),
-    ('Padrão predominante:', '74,5% dos episódios são short-term (≤3 dias), indicando que o desafio principal é comportamental, não médico.'),
-    ('População em risco identificada:', '493 colaboradores com episódios recorrentes, dos quais 42 em risco crítico.'),
-    ('Variação semanal:', 'Fim de semana apresenta taxa 50-70% superior, sugerindo desafios específicos de gestão de turnos.'),
-    ('Oportunidade de melhoria:', 'Apesar da tendência positiva, subsistem segmentos e colaboradores com padrões disruptivos corrigíveis.')
-]
-
-for i, (label, text) in enumerate(conclusions_final, 1):
     p = doc.add_paragraph()
-    run = p.add_run(f'{i}. {label} ')
+    run = p.add_run('Taxa de absentismo: ')
     run.bold = True
+    run = p.add_run('Percentagem de ausências no segmento (indicador de severidade do problema).')
     run.font.size = Pt(11)
-    run = p.add_run(text)
-    run.font.size = Pt(11)
-
-doc.add_paragraph()
 
-add_heading_custom(doc, '9.2 Recomendações Estratégicas', level=2)
-
-add_paragraph_formatted(doc,
-    'Com base na análise conduzida, recomendam-se as seguintes linhas de ação:')
-
-doc.add_paragraph()
-
-add_heading_custom(doc, 'A. Intervenções Prioritárias (Curto Prazo - 0-3 meses)', level=3)
-
-short_term = [
-    'Revisão individual dos 42 colaboradores em risco crítico (Bradford > 200), com conversas estruturadas envolvendo RH e chefia direta.',
-    'Análise de root cause na operação UNITEL NET CASA 5G (Outsourcing), cuja taxa é 2x superior à média.',
-    'Implementação de política clara sobre baixas médicas short-term, incluindo requisitos de certificação médica a partir do 2º episódio num período de 30 dias.',
-    'Comunicação de política de absentismo atualizada, enfatizando consequências progressivas para padrões recorrentes sem justificação adequada.'
-]
-
-for i, rec in enumerate(short_term, 1):
     p = doc.add_paragraph()
-    run = p.add_run(f'{i}. ')
+    run = p.add_run('Contribuição absoluta: ')
     run.bold = True
+    run = p.add_run('Número de dias perdidos (indicador de impacto no negócio).')
     run.font.size = Pt(11)
-    run = p.add_run(rec)
-    run.font.size = Pt(11)
-    p.paragraph_format.left_indent = Inches(0.25)
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, 'B. Melhorias Estruturais (Médio Prazo - 3-6 meses)', level=3)
+    add_paragraph_formatted(doc,
+        'Operações prioritárias são aquelas que combinam taxa elevada E contribuição elevada:')
 
-medium_term = [
-    'Implementação de dashboard de monitorização em tempo real (mensal) do Bradford Factor por operação e colaborador.',
-    'Programa de reconhecimento para colaboradores com zero ausências ou melhoria significativa face a períodos anteriores.',
-    'Revisão da gestão de turnos de fim de semana, incluindo análise de incentivos, rotatividade e condições específicas.',
-    'Formação para chefias de equipa em gestão de absentismo, incluindo conversas difíceis e identificação de padrões.',
-    'Análise de causas raiz nas operações Top 5 por contribuição, com planos de ação específicos para cada uma.'
-]
+    doc.add_paragraph()
 
-for i, rec in enumerate(medium_term, 1):
-    p = doc.add_paragraph()
-    run = p.add_run(f'{i}. ')
-    run.bold = True
-    run.font.size = Pt(11)
-    run = p.add_run(rec)
-    run.font.size = Pt(11)
-    p.paragraph_format.left_indent = Inches(0.25)
+    priority_ops = [
+        [op, fmt_pct(taxa, 2), f'{fmt_int(dias)} dias ({fmt_pct(contrib)} do total)']
+        for op, taxa, dias, contrib in ops['prioritarias']
+    ]
+    add_table_styled(doc, priority_ops, ['Operação', 'Taxa', 'Contribuição'])
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, 'C. Iniciativas de Longo Prazo (6-12 meses)', level=3)
+    if ops['prioritarias']:
+        op, _, _, contrib = ops['prioritarias'][0]
+        add_paragraph_formatted(doc,
+            f'Destaque: {op} combina taxa acima da média com o maior volume absoluto, '
+            f'representando sozinha {fmt_pct(contrib)} do absentismo total da empresa.')
 
-long_term = [
-    'Programa de bem-estar e saúde ocupacional, com foco preventivo em doenças recorrentes.',
-    'Análise de correlação entre absentismo e outras métricas (performance, satisfação, turnover) para identificar padrões preditivos.',
-    'Implementação de sistema de alerta automático para chefias quando colaborador atinge threshold de Bradford.',
-    'Revisão de processos de recrutamento e onboarding para reduzir absentismo em colaboradores <1 ano.',
-    'Benchmark externo com outras operações de Call Center para validar metas de taxa de absentismo.'
-]
+    doc.add_paragraph()
 
-for i, rec in enumerate(long_term, 1):
-    p = doc.add_paragraph()
-    run = p.add_run(f'{i}. ')
-    run.bold = True
-    run.font.size = Pt(11)
-    run = p.add_run(rec)
-    run.font.size = Pt(11)
-    p.paragraph_format.left_indent = Inches(0.25)
+    add_figura(doc, m, 'matriz_operacoes', 'Matriz Taxa vs Contribuição - Operações')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-add_heading_custom(doc, '9.3 Métricas de Acompanhamento', level=2)
+    add_heading_custom(doc, '8.3 Clustering: Perfis de Comportamento', level=2)
 
-add_paragraph_formatted(doc,
-    'Para medir o progresso das iniciativas, recomenda-se monitorização trimestral dos seguintes indicadores:')
+    add_paragraph_formatted(doc,
+        'Aplicando técnicas de clustering (K-Means) aos colaboradores com episódios short-term, '
+        f"foram identificados {len(m['clusters'])} perfis distintos:")
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-metrics = [
-    'Taxa de absentismo global',
-    'Número de colaboradores com Bradford > 200',
-    'Taxa de absentismo nas Top 5 operações',
-    'Percentagem de colaboradores com zero ausências',
-    'Número de semanas fora de controlo estatístico (U-Chart)',
-    'Taxa de absentismo em fins de semana vs. dias úteis'
-]
+    clusters = [
+        [nome, f'{fmt_int(n)} colaboradores', f'Bradford médio {fmt_num(media)}, {fmt_num(spells)} episódios em média']
+        for nome, n, media, spells in m['clusters']
+    ]
+    add_table_styled(doc, clusters, ['Perfil', 'Volume', 'Características'])
 
-for metric in metrics:
-    p = doc.add_paragraph(metric, style='List Bullet')
-    p.paragraph_format.left_indent = Inches(0.25)
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if add_figura(doc, m, 'cotovelo', 'Inércia e Silhouette por Número de Clusters', marcador=False):
+        doc.add_paragraph()
 
-add_heading_custom(doc, '9.4 Considerações Finais', level=2)
+    add_paragraph_formatted(doc,
+        'Esta segmentação permite estratégias diferenciadas: o perfil de maior risco requer intervenção '
+        'individual e acompanhamento próximo; os perfis intermédios beneficiam de ações de sensibilização; '
+        'o perfil de menor risco necessita apenas monitorização de rotina.')
 
-add_paragraph_formatted(doc,
-    'A análise demonstra que o absentismo no Call Center, embora dentro de parâmetros '
-    'aceitáveis e com tendência positiva, apresenta oportunidades claras de melhoria. '
-    'A concentração do problema em segmentos específicos e a natureza predominantemente '
-    'comportamental (episódios curtos e frequentes) sugerem que intervenções dirigidas '
-    'podem produzir resultados significativos.')
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    add_heading_custom(doc, '8.4 Análise por Senioridade (Cohorts)', level=2)
 
-add_paragraph_formatted(doc,
-    'Recomenda-se abordagem equilibrada, combinando:')
+    add_paragraph_formatted(doc,
+        'A segmentação por tempo de casa revela diferenças importantes:')
 
-doc.add_paragraph()
+    doc.add_paragraph()
 
-approaches = [
-    'Ações corretivas para casos críticos identificados',
-    'Melhorias estruturais em processos e políticas',
-    'Iniciativas preventivas de bem-estar e engagement',
-    'Monitorização contínua com dashboards e alertas automáticos'
-]
+    cohorts = [[cohort.replace('<', '< ').replace('>', '> '), fmt_pct(taxa, 2)] for cohort, taxa in m['cohorts']]
+    add_table_styled(doc, cohorts, ['Senioridade', 'Taxa de Absentismo'])
 
-for approach in approaches:
-    p = doc.add_paragraph(approach, style='List Bullet')
-    p.paragraph_format.left_indent = Inches(0.25)
+    doc.add_paragraph()
 
-doc.add_paragraph()
+    if m['cohorts']:
+        melhor = min(m['cohorts'], key=lambda x: x[1])
+        pior = max(m['cohorts'], key=lambda x: x[1])
+        add_paragraph_formatted(doc,
+            f'Observações: A faixa {pior[0]} apresenta a taxa mais elevada ({fmt_pct(pior[1], 2)}) '
+            f'e a faixa {melhor[0]} apresenta o melhor desempenho ({fmt_pct(melhor[1], 2)}).')
 
-add_paragraph_formatted(doc,
-    'A tendência de melhoria observada entre 2024 e 2025 é encorajadora e deve ser '
-    'preservada e acelerada através das recomendações apresentadas.')
+    doc.add_page_break()
+
+
+# ============================================================================
+# 9. CONCLUSÕES E RECOMENDAÇÕES
+# ============================================================================
+def _conclusoes(doc, m):
+    c, b, d = m['comparacao'], m['bradford'], m['dia_semana']
+    primeiro, ultimo = c['anos'][0], c['anos'][-1]
+    top_pareto, pct_pareto = m['operacoes']['pareto'][-1]
+    add_heading_custom(doc, '9. CONCLUSÕES E RECOMENDAÇÕES', level=1)
+    doc.add_paragraph()
+
+    add_heading_custom(doc, '9.1 Síntese de Conclusões', level=2)
+
+    if c['variacao_taxa'] < 0:
+        tendencia = ('Tendência positiva:', f"A taxa de absentismo reduziu {fmt_pct(abs(c['variacao_taxa']))} entre {primeiro['ano']} e {ultimo['ano']}, sinalizando eficácia de eventuais medidas já implementadas.")
+    else:
+        tendencia = ('Tendência negativa:', f"A taxa de absentismo aumentou {fmt_pct(c['variacao_taxa'])} entre {primeiro['ano']} e {ultimo['ano']}.")
+    if d['acrescimo_fim_semana_min'] > 0:
+        semanal = ('Variação semanal:', f"Fim de semana apresenta taxa {fmt_num(d['acrescimo_fim_semana_min'], 0)}-{fmt_pct(d['acrescimo_fim_semana_max'], 0)} superior, sugerindo desafios específicos de gestão de turnos.")
+    else:
+        semanal = ('Variação semanal:', 'O fim de semana não apresenta taxa superior à dos dias úteis.')
+
+    conclusions_final = [
+        tendencia,
+        ('Problema concentrado:', f'{top_pareto} operações representam {fmt_pct(pct_pareto, 0)} do absentismo, permitindo intervenções focalizadas com alto retorno.'),
+        ('Padrão predominante:', f"{fmt_pct(m['spells']['short_term_pct'])} dos episódios são short-term (≤{m['spells']['limite_short_term']} dias), indicando que o desafio principal é comportamental, não médico."),
+        ('População em risco identificada:', f"{fmt_int(b['num_colaboradores'])} colaboradores com episódios recorrentes, dos quais {fmt_int(b['acima_200_num'])} em risco alto/severo/crítico."),
+        semanal,
+        ('Oportunidade de melhoria:', 'Subsistem segmentos e colaboradores com padrões disruptivos corrigíveis.')
+    ]
+
+    for i, (label, text) in enumerate(conclusions_final, 1):
+        p = doc.add_paragraph()
+        run = p.add_run(f'{i}. {label} ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(text)
+        run.font.size = Pt(11)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, '9.2 Recomendações Estratégicas', level=2)
+
+    add_paragraph_formatted(doc,
+        'Com base na análise conduzida, recomendam-se as seguintes linhas de ação:')
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'A. Intervenções Prioritárias (Curto Prazo - 0-3 meses)', level=3)
+
+    operacoes_bradford = m['segmentos']['operacoes']
+    short_term = [
+        f"Revisão individual dos {fmt_int(b['acima_200_num'])} colaboradores em risco alto/severo/crítico (Bradford ≥ 200), com conversas estruturadas envolvendo RH e chefia direta.",
+    ]
+    if operacoes_bradford:
+        op, media, _ = operacoes_bradford[0]
+        short_term.append(f"Análise de root cause na operação {op}, cujo Bradford médio é {fmt_num(media / b['media'] if b['media'] else 0)}x a média.")
+    short_term += [
+        'Implementação de política clara sobre baixas médicas short-term, incluindo requisitos de certificação médica a partir do 2º episódio num período de 30 dias.',
+        'Comunicação de política de absentismo atualizada, enfatizando consequências progressivas para padrões recorrentes sem justificação adequada.'
+    ]
+
+    for i, rec in enumerate(short_term, 1):
+        p = doc.add_paragraph()
+        run = p.add_run(f'{i}. ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(rec)
+        run.font.size = Pt(11)
+        p.paragraph_format.left_indent = Inches(0.25)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'B. Melhorias Estruturais (Médio Prazo - 3-6 meses)', level=3)
+
+    medium_term = [
+        'Implementação de dashboard de monitorização em tempo real (mensal) do Bradford Factor por operação e colaborador.',
+        'Programa de reconhecimento para colaboradores com zero ausências ou melhoria significativa face a períodos anteriores.',
+        'Revisão da gestão de turnos de fim de semana, incluindo análise de incentivos, rotatividade e condições específicas.',
+        'Formação para chefias de equipa em gestão de absentismo, incluindo conversas difíceis e identificação de padrões.',
+        'Análise de causas raiz nas operações Top 5 por contribuição, com planos de ação específicos para cada uma.'
+    ]
+
+    for i, rec in enumerate(medium_term, 1):
+        p = doc.add_paragraph()
+        run = p.add_run(f'{i}. ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(rec)
+        run.font.size = Pt(11)
+        p.paragraph_format.left_indent = Inches(0.25)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'C. Iniciativas de Longo Prazo (6-12 meses)', level=3)
+
+    long_term = [
+        'Programa de bem-estar e saúde ocupacional, com foco preventivo em doenças recorrentes.',
+        'Análise de correlação entre absentismo e outras métricas (performance, satisfação, turnover) para identificar padrões preditivos.',
+        'Implementação de sistema de alerta automático para chefias quando colaborador atinge threshold de Bradford.',
+        'Revisão de processos de recrutamento e onboarding para reduzir absentismo em colaboradores <1 ano.',
+        'Benchmark externo com outras operações de Call Center para validar metas de taxa de absentismo.'
+    ]
+
+    for i, rec in enumerate(long_term, 1):
+        p = doc.add_paragraph()
+        run = p.add_run(f'{i}. ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(rec)
+        run.font.size = Pt(11)
+        p.paragraph_format.left_indent = Inches(0.25)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, '9.3 Métricas de Acompanhamento', level=2)
+
+    add_paragraph_formatted(doc,
+        'Para medir o progresso das iniciativas, recomenda-se monitorização trimestral dos seguintes indicadores:')
+
+    doc.add_paragraph()
+
+    metrics = [
+        'Taxa de absentismo global',
+        'Número de colaboradores com Bradford > 200',
+        'Taxa de absentismo nas Top 5 operações',
+        'Percentagem de colaboradores com zero ausências',
+        'Número de semanas fora de controlo estatístico (U-Chart)',
+        'Taxa de absentismo em fins de semana vs. dias úteis'
+    ]
+
+    for metric in metrics:
+        p = doc.add_paragraph(metric, style='List Bullet')
+        p.paragraph_format.left_indent = Inches(0.25)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, '9.4 Considerações Finais', level=2)
+
+    situacao = []
+    if m['kpis']['taxa_absentismo'] <= 5:
+        situacao.append('dentro de parâmetros aceitáveis')
+    if c['variacao_taxa'] < 0:
+        situacao.append('com tendência positiva')
+    add_paragraph_formatted(doc,
+        'A análise demonstra que o absentismo no Call Center'
+        + (f", embora {' e '.join(situacao)}," if situacao else '')
+        + ' apresenta oportunidades claras de melhoria. '
+        'A concentração do problema em segmentos específicos e a natureza predominantemente '
+        'comportamental (episódios curtos e frequentes) sugerem que intervenções dirigidas '
+        'podem produzir resultados significativos.')
+
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Recomenda-se abordagem equilibrada, combinando:')
+
+    doc.add_paragraph()
+
+    approaches = [
+        'Ações corretivas para casos críticos identificados',
+        'Melhorias estruturais em processos e políticas',
+        'Iniciativas preventivas de bem-estar e engagement',
+        'Monitorização contínua com dashboards e alertas automáticos'
+    ]
+
+    for approach in approaches:
+        p = doc.add_paragraph(approach, style='List Bullet')
+        p.paragraph_format.left_indent = Inches(0.25)
+
+    doc.add_paragraph()
+
+    if c['variacao_taxa'] < 0:
+        add_paragraph_formatted(doc,
+            f"A tendência de melhoria observada entre {primeiro['ano']} e {ultimo['ano']} é encorajadora e deve ser "
+            'preservada e acelerada através das recomendações apresentadas.')
+    else:
+        add_paragraph_formatted(doc,
+            f"O agravamento observado entre {primeiro['ano']} e {ultimo['ano']} reforça a urgência "
+            'das recomendações apresentadas.')
+
+    doc.add_page_break()
 
-doc.add_page_break()
 
 # ============================================================================
 # ANEXOS
 # ============================================================================
-add_heading_custom(doc, 'ANEXOS', level=1)
-doc.add_paragraph()
-
-add_heading_custom(doc, 'Anexo A: Glossário Técnico', level=2)
-
-glossary = [
-    ('Absentismo:', 'Ausência não planeada do local de trabalho durante o horário de trabalho esperado.'),
-    ('Bradford Factor:', 'Métrica de disrupção operacional calculada como S² × D, onde S é o número de episódios e D o total de dias ausentes.'),
-    ('Spell (Episódio):', 'Sequência contínua de dias de ausência, independentemente da duração.'),
-    ('Short-term Spell:', 'Episódio de ausência com duração até 3 dias.'),
-    ('Long-term Spell:', 'Episódio de ausência com duração superior a 14 dias.'),
-    ('Taxa de Absentismo:', 'Percentagem de dias de falta sobre o total de dias úteis esperados (Faltas / (Trabalho Pago + Faltas) × 100).'),
-    ('Lost Time Rate:', 'Média de dias perdidos por colaborador no período.'),
-    ('Frequency Rate:', 'Média de episódios de ausência por colaborador.'),
-    ('U-Chart:', 'Gráfico de controlo estatístico para monitorizar taxas de eventos raros ao longo do tempo.'),
-    ('Cluster:', 'Grupo de colaboradores com perfil similar de absentismo, identificado por análise estatística.')
-]
+def _anexos(doc, m):
+    c = m['comparacao']
+    primeiro, ultimo = c['anos'][0], c['anos'][-1]
+    add_heading_custom(doc, 'ANEXOS', level=1)
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'Anexo A: Glossário Técnico', level=2)
+
+    glossary = [
+        ('Absentismo:', 'Ausência não planeada do local de trabalho durante o horário de trabalho esperado.'),
+        ('Bradford Factor:', 'Métrica de disrupção operacional calculada como S² × D, onde S é o número de episódios e D o total de dias ausentes.'),
+        ('Spell (Episódio):', 'Sequência contínua de dias de ausência, independentemente da duração.'),
+        ('Short-term Spell:', f"Episódio de ausência com duração até {m['spells']['limite_short_term']} dias."),
+        ('Long-term Spell:', f"Episódio de ausência com duração superior a {m['spells']['limite_long_term']} dias."),
+        ('Taxa de Absentismo:', 'Percentagem de dias de falta sobre o total de dias úteis esperados (Faltas / (Trabalho Pago + Faltas) × 100).'),
+        ('Lost Time Rate:', 'Média de dias perdidos por colaborador no período.'),
+        ('Frequency Rate:', 'Média de episódios de ausência por colaborador.'),
+        ('U-Chart:', 'Gráfico de controlo estatístico para monitorizar taxas de eventos raros ao longo do tempo.'),
+        ('Cluster:', 'Grupo de colaboradores com perfil similar de absentismo, identificado por análise estatística.')
+    ]
+
+    for term, definition in glossary:
+        p = doc.add_paragraph()
+        run = p.add_run(term + ' ')
+        run.bold = True
+        run.font.size = Pt(10)
+        run = p.add_run(definition)
+        run.font.size = Pt(10)
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'Anexo B: Metodologia do Bradford Factor', level=2)
+
+    add_paragraph_formatted(doc,
+        'O Bradford Factor foi desenvolvido na década de 1980 na Universidade de Bradford (Reino Unido) '
+        'e é amplamente utilizado em operações com elevada sensibilidade a ausências pontuais, '
+        'como Call Centers, hospitais e linhas de produção.')
+
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Fórmula: Bradford = S² × D', bold=True)
+
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Onde:')
 
-for term, definition in glossary:
     p = doc.add_paragraph()
-    run = p.add_run(term + ' ')
+    run = p.add_run('S = ')
     run.bold = True
-    run.font.size = Pt(10)
-    run = p.add_run(definition)
-    run.font.size = Pt(10)
-
-doc.add_paragraph()
-
-add_heading_custom(doc, 'Anexo B: Metodologia do Bradford Factor', level=2)
-
-add_paragraph_formatted(doc,
-    'O Bradford Factor foi desenvolvido na década de 1980 na Universidade de Bradford (Reino Unido) '
-    'e é amplamente utilizado em operações com elevada sensibilidade a ausências pontuais, '
-    'como Call Centers, hospitais e linhas de produção.')
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Fórmula: Bradford = S² × D', bold=True)
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Onde:')
-
-p = doc.add_paragraph()
-run = p.add_run('S = ')
-run.bold = True
-run = p.add_run('Número de spells (episódios) num período definido')
-run.font.size = Pt(11)
-
-p = doc.add_paragraph()
-run = p.add_run('D = ')
-run.bold = True
-run = p.add_run('Total de dias ausentes no mesmo período')
-run.font.size = Pt(11)
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Exemplo ilustrativo:')
-
-doc.add_paragraph()
-
-examples = [
-    ['Colaborador A', '1 episódio de 10 dias', 'Bradford = 1² × 10 = 10'],
-    ['Colaborador B', '5 episódios de 2 dias', 'Bradford = 5² × 10 = 250'],
-    ['Colaborador C', '10 episódios de 1 dia', 'Bradford = 10² × 10 = 1.000']
-]
-add_table_styled(doc, examples, ['Perfil', 'Padrão', 'Bradford'])
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Interpretação: Apesar de todos terem 10 dias de ausência, o Colaborador C '
-    '(10 episódios de 1 dia) tem Bradford 100x superior ao Colaborador A (1 episódio de 10 dias), '
-    'refletindo a maior disrupção operacional causada por ausências frequentes e imprevisíveis.')
-
-doc.add_paragraph()
-
-add_paragraph_formatted(doc,
-    'Thresholds aplicados neste relatório (baseados em Call Centre Helper UK):')
+    run = p.add_run('Número de spells (episódios) num período definido')
+    run.font.size = Pt(11)
 
-doc.add_paragraph()
+    p = doc.add_paragraph()
+    run = p.add_run('D = ')
+    run.bold = True
+    run = p.add_run('Total de dias ausentes no mesmo período')
+    run.font.size = Pt(11)
 
-thresholds = [
-    ['< 50', 'Aceitável', 'Monitorização normal'],
-    ['50-100', 'Monitorizar', 'Prestar atenção'],
-    ['100-200', 'Atenção', 'Conversa informal'],
-    ['200-400', 'Alto Risco', 'Reunião formal'],
-    ['400-600', 'Risco Severo', 'Aviso formal'],
-    ['> 600', 'Risco Crítico', 'Ação disciplinar']
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Exemplo ilustrativo:')
+
+    doc.add_paragraph()
+
+    examples = [
+        ['Colaborador A', '1 episódio de 10 dias', 'Bradford = 1² × 10 = 10'],
+        ['Colaborador B', '5 episódios de 2 dias', 'Bradford = 5² × 10 = 250'],
+        ['Colaborador C', '10 episódios de 1 dia', 'Bradford = 10² × 10 = 1.000']
+    ]
+    add_table_styled(doc, examples, ['Perfil', 'Padrão', 'Bradford'])
+
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Interpretação: Apesar de todos terem 10 dias de ausência, o Colaborador C '
+        '(10 episódios de 1 dia) tem Bradford 100x superior ao Colaborador A (1 episódio de 10 dias), '
+        'refletindo a maior disrupção operacional causada por ausências frequentes e imprevisíveis.')
+
+    doc.add_paragraph()
+
+    add_paragraph_formatted(doc,
+        'Thresholds aplicados neste relatório (baseados em Call Centre Helper UK):')
+
+    doc.add_paragraph()
+
+    thresholds = [
+        [faixa, nivel, acao]
+        for faixa, (nivel, _, _), acao in zip(faixas_bradford(m['bradford']['limites']), m['bradford']['niveis'], ACOES_BRADFORD)
+    ]
+    add_table_styled(doc, thresholds, ['Score', 'Categoria', 'Ação Recomendada'])
+
+    doc.add_paragraph()
+
+    add_heading_custom(doc, 'Anexo C: Notas Metodológicas', level=2)
+
+    add_paragraph_formatted(doc,
+        'Decisões metodológicas críticas aplicadas nesta análise:')
+
+    doc.add_paragraph()
+
+    notes = [
+        'Separação de hierarquias: Dados de absentismo e atrasos foram tratados separadamente para evitar dupla contagem (um colaborador pode trabalhar E ter atraso no mesmo dia).',
+        'Normalização temporal: Todas as análises por dia da semana ou período do mês utilizam taxas normalizadas pela base de trabalho, não valores absolutos.',
+        f"Bradford Disruptivo: Aplicado apenas a colaboradores ativos em {m['ano_analise']}, considerando exclusivamente spells short-term (≤{m['spells']['limite_short_term']} dias) para focar em padrões comportamentais.",
+        f"Filtro de amostra mínima: Rankings por operação ou categoria excluem segmentos com <{m['segmentos']['min_colaboradores']} colaboradores para evitar distorções estatísticas.",
+        f"Comparação anual: Comparação {primeiro['ano']} vs {ultimo['ano']} limitada a {MESES_PT[0].lower()}-{MESES_PT[c['mes_max'] - 1].lower()} de ambos os anos para garantir equivalência.",
+        f"Incompatibilidades: {fmt_int(m['ambito']['num_incompatibilidades'])} dias com registos contraditórios (ex: presença + ausência médica no mesmo dia) foram excluídos após validação."
+    ]
+
+    for i, note in enumerate(notes, 1):
+        p = doc.add_paragraph()
+        run = p.add_run(f'{i}. ')
+        run.bold = True
+        run.font.size = Pt(10)
+        run = p.add_run(note)
+        run.font.size = Pt(10)
+
+
+# Secções pela ordem do documento
+SECCOES = [
+    _capa,
+    _indice,
+    _sumario_executivo,
+    _contexto_metodologia,
+    _indicadores_chave,
+    _padroes_ausencia,
+    _riscos_operacionais,
+    _analise_comportamental,
+    _analise_temporal,
+    _segmentacao,
+    _conclusoes,
+    _anexos,
 ]
-add_table_styled(doc, thresholds, ['Score', 'Categoria', 'Ação Recomendada'])
 
-doc.add_paragraph()
 
-add_heading_custom(doc, 'Anexo C: Notas Metodológicas', level=2)
 
-add_paragraph_formatted(doc,
-    'Decisões metodológicas críticas aplicadas nesta análise:')
+def criar_documento(m):
+    """Constrói o relatório a partir do dicionário de métricas (absentismo.metricas)"""
+    doc = Document()
 
-doc.add_paragraph()
+    # Configurar margens
+    for section in doc.sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
 
-notes = [
-    'Separação de hierarquias: Dados de absentismo e atrasos foram tratados separadamente para evitar dupla contagem (um colaborador pode trabalhar E ter atraso no mesmo dia).',
-    'Normalização temporal: Todas as análises por dia da semana ou período do mês utilizam taxas normalizadas pela base de trabalho, não valores absolutos.',
-    'Bradford Disruptivo: Aplicado apenas a colaboradores ativos em 2025, considerando exclusivamente spells short-term (≤3 dias) para focar em padrões comportamentais.',
-    'Filtro de amostra mínima: Rankings por operação ou categoria excluem segmentos com <20 colaboradores para evitar distorções estatísticas.',
-    'Comparação anual: Comparação 2024 vs 2025 limitada a janeiro-junho de ambos os anos para garantir equivalência.',
-    'Incompatibilidades: 48 dias com registos contraditórios (ex: presença + ausência médica no mesmo dia) foram excluídos após validação.'
-]
+    for seccao in SECCOES:
+        seccao(doc, m)
+    return doc
 
-for i, note in enumerate(notes, 1):
-    p = doc.add_paragraph()
-    run = p.add_run(f'{i}. ')
-    run.bold = True
-    run.font.size = Pt(10)
-    run = p.add_run(note)
-    run.font.size = Pt(10)
 
-# Salvar documento
-doc.save('/home/user/absentismo_final/Relatorio_Absentismo_Direcao_Executiva.docx')
-print('Relatório criado com sucesso!')
+# ============================================================================
+# MODO LOTE: UM RELATÓRIO POR SEGMENTO
+# ============================================================================
+_ARTEFACTOS = None
+
+def nome_ficheiro_segmento(coluna, valor):
+    """'operacao', 'Unitel Money - Brigadistas' -> 'Relatorio_Absentismo_operacao_Unitel_Money_Brigadistas.docx'"""
+    ascii_ = unicodedata.normalize('NFKD', str(valor)).encode('ascii', 'ignore').decode()
+    return f"Relatorio_Absentismo_{coluna}_{re.sub(r'[^0-9A-Za-z]+', '_', ascii_).strip('_')}.docx"
+
+def _iniciar_processo(parametros, opcoes_pipeline):
+    """Cada processo lê os artefactos da cache do pipeline uma vez (sem os receber por pickle)"""
+    global _ARTEFACTOS
+    _ARTEFACTOS = executar(ARTEFACTOS_METRICAS, parametros=parametros, verbose=False, **opcoes_pipeline)
+
+def _relatorio_segmento(tarefa):
+    """
+    Filtra o segmento, calcula as métricas e gera o DOCX (corre num processo do pool)
+
+    Uma exceção fica no manifesto ({'erro': ...}) sem interromper os restantes segmentos.
+    """
+    coluna, valor, caminho, parametros, pasta_figuras = tarefa
+    inicio = time.time()
+    try:
+        filtrados = filtrar_segmento(_ARTEFACTOS, coluna, valor, parametros)
+        if filtrados['df_base_absentismo'].empty:
+            return {'erro': 'segmento sem registos', 'pid': os.getpid()}
+        metricas = calcular_metricas(filtrados, parametros, segmento=(coluna, valor))
+        meio = time.time()
+        if pasta_figuras:
+            # Já dentro do pool: figuras do segmento renderizadas neste processo
+            metricas['figuras'] = gerar_figuras(metricas, pasta=pasta_figuras, processos=1, verbose=False)
+        figuras = time.time()
+        criar_documento(metricas).save(caminho)
+    except Exception as erro:
+        mensagem = next((linha.strip() for linha in str(erro).splitlines() if linha.strip()), '')
+        return {'erro': f'{type(erro).__name__}: {mensagem}', 'pid': os.getpid()}
+    return {
+        'ficheiro': caminho,
+        'segundos_metricas': round(meio - inicio, 3),
+        'segundos_figuras': round(figuras - meio, 3),
+        'segundos_render': round(time.time() - figuras, 3),
+        'pid': os.getpid(),
+    }
+
+def gerar_relatorios_segmentos(segmentos, pasta_saida=PASTA_RELATORIOS, processos=None, parametros=None,
+                               pasta_figuras=PASTA_FIGURAS, **opcoes_pipeline):
+    """
+    Um relatório por segmento [(coluna, valor), ...] num pool de processos
+
+    Segmentos repetidos (p.ex. pedido explicitamente e também entre as
+    operações principais) geram um só relatório, pela ordem da primeira vez.
+    O pipeline corre (ou é lido da cache) uma vez antes do pool; cada processo
+    lê os artefactos do Parquet em cache ao arrancar. As figuras de todos os
+    segmentos partilham pasta_figuras (None: relatórios sem figuras). Devolve o manifesto
+    (uma entrada por relatório, com tempos), também guardado em
+    pasta_saida/FICHEIRO_MANIFESTO.
+    """
+    inicio = time.time()
+    executar(ARTEFACTOS_METRICAS, parametros=parametros, verbose=False, **opcoes_pipeline)
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    tarefas = [
+        (coluna, valor, os.path.join(pasta_saida, nome_ficheiro_segmento(coluna, valor)), parametros, pasta_figuras)
+        for coluna, valor in dict.fromkeys(segmentos)
+    ]
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(parametros, opcoes_pipeline)) as pool:
+        resultados = list(pool.map(_relatorio_segmento, tarefas))
+
+    manifesto = {
+        'segundos_total': round(time.time() - inicio, 3),
+        'processos': processos or os.cpu_count(),
+        'relatorios': [
+            {'coluna': coluna, 'valor': valor, **resultado}
+            for (coluna, valor, *_), resultado in zip(tarefas, resultados)
+        ],
+    }
+    with open(os.path.join(pasta_saida, FICHEIRO_MANIFESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+    return manifesto
+
+def _segmento_argumento(texto):
+    """'operacao=Unitel Alpha' -> ('operacao', 'Unitel Alpha')"""
+    coluna, sep, valor = texto.partition('=')
+    if not sep or not valor:
+        raise argparse.ArgumentTypeError(f"segmento inválido: {texto!r} (formato: coluna=valor)")
+    return coluna, valor
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o relatório executivo de absentismo (DOCX) a partir das métricas do pipeline')
+    parser.add_argument('--metricas', default=FICHEIRO_METRICAS, help='ficheiro JSON de métricas (absentismo.metricas)')
+    parser.add_argument('--calcular', action='store_true', help='executa o pipeline e atualiza o ficheiro de métricas antes de gerar o relatório')
+    parser.add_argument('--dados', default=FICHEIRO_DADOS, help='CSV de registos (com --calcular)')
+    parser.add_argument('--codigos', default=FICHEIRO_CODIGOS, help='Excel de códigos (com --calcular)')
+    parser.add_argument('--saida', default=FICHEIRO_RELATORIO, help='caminho do DOCX gerado')
+    parser.add_argument('--segmentos', nargs='+', type=_segmento_argumento, default=[],
+                        help="modo lote: segmentos 'coluna=valor' (operacao / categoria_profissional)")
+    parser.add_argument('--top-operacoes', type=int, default=0, help='modo lote: acrescenta as N operações com mais faltas')
+    parser.add_argument('--processos', type=int, default=None, help='número de processos do modo lote e das figuras (por omissão, um por core)')
+    parser.add_argument('--pasta-saida', default=PASTA_RELATORIOS, help='modo lote: pasta dos relatórios e do manifesto')
+    parser.add_argument('--pasta-figuras', default=PASTA_FIGURAS, help='pasta (cache) das figuras renderizadas')
+    parser.add_argument('--sem-figuras', action='store_true', help='não renderiza figuras (mantém os marcadores de texto); as figuras precisam do kaleido e de um Chrome/Chromium (opcionais)')
+    args = parser.parse_args()
+    pasta_figuras = None if args.sem_figuras else args.pasta_figuras
+
+    if args.segmentos or args.top_operacoes:
+        opcoes_pipeline = {'caminho_dados': args.dados, 'caminho_codigos': args.codigos}
+        segmentos = list(args.segmentos)
+        if args.top_operacoes:
+            artefactos = executar(['df_faltas'], **opcoes_pipeline)
+            segmentos += [('operacao', op) for op in segmentos_principais(artefactos, 'operacao', args.top_operacoes)]
+        manifesto = gerar_relatorios_segmentos(segmentos, args.pasta_saida, args.processos,
+                                               pasta_figuras=pasta_figuras, **opcoes_pipeline)
+        for r in manifesto['relatorios']:
+            print(f"  {r['valor'][:40]:40s}: {r.get('ficheiro', r.get('erro'))}")
+        print(f"{len(manifesto['relatorios'])} relatórios em {manifesto['segundos_total']:.1f}s ({manifesto['processos']} processos)")
+        return
+
+    if args.calcular:
+        metricas = gerar_metricas(args.metricas, caminho_dados=args.dados, caminho_codigos=args.codigos)
+    else:
+        metricas = carregar_metricas(args.metricas)
+
+    # Figuras (não são guardadas no ficheiro de métricas)
+    if pasta_figuras:
+        metricas['figuras'] = gerar_figuras(metricas, pasta=pasta_figuras, processos=args.processos)
+
+    # Salvar documento
+    criar_documento(metricas).save(args.saida)
+    print(f'Relatório criado com sucesso: {args.saida}')
+
+
+if __name__ == '__main__':
+    main()